@@ -3,17 +3,21 @@
 Extract funny moments and humor from the conversation
 """
 
-import json
 import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "extractors"))
+
+from transcript_index import load_transcript_index, query_terms
 
 def find_funny_moments():
     """Extract humor, laughter, and funny exchanges"""
     
-    with open("/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.json", 'r') as f:
-        data = json.load(f)
-    
-    words = data.get("words", [])
-    full_text = data.get("text", "")
+    index = load_transcript_index("/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.npz")
+    transcript = index.transcript
     
     print("😂 FUNNY MOMENTS & HUMOR IN THE CONVERSATION\n")
     print("=" * 60)
@@ -30,29 +34,21 @@ def find_funny_moments():
         "right in my ear bones", "china number one", "white people"
     ]
     
-    # Extract segments with these patterns
-    for i, word in enumerate(words):
-        word_lower = word["word"].lower()
-        
-        for pattern in swear_words + funny_patterns:
-            if pattern in word_lower:
-                # Get context
-                start = max(0, i-20)
-                end = min(len(words), i+20)
-                context = " ".join([w["word"] for w in words[start:end]])
-                
-                humor_segments.append({
-                    "time": word["start"],
-                    "trigger": pattern,
-                    "context": context
-                })
-                break
+    # Extract segments with these patterns (first matching pattern per word)
+    patterns = swear_words + funny_patterns
+    matches = index.first_match(patterns)
+    for i in np.flatnonzero(matches >= 0):
+        humor_segments.append({
+            "time": float(transcript.start[i]),
+            "trigger": patterns[matches[i]],
+            "context": transcript.join(i - 20, i + 20)
+        })
     
     # Find specific funny exchanges
     print("\n🎭 COMEDY GOLD MOMENTS:\n")
     
     # The ear bones moment
-    ear_bones = find_text_segment(full_text, "ear bones")
+    ear_bones = find_phrase(index, "ear bones")
     if ear_bones:
         print("1. THE EAR BONES MOMENT:")
         print("-" * 40)
@@ -60,7 +56,7 @@ def find_funny_moments():
         print()
     
     # China number one
-    china = find_text_segment(full_text, "China number one")
+    china = find_phrase(index, "China number one")
     if china:
         print("2. CHINA NUMBER ONE:")
         print("-" * 40)
@@ -68,7 +64,7 @@ def find_funny_moments():
         print()
     
     # The animals count
-    animals = find_text_segment(full_text, "dogs will you have")
+    animals = find_phrase(index, "dogs will you have")
     if animals:
         print("3. THE PET CENSUS:")
         print("-" * 40)
@@ -78,7 +74,7 @@ def find_funny_moments():
     # Technical frustration humor
     print("\n💻 TECHNICAL FRUSTRATION COMEDY:\n")
     
-    tech_frustration = find_text_segment(full_text, "sexy. Like this")
+    tech_frustration = find_phrase(index, "sexy. Like this")
     if tech_frustration:
         print("Screen sharing struggles:")
         print("-" * 40)
@@ -88,7 +84,7 @@ def find_funny_moments():
     # Self-deprecating humor
     print("\n🤷 SELF-DEPRECATING MOMENTS:\n")
     
-    blind = find_text_segment(full_text, "really blind")
+    blind = find_phrase(index, "really blind")
     if blind:
         print("Vision problems:")
         print("-" * 40)
@@ -98,7 +94,7 @@ def find_funny_moments():
     # Philosophical humor
     print("\n🧠 PHILOSOPHICAL/ABSURD HUMOR:\n")
     
-    capitalism = find_text_segment(full_text, "capitalism is no better")
+    capitalism = find_phrase(index, "capitalism is no better")
     if capitalism:
         print("Political philosophy:")
         print("-" * 40)
@@ -106,7 +102,7 @@ def find_funny_moments():
         print()
     
     # Jon's OG weed story
-    weed = find_text_segment(full_text, "fucking OG push")
+    weed = find_phrase(index, "fucking OG push")
     if weed:
         print("\n🌿 JON'S CANNABIS NOSTALGIA (OG Kush):")
         print("-" * 40)
@@ -117,7 +113,7 @@ def find_funny_moments():
     print("\n❓ FUNNY Q&A EXCHANGES:\n")
     
     # Do I all right?
-    allright = find_text_segment(full_text, "Do I all right")
+    allright = find_phrase(index, "Do I all right")
     if allright:
         print("Existential check-in:")
         print("-" * 40)
@@ -127,7 +123,7 @@ def find_funny_moments():
     # Count swear words for comedy intensity
     swear_count = {}
     for word in swear_words:
-        count = full_text.lower().count(word)
+        count = len(index.contains(word))
         if count > 0:
             swear_count[word] = count
     
@@ -138,26 +134,21 @@ def find_funny_moments():
     
     return humor_segments
 
-def find_text_segment(text, search_phrase, context_chars=200):
-    """Find a phrase and return it with context"""
-    lower_text = text.lower()
-    index = lower_text.find(search_phrase.lower())
-    
-    if index > -1:
-        start = max(0, index - context_chars//2)
-        end = min(len(text), index + len(search_phrase) + context_chars//2)
-        segment = text[start:end]
-        
-        # Clean it up
-        segment = segment.replace("  ", " ")
+def find_phrase(index, search_phrase, context_words=20):
+    """Find a phrase and return it with context and its audio time"""
+    occurrences = index.occurrences(search_phrase, context=context_words, limit=1)
+    
+    if occurrences:
+        hit = occurrences[0]
+        segment = hit["context"].replace("  ", " ")
         
         # Add ellipsis if truncated
-        if start > 0:
+        if hit["position"] > context_words:
             segment = "..." + segment
-        if end < len(text):
+        if hit["position"] + len(query_terms(search_phrase)) + context_words < len(index.transcript):
             segment = segment + "..."
         
-        return segment
+        return f"[{hit['start'] / 60:.1f} min] {segment}"
     
     return None
 
@@ -6,15 +6,20 @@ Extract profanity moments with context for comedy supercut
 import json
 import subprocess
 from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "extractors"))
+
+from transcript_index import load_transcript_index
 
 def create_profanity_supercut():
     """Extract audio clips around profanity for comedy montage"""
     
     # Load transcription
-    with open("/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.json", 'r') as f:
-        data = json.load(f)
-    
-    words = data.get("words", [])
+    index = load_transcript_index("/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.npz")
+    transcript = index.transcript
     
     # Define profanity to extract
     profanity_list = ["fuck", "shit", "damn", "hell", "jesus", "god", "crazy", "stupid", "dumb", "fucking"]
@@ -22,30 +27,21 @@ def create_profanity_supercut():
     # Find all profanity moments with timestamps
     profanity_moments = []
     
-    for i, word_data in enumerate(words):
-        word_lower = word_data["word"].lower().strip()
+    matches = index.first_match(profanity_list)
+    for i in np.flatnonzero(matches >= 0):
+        # Get 3 seconds context (1.5 before, 1.5 after)
+        start_time = max(0, float(transcript.start[i]) - 1.5)
+        end_time = float(transcript.end[i]) + 1.5
         
-        for profane in profanity_list:
-            if profane in word_lower:
-                # Get 3 seconds context (1.5 before, 1.5 after)
-                start_time = max(0, word_data["start"] - 1.5)
-                end_time = word_data["end"] + 1.5
-                
-                # Get text context
-                context_start = max(0, i - 5)
-                context_end = min(len(words), i + 5)
-                context_text = " ".join([words[j]["word"] for j in range(context_start, context_end)])
-                
-                profanity_moments.append({
-                    "word": word_data["word"],
-                    "category": profane,
-                    "start_time": start_time,
-                    "end_time": end_time,
-                    "exact_time": word_data["start"],
-                    "context": context_text,
-                    "index": i
-                })
-                break
+        profanity_moments.append({
+            "word": transcript.word(i),
+            "category": profanity_list[matches[i]],
+            "start_time": start_time,
+            "end_time": end_time,
+            "exact_time": float(transcript.start[i]),
+            "context": transcript.join(i - 5, i + 5),
+            "index": int(i)
+        })
     
     # Sort by time
     profanity_moments.sort(key=lambda x: x["exact_time"])
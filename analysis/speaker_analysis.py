@@ -3,21 +3,26 @@
 Analyze conversation for speaker changes and participant identification
 """
 
-import json
 from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "extractors"))
+
+from transcript_index import load_transcript_index
 
 def analyze_speakers():
     """Analyze the transcription for speaker patterns and changes"""
     
     # Load the complete transcription
-    transcription_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.json"
+    transcription_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.npz"
     
-    with open(transcription_file, 'r') as f:
-        transcription = json.load(f)
+    index = load_transcript_index(transcription_file)
+    transcript = index.transcript
     
     # Get all text
-    full_text = transcription.get("text", "")
-    words = transcription.get("words", [])
+    full_text = transcript.text
     
     print("🔍 Analyzing conversation for speaker patterns...\n")
     
@@ -33,17 +38,13 @@ def analyze_speakers():
     }
     
     # Search for names and key topics
-    for i, word_data in enumerate(words):
-        word_lower = word_data["word"].lower().strip()
-        timestamp = word_data["start"]
-        
-        for name in name_mentions:
-            if name in word_lower:
-                name_mentions[name].append({
-                    "time": timestamp,
-                    "word": word_data["word"],
-                    "context": get_context(words, i, 5)  # Get 5 words before and after
-                })
+    for name in name_mentions:
+        for i in index.contains(name):
+            name_mentions[name].append({
+                "time": float(transcript.start[i]),
+                "word": transcript.word(i),
+                "context": get_context(transcript, i, 5)  # Get 5 words before and after
+            })
     
     # Analyze conversation segments
     print("📊 Name/Topic Mentions Found:")
@@ -59,15 +60,14 @@ def analyze_speakers():
     
     # Check for long silences that might indicate person change
     silence_gaps = []
-    for i in range(1, len(words)):
-        gap = words[i]["start"] - words[i-1]["end"]
-        if gap > 5.0:  # More than 5 seconds silence
-            silence_gaps.append({
-                "time": words[i]["start"],
-                "gap_duration": gap,
-                "before": words[i-1]["word"],
-                "after": words[i]["word"]
-            })
+    gaps = transcript.gaps()
+    for i in np.flatnonzero(gaps > 5.0) + 1:  # More than 5 seconds silence
+        silence_gaps.append({
+            "time": float(transcript.start[i]),
+            "gap_duration": float(gaps[i - 1]),
+            "before": transcript.word(i - 1),
+            "after": transcript.word(i)
+        })
     
     # Show significant gaps
     if silence_gaps:
@@ -81,7 +81,7 @@ def analyze_speakers():
     print("\n📈 Conversation Topic Evolution:")
     
     # Divide conversation into thirds
-    duration = transcription["metadata"]["duration"]
+    duration = transcript.metadata["duration"]
     third = duration / 3
     
     segments = {
@@ -91,27 +91,21 @@ def analyze_speakers():
     }
     
     for segment_name, times in segments.items():
-        segment_words = [w for w in words 
-                        if w["start"] >= times["start"] and w["start"] < times["end"]]
+        segment = transcript.time_slice(times["start"], times["end"])
         
-        if segment_words:
+        if segment.stop > segment.start:
             # Get sample text from segment
-            sample_start = len(segment_words) // 2
-            sample_words = segment_words[sample_start:sample_start+20]
-            sample_text = " ".join([w["word"] for w in sample_words])
+            sample_start = segment.start + (segment.stop - segment.start) // 2
+            sample_text = transcript.join(sample_start, min(sample_start + 20, segment.stop))
             
             print(f"\n{segment_name}:")
             print(f"  Sample: \"{sample_text[:100]}...\"")
     
     return name_mentions, silence_gaps
 
-def get_context(words, index, window=5):
+def get_context(transcript, index, window=5):
     """Get surrounding words for context"""
-    start = max(0, index - window)
-    end = min(len(words), index + window + 1)
-    
-    context_words = [words[i]["word"] for i in range(start, end)]
-    return " ".join(context_words)
+    return transcript.join(index - window, index + window + 1)
 
 if __name__ == "__main__":
     analyze_speakers()
\ No newline at end of file
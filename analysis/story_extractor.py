@@ -3,44 +3,52 @@
 Extract stories and narratives from the conversation
 """
 
-import json
 from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "extractors"))
+
+from transcript_index import load_transcript_index, query_terms
 
 def extract_stories():
     """Extract coherent story segments from the conversation"""
     
     # Load transcription
-    with open("/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.json", 'r') as f:
-        transcription = json.load(f)
-    
-    words = transcription.get("words", [])
+    index = load_transcript_index("/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.npz")
+    transcript = index.transcript
     
     # Look for story indicators and longer narrative segments
     story_segments = []
     
+    # Look for narrative indicators
+    story_indicators = [
+        "when I", "I was", "I remember", "there was", "we were",
+        "this guy", "this woman", "she told", "he said", "they had",
+        "happened", "story", "told me", "went to", "came to",
+        "years ago", "back when", "used to", "one time"
+    ]
+    
     # Process in chunks to find sustained narrative sections
     chunk_size = 100  # words
-    for i in range(0, len(words) - chunk_size, 50):  # Sliding window
-        chunk = words[i:i+chunk_size]
-        text = " ".join([w["word"] for w in chunk])
-        
-        # Look for narrative indicators
-        story_indicators = [
-            "when I", "I was", "I remember", "there was", "we were",
-            "this guy", "this woman", "she told", "he said", "they had",
-            "happened", "story", "told me", "went to", "came to",
-            "years ago", "back when", "used to", "one time"
-        ]
-        
-        # Count narrative elements
-        narrative_score = sum(1 for indicator in story_indicators if indicator in text.lower())
-        
+    chunk_starts = np.arange(0, max(0, len(transcript) - chunk_size), 50)  # Sliding window
+    
+    # Count narrative elements: indicators occurring at least once per chunk, via phrase lookups
+    narrative_scores = np.zeros(len(chunk_starts), dtype=int)
+    for indicator in story_indicators:
+        positions = index.phrase_positions(indicator)
+        occurrences = index.count_in_ranges(positions, chunk_starts, chunk_starts + chunk_size,
+                                            len(query_terms(indicator)))
+        narrative_scores += occurrences > 0
+    
+    for i, narrative_score in zip(chunk_starts, narrative_scores):
         if narrative_score >= 3:  # Strong narrative segment
             story_segments.append({
-                "start_time": chunk[0]["start"],
-                "end_time": chunk[-1]["end"],
-                "text": text,
-                "score": narrative_score
+                "start_time": float(transcript.start[i]),
+                "end_time": float(transcript.end[i + chunk_size - 1]),
+                "text": transcript.join(i, i + chunk_size),
+                "score": int(narrative_score)
             })
     
     # Merge overlapping segments
@@ -78,21 +86,21 @@ def extract_stories():
     print("\n🔍 SPECIFIC STORY THEMES:\n")
     
     # Search for China story
-    china_story = find_story_about(words, "China", context_words=200)
+    china_story = find_story_about(index, "China", context_words=200)
     if china_story:
         print("China Story:")
         print("-" * 60)
         print(china_story[:500] + "...\n")
     
     # Search for camp/work stories
-    camp_story = find_story_about(words, "camp", context_words=150)
+    camp_story = find_story_about(index, "camp", context_words=150)
     if camp_story:
         print("Camp/Work Story:")
         print("-" * 60)
         print(camp_story[:500] + "...\n")
     
     # Search for technology/AI stories
-    ai_story = find_story_about(words, "DeepSeek", context_words=150)
+    ai_story = find_story_about(index, "DeepSeek", context_words=150)
     if ai_story:
         print("AI/Technology Story:")
         print("-" * 60)
@@ -100,17 +108,14 @@ def extract_stories():
     
     return merged_stories
 
-def find_story_about(words, topic, context_words=100):
+def find_story_about(index, topic, context_words=100):
     """Find story segments about a specific topic"""
     
-    for i, word in enumerate(words):
-        if topic.lower() in word["word"].lower():
-            # Get surrounding context
-            start = max(0, i - context_words//2)
-            end = min(len(words), i + context_words//2)
-            
-            context = " ".join([w["word"] for w in words[start:end]])
-            return context
+    mentions = index.contains(topic)
+    if len(mentions):
+        # Get surrounding context of the first mention
+        i = mentions[0]
+        return index.transcript.join(i - context_words//2, i + context_words//2)
     
     return None
 
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark the installed ASR backends on a fixture clip
+Reports load time, real-time factor and word error rate against a reference transcript
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "extractors"))
+
+from asr_backends import available_backends, load_backend
+from audio_io import audio_blocks
+
+SAMPLE_RATE = 16000
+
+
+def normalize_words(text: str):
+    """Lowercase words without punctuation, for scoring"""
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def word_error_rate(reference, hypothesis) -> float:
+    """(substitutions + deletions + insertions) / reference words, via edit distance"""
+    if not reference:
+        return float(len(hypothesis) > 0)
+
+    previous = np.arange(len(hypothesis) + 1)
+    for i, ref_word in enumerate(reference, 1):
+        current = np.empty_like(previous)
+        current[0] = i
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current[j] = min(previous[j] + 1,
+                             current[j - 1] + 1,
+                             previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / len(reference)
+
+
+def main():
+    """Time every installed backend on the same clip"""
+
+    if len(sys.argv) < 3:
+        print("Usage: asr_backends.py <clip.wav> <reference.txt> [model] [threads]")
+        return
+
+    clip_file, reference_file = sys.argv[1], sys.argv[2]
+    model = sys.argv[3] if len(sys.argv) > 3 else "base"
+    threads = int(sys.argv[4]) if len(sys.argv) > 4 else None
+
+    _, blocks = audio_blocks(clip_file, 60, SAMPLE_RATE)
+    audio = (np.concatenate(list(blocks)) / 32768.0).astype(np.float32)
+    duration = len(audio) / SAMPLE_RATE
+    reference = normalize_words(Path(reference_file).read_text())
+
+    backends = available_backends()
+    if not backends:
+        print("❌ No ASR backend installed (openai-whisper, faster-whisper or pywhispercpp)")
+        return
+
+    print(f"🎵 Clip: {clip_file} ({duration:.1f}s, {len(reference)} reference words), model: {model}")
+
+    results = []
+    for name in backends:
+        start = time.perf_counter()
+        backend = load_backend(name, model, threads=threads)
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = backend.transcribe(audio, language="en")
+        transcribe_time = time.perf_counter() - start
+
+        hypothesis = normalize_words(" ".join(
+            word["word"] for segment in result["segments"] for word in segment["words"]
+        ))
+        results.append((name, backend.device, backend.precision, load_time,
+                        transcribe_time / duration, word_error_rate(reference, hypothesis)))
+
+    print(f"\n⏱️ {'Backend':<16}{'Device':<8}{'Precision':<11}{'Load':>8}{'RTF':>8}{'WER':>8}")
+    for name, device, precision, load_time, rtf, wer in sorted(results, key=lambda r: r[4]):
+        print(f"  {name:<16}{device:<8}{precision:<11}{load_time:>7.1f}s{rtf:>8.3f}{wer:>8.1%}")
+    print("\nRTF = transcription time / audio duration (lower is faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+VectorVault ASR Backends
+Interchangeable Whisper engines behind one word-timestamp schema
+"""
+
+import importlib.util
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Preference when no backend is named: the reference engine first, so output
+# only changes when a faster engine is chosen explicitly (see benchmarks/asr_backends.py)
+BACKEND_PREFERENCE = ('whisper', 'faster-whisper', 'whisper.cpp')
+
+ASR_BACKENDS = {}
+
+
+def register_backend(name: str):
+    """Register an ASRBackend subclass under a backend name"""
+    def decorator(cls):
+        cls.name = name
+        ASR_BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def default_device() -> str:
+    """'cuda' when torch can see a GPU, otherwise 'cpu'"""
+    if importlib.util.find_spec("torch") is None:
+        return "cpu"
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def available_backends() -> List[str]:
+    """Registered backends whose engine is installed, in preference order"""
+    importlib.invalidate_caches()
+    return [name for name in BACKEND_PREFERENCE if ASR_BACKENDS[name].available()]
+
+
+def default_backend() -> Optional[str]:
+    """$VECTORVAULT_ASR_BACKEND, else the first installed backend"""
+    name = os.environ.get('VECTORVAULT_ASR_BACKEND')
+    if name:
+        return name
+    installed = available_backends()
+    return installed[0] if installed else None
+
+
+def load_backend(name: Optional[str] = None, model: str = "base", device: Optional[str] = None,
+                 threads: Optional[int] = None) -> 'ASRBackend':
+    """Instantiate a backend by name (default: default_backend())"""
+    name = name or default_backend()
+    if name not in ASR_BACKENDS:
+        raise Exception(f"Unknown ASR backend: {name} (choose from {', '.join(ASR_BACKENDS)})")
+    backend = ASR_BACKENDS[name]
+    if not backend.available():
+        raise Exception(f"ASR backend {name} is not installed ({backend.package})")
+    return backend(model, device, threads)
+
+
+class ASRBackend:
+    """
+    One speech recognition engine
+
+    transcribe() takes 16 kHz mono float32 audio in [-1, 1] and returns
+    {"language", "segments"} where every segment has start, end, text,
+    avg_logprob, no_speech_prob and words [{word, start, end, probability}],
+    the same shape openai-whisper produces. An engine that cannot report a
+    word probability or the spoken language returns None for it rather than
+    a made-up value.
+    """
+
+    name = None
+    module = None
+    package = None
+
+    @classmethod
+    def available(cls) -> bool:
+        return importlib.util.find_spec(cls.module) is not None
+
+    def __init__(self, model: str = "base", device: Optional[str] = None, threads: Optional[int] = None):
+        """
+        Args:
+            model: Model size or path
+            device: 'cpu' or 'cuda' (default: cuda if available)
+            threads: CPU threads for the engine (default: engine's choice)
+        """
+        self.model_name = model
+        self.device = device or default_device()
+        self.threads = threads
+
+    @property
+    def precision(self) -> str:
+        raise NotImplementedError
+
+    def transcribe(self, audio: np.ndarray, initial_prompt: Optional[str] = None, **options) -> Dict:
+        raise NotImplementedError
+
+
+@register_backend('whisper')
+class WhisperBackend(ASRBackend):
+    """Reference openai-whisper (PyTorch)"""
+
+    module = 'whisper'
+    package = 'openai-whisper'
+
+    def __init__(self, model: str = "base", device: Optional[str] = None, threads: Optional[int] = None):
+        super().__init__(model, device, threads)
+        import whisper
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        self.model = whisper.load_model(model, device=self.device)
+
+    @property
+    def precision(self) -> str:
+        # Half precision only helps (and only works reliably) on CUDA
+        return "float16" if self.device == "cuda" else "float32"
+
+    def transcribe(self, audio: np.ndarray, initial_prompt: Optional[str] = None, **options) -> Dict:
+        options.setdefault("word_timestamps", True)
+        options.setdefault("verbose", None)
+        options.setdefault("fp16", self.precision == "float16")
+        result = self.model.transcribe(audio, initial_prompt=initial_prompt, **options)
+        return {"language": result.get("language"), "segments": result.get("segments", [])}
+
+
+@register_backend('faster-whisper')
+class FasterWhisperBackend(ASRBackend):
+    """CTranslate2 Whisper: int8 on CPU, float16 on CUDA"""
+
+    module = 'faster_whisper'
+    package = 'faster-whisper'
+
+    def __init__(self, model: str = "base", device: Optional[str] = None, threads: Optional[int] = None):
+        super().__init__(model, device, threads)
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(model, device=self.device, compute_type=self.precision,
+                                  cpu_threads=threads or 0)
+
+    @property
+    def precision(self) -> str:
+        return "float16" if self.device == "cuda" else "int8"
+
+    def transcribe(self, audio: np.ndarray, initial_prompt: Optional[str] = None, **options) -> Dict:
+        options.setdefault("word_timestamps", True)
+        segments, info = self.model.transcribe(audio, initial_prompt=initial_prompt, **options)
+
+        results = []
+        for segment in segments:
+            results.append({
+                "id": segment.id,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "avg_logprob": segment.avg_logprob,
+                "no_speech_prob": segment.no_speech_prob,
+                "words": [
+                    {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                    for w in (segment.words or [])
+                ]
+            })
+        return {"language": info.language, "segments": results}
+
+
+@register_backend('whisper.cpp')
+class WhisperCppBackend(ASRBackend):
+    """whisper.cpp through pywhispercpp (CPU; precision is set by the ggml model file)"""
+
+    module = 'pywhispercpp'
+    package = 'pywhispercpp'
+
+    def __init__(self, model: str = "base", device: Optional[str] = None, threads: Optional[int] = None):
+        super().__init__(model, "cpu", threads)
+        from pywhispercpp.model import Model
+        params = {"print_progress": False, "print_realtime": False}
+        if threads:
+            params["n_threads"] = threads
+        self.model = Model(model, **params)
+
+    @property
+    def precision(self) -> str:
+        return "ggml"
+
+    def transcribe(self, audio: np.ndarray, initial_prompt: Optional[str] = None, **options) -> Dict:
+        # "auto" makes whisper.cpp detect the language instead of assuming English
+        params = {"token_timestamps": True, "max_len": 1, "split_on_word": True,
+                  "language": options.get("language") or "auto"}
+        if initial_prompt:
+            params["initial_prompt"] = initial_prompt
+
+        # One-word segments (max_len=1) give word timestamps; t0/t1 are in 10 ms units
+        words = []
+        for i, piece in enumerate(self.model.transcribe(audio.astype(np.float32), **params)):
+            if piece.text.strip():
+                words.append({"word": piece.text, "start": piece.t0 / 100.0,
+                              "end": piece.t1 / 100.0, "probability": self.word_probability(i)})
+
+        # Regroup words into sentence-like segments
+        segments, current = [], []
+        for word in words:
+            current.append(word)
+            if word["word"].rstrip().endswith(('.', '?', '!')):
+                segments.append(current)
+                current = []
+        if current:
+            segments.append(current)
+
+        results = [{
+            "id": i,
+            "start": group[0]["start"],
+            "end": group[-1]["end"],
+            "text": "".join(w["word"] for w in group),
+            "avg_logprob": 0.0,
+            "no_speech_prob": 0.0,
+            "words": group
+        } for i, group in enumerate(segments)]
+
+        return {"language": options.get("language") or self.detected_language(), "segments": results}
+
+    def word_probability(self, segment: int) -> Optional[float]:
+        """Mean probability of the text tokens of one (one-word) segment of the last call, None if unavailable"""
+        try:
+            import _pywhispercpp as pw
+            ctx = self.model._ctx
+            eot = pw.whisper_token_eot(ctx)
+            probabilities = [pw.whisper_full_get_token_p(ctx, segment, j)
+                             for j in range(pw.whisper_full_n_tokens(ctx, segment))
+                             if pw.whisper_full_get_token_id(ctx, segment, j) < eot]
+        except (ImportError, AttributeError, TypeError):
+            return None
+        return float(np.mean(probabilities)) if probabilities else None
+
+    def detected_language(self) -> Optional[str]:
+        """Language whisper.cpp detected in the last call, None if unavailable"""
+        try:
+            import _pywhispercpp as pw
+            return pw.whisper_lang_str(pw.whisper_full_lang_id(self.model._ctx))
+        except (ImportError, AttributeError, TypeError):
+            return None
@@ -7,9 +7,171 @@ Dense audio feature extraction for conversation analysis
 import numpy as np
 import librosa
 import math
-import json
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
+
+from audio_basic import speech_mask
+from audio_io import audio_blocks
+from audio_shards import SharedSamples, plan_shards
+from feature_cache import FeatureCache
+from feature_file import save_features
+
+class SpectralContext:
+    """
+    Intermediate representations of one signal, computed on first use
+    
+    Every spectral feature reads the same STFT magnitude, power and log-mel
+    spectrogram instead of recomputing its own.
+    """
+    
+    def __init__(self, audio: np.ndarray, sample_rate: int, hop_length: int,
+                 n_fft: int = 2048, center: bool = True, tuning: Optional[float] = None):
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self.hop_length = hop_length
+        self.n_fft = n_fft
+        self.center = center
+        self.tuning = tuning
+    
+    @cached_property
+    def magnitude(self) -> np.ndarray:
+        return np.abs(librosa.stft(self.audio, n_fft=self.n_fft,
+                                   hop_length=self.hop_length, center=self.center))
+    
+    @cached_property
+    def power(self) -> np.ndarray:
+        return self.magnitude ** 2
+    
+    @cached_property
+    def mel_db(self) -> np.ndarray:
+        mel = librosa.feature.melspectrogram(S=self.power, sr=self.sample_rate)
+        return librosa.power_to_db(mel)
+    
+    def onset_envelope(self, aggregate=np.mean) -> np.ndarray:
+        return librosa.onset.onset_strength(S=self.mel_db, sr=self.sample_rate,
+                                            hop_length=self.hop_length, aggregate=aggregate)
+    
+    @property
+    def num_frames(self) -> int:
+        if self.center:
+            return 1 + len(self.audio) // self.hop_length
+        return 1 + (len(self.audio) - self.n_fft) // self.hop_length
+
+
+FEATURE_REGISTRY = {}
+
+
+def register_feature(name: str):
+    """Register a feature function (extractor, context) -> {output_key: value}"""
+    def decorator(func):
+        FEATURE_REGISTRY[name] = func
+        return func
+    return decorator
+
+
+@register_feature('mfcc')
+def mfcc_feature(extractor, context: SpectralContext) -> Dict:
+    """MFCC - Spectral shape (captures voice characteristics)"""
+    mfcc = librosa.feature.mfcc(S=context.mel_db, n_mfcc=extractor.n_mfcc)
+    return {'mfcc': mfcc.T.tolist()}  # Transpose for time-major
+
+
+@register_feature('spectral_centroid')
+def spectral_centroid_feature(extractor, context: SpectralContext) -> Dict:
+    """Spectral Centroid - Brightness"""
+    centroid = librosa.feature.spectral_centroid(S=context.magnitude, sr=context.sample_rate,
+                                                 n_fft=context.n_fft)[0]
+    return {'spectral_centroid': centroid.tolist()}
+
+
+@register_feature('zero_crossing_rate')
+def zero_crossing_rate_feature(extractor, context: SpectralContext) -> Dict:
+    """Zero Crossing Rate - Speech texture (time domain, no STFT)"""
+    zcr = librosa.feature.zero_crossing_rate(context.audio, frame_length=context.n_fft,
+                                             hop_length=context.hop_length, center=context.center)[0]
+    return {'zero_crossing_rate': zcr.tolist()}
+
+
+@register_feature('rms_energy')
+def rms_energy_feature(extractor, context: SpectralContext) -> Dict:
+    """RMS Energy - Volume/intensity (time domain, no STFT)"""
+    rms = librosa.feature.rms(y=context.audio, frame_length=context.n_fft,
+                              hop_length=context.hop_length, center=context.center)[0]
+    return {'rms_energy': rms.tolist()}
+
+
+@register_feature('chroma')
+def chroma_feature(extractor, context: SpectralContext) -> Dict:
+    """Chroma - Harmonic content"""
+    if context.tuning is None:
+        context.tuning = float(librosa.estimate_tuning(S=context.power, sr=context.sample_rate,
+                                                       bins_per_octave=extractor.n_chroma))
+    chroma = librosa.feature.chroma_stft(S=context.power, sr=context.sample_rate,
+                                         n_chroma=extractor.n_chroma, tuning=context.tuning)
+    return {'chroma': chroma.T.tolist()}
+
+
+@register_feature('tempo')
+def tempo_feature(extractor, context: SpectralContext) -> Dict:
+    """Tempo and beat tracking"""
+    tempo, beats = librosa.beat.beat_track(onset_envelope=context.onset_envelope(np.median),
+                                           sr=context.sample_rate, hop_length=context.hop_length)
+    # Newer librosa returns tempo as a one-element array
+    return {'tempo': float(np.atleast_1d(tempo)[0]), 'beat_frames': beats.tolist()}
+
+
+@register_feature('onsets')
+def onsets_feature(extractor, context: SpectralContext) -> Dict:
+    """Onset detection - Major acoustic events"""
+    onsets = librosa.onset.onset_detect(onset_envelope=context.onset_envelope(),
+                                        sr=context.sample_rate, hop_length=context.hop_length,
+                                        units='time')
+    return {'onsets': onsets.tolist()}
+
+
+# Features that only depend on their own frame (usable in streaming)
+FRAME_FEATURES = ('mfcc', 'spectral_centroid', 'zero_crossing_rate', 'rms_energy', 'chroma')
+DEFAULT_FEATURES = FRAME_FEATURES + ('tempo', 'onsets')
+
+# Computed inside each shard; the mel features need the whole log-mel
+# spectrogram because its 80 dB floor follows the loudest frame
+SHARD_FEATURES = ('spectral_centroid', 'zero_crossing_rate', 'rms_energy')
+MEL_FEATURES = ('mfcc', 'tempo', 'onsets')
+
+# Shorter recordings are not worth a process pool
+MIN_SHARD_FRAMES = 600
+
+# Bump whenever feature values or layout change (invalidates FeatureCache entries)
+FEATURE_VERSION = 2
+
+
+def _extract_shard(padded: np.ndarray, extractor, start: int, end: int, n_fft: int,
+                   feature_names: Tuple[str, ...], tuning: Optional[float] = None,
+                   with_mel: bool = False, with_pitches: bool = False) -> Dict:
+    """
+    Registry features for frames [start, end) of the centre-padded signal
+    
+    Optionally also returns the mel power spectrogram and the piptrack
+    peaks, so the parent can apply the global dB floor and tuning estimate.
+    """
+    hop_length = extractor.hop_length
+    buffer = padded[start * hop_length:(end - 1) * hop_length + n_fft]
+    context = SpectralContext(buffer, extractor.sample_rate, hop_length,
+                              n_fft=n_fft, center=False, tuning=tuning)
+    
+    result = {}
+    for name in feature_names:
+        result.update(FEATURE_REGISTRY[name](extractor, context))
+    if with_mel:
+        result['mel_power'] = librosa.feature.melspectrogram(S=context.power, sr=context.sample_rate)
+    if with_pitches:
+        pitch, magnitude = librosa.piptrack(S=context.power, sr=context.sample_rate, n_fft=n_fft)
+        mask = pitch > 0
+        result['pitches'] = pitch[mask]
+        result['pitch_magnitudes'] = magnitude[mask]
+    return result
+
 
 class AudioExtractor:
     def __init__(self, 
@@ -30,9 +192,27 @@ class AudioExtractor:
         self.hop_length = hop_length
         self.n_mfcc = n_mfcc
         self.n_chroma = n_chroma
+        self._stream_tuning = None
+        
+    def cache_params(self) -> Dict:
+        """Everything besides the media that shapes the output"""
+        return {
+            'sample_rate': self.sample_rate,
+            'hop_length': self.hop_length,
+            'n_mfcc': self.n_mfcc,
+            'n_chroma': self.n_chroma,
+            'features': list(DEFAULT_FEATURES)
+        }
+    
+    def extract_from_file(self, audio_file: str, workers: int = 1,
+                          cache: Optional[FeatureCache] = None) -> Dict:
+        """Extract all audio features from file (served from cache when unchanged)"""
+        if cache is not None:
+            # librosa upgrades can change the numbers, so its version is part of the key
+            version = f"{FEATURE_VERSION}/librosa-{librosa.__version__}"
+            return cache.get_or_compute(audio_file, 'audio', version, self.cache_params(),
+                                        lambda: self.extract_from_file(audio_file, workers))
         
-    def extract_from_file(self, audio_file: str) -> Dict:
-        """Extract all audio features from file"""
         print(f"Loading audio: {audio_file}")
         
         # Load audio
@@ -43,10 +223,19 @@ class AudioExtractor:
         except Exception as e:
             raise Exception(f"Failed to load audio: {e}")
             
-        return self.extract_features(audio)
+        return self.extract_features(audio, workers=workers)
     
-    def extract_features(self, audio: np.ndarray) -> Dict:
-        """Extract comprehensive audio features"""
+    def extract_features(self, audio: np.ndarray,
+                         feature_names: Optional[Iterable[str]] = None,
+                         workers: int = 1) -> Dict:
+        """
+        Extract audio features from one shared spectrogram
+        
+        Args:
+            audio: Mono signal at self.sample_rate
+            feature_names: Registry features to compute (default: all of DEFAULT_FEATURES)
+            workers: Processes to split the frames across (see extract_parallel)
+        """
         
         features = {
             'metadata': {
@@ -60,66 +249,15 @@ class AudioExtractor:
         
         print("Extracting audio features...")
         
-        # 1. MFCC - Spectral shape (captures voice characteristics)
-        mfcc = librosa.feature.mfcc(
-            y=audio, 
-            sr=self.sample_rate,
-            n_mfcc=self.n_mfcc,
-            hop_length=self.hop_length
-        )
-        features['features']['mfcc'] = mfcc.T.tolist()  # Transpose for time-major
-        
-        # 2. Spectral Centroid - Brightness/brightness
-        spectral_centroid = librosa.feature.spectral_centroid(
-            y=audio,
-            sr=self.sample_rate, 
-            hop_length=self.hop_length
-        )[0]
-        features['features']['spectral_centroid'] = spectral_centroid.tolist()
-        
-        # 3. Zero Crossing Rate - Speech texture
-        zcr = librosa.feature.zero_crossing_rate(
-            audio,
-            hop_length=self.hop_length
-        )[0]
-        features['features']['zero_crossing_rate'] = zcr.tolist()
-        
-        # 4. RMS Energy - Volume/intensity
-        rms = librosa.feature.rms(
-            y=audio,
-            hop_length=self.hop_length
-        )[0]
-        features['features']['rms_energy'] = rms.tolist()
-        
-        # 5. Chroma - Harmonic content
-        chroma = librosa.feature.chroma_stft(
-            y=audio,
-            sr=self.sample_rate,
-            n_chroma=self.n_chroma,
-            hop_length=self.hop_length
-        )
-        features['features']['chroma'] = chroma.T.tolist()
-        
-        # 6. Tempo and beat tracking
-        tempo, beats = librosa.beat.beat_track(
-            y=audio,
-            sr=self.sample_rate,
-            hop_length=self.hop_length
-        )
-        features['features']['tempo'] = float(tempo)
-        features['features']['beat_frames'] = beats.tolist()
-        
-        # 7. Onset detection - Major acoustic events
-        onsets = librosa.onset.onset_detect(
-            y=audio,
-            sr=self.sample_rate,
-            hop_length=self.hop_length,
-            units='time'
-        )
-        features['features']['onsets'] = onsets.tolist()
+        context = SpectralContext(audio, self.sample_rate, self.hop_length)
+        if workers > 1 and context.num_frames >= 2 * MIN_SHARD_FRAMES:
+            features['features'] = self.extract_parallel(context, feature_names or DEFAULT_FEATURES, workers)
+        else:
+            for name in feature_names or DEFAULT_FEATURES:
+                features['features'].update(FEATURE_REGISTRY[name](self, context))
         
         # Generate timestamps for each frame
-        num_frames = len(features['features']['rms_energy'])
+        num_frames = context.num_frames
         timestamps = [i * self.hop_length / self.sample_rate for i in range(num_frames)]
         features['timestamps'] = timestamps
         features['metadata']['num_frames'] = num_frames
@@ -127,13 +265,173 @@ class AudioExtractor:
         print(f"Extracted {num_frames} feature frames at 10Hz")
         return features
     
-    def create_dense_vectors(self, features: Dict) -> List[Dict]:
+    def extract_parallel(self, context: SpectralContext, feature_names: Iterable[str],
+                         workers: int) -> Dict:
+        """
+        Compute registry features over time shards in worker processes
+        
+        The centre-padded signal is placed in shared memory once; each shard
+        reads its frames plus the n_fft - hop_length samples of overlap with
+        the next shard. Frame-local features are stitched in shard order. The
+        mel power spectrogram and piptrack peaks are gathered so the global
+        dB floor (mfcc, tempo, onsets) and chroma tuning come out exactly as
+        in a single pass; chroma then needs a second sharded pass with that
+        tuning. Zero crossing rate pads with edge samples rather than zeros,
+        so the few frames overlapping either end are recomputed here.
+        """
+        feature_names = tuple(feature_names)
+        n_fft = context.n_fft
+        pad = n_fft // 2
+        padded = np.pad(context.audio, pad)
+        shards = plan_shards(context.num_frames, min(workers, context.num_frames // MIN_SHARD_FRAMES))
+        
+        shard_names = tuple(name for name in feature_names if name in SHARD_FEATURES)
+        with_mel = any(name in MEL_FEATURES for name in feature_names)
+        with_pitches = 'chroma' in feature_names
+        
+        with SharedSamples(padded, workers) as shared:
+            first_pass = shared.map(_extract_shard, [
+                (self, start, end, n_fft, shard_names, None, with_mel, with_pitches)
+                for start, end in shards
+            ])
+            
+            if with_pitches:
+                # Same threshold and histogram as librosa.estimate_tuning
+                pitches = np.concatenate([shard['pitches'] for shard in first_pass])
+                magnitudes = np.concatenate([shard['pitch_magnitudes'] for shard in first_pass])
+                threshold = np.median(magnitudes) if len(magnitudes) else 0.0
+                context.tuning = float(librosa.pitch_tuning(pitches[magnitudes >= threshold],
+                                                            bins_per_octave=self.n_chroma))
+                second_pass = shared.map(_extract_shard, [
+                    (self, start, end, n_fft, ('chroma',), context.tuning)
+                    for start, end in shards
+                ])
+                for shard, chroma in zip(first_pass, second_pass):
+                    shard.update(chroma)
+        
+        if with_mel:
+            mel_power = np.concatenate([shard['mel_power'] for shard in first_pass], axis=1)
+            context.__dict__['mel_db'] = librosa.power_to_db(mel_power)
+        
+        stitched = {}
+        for name in feature_names:
+            if name in SHARD_FEATURES or name == 'chroma':
+                stitched[name] = [value for shard in first_pass for value in shard[name]]
+            else:
+                stitched.update(FEATURE_REGISTRY[name](self, context))
+        
+        if 'zero_crossing_rate' in stitched:
+            self.fix_edge_zcr(context, stitched['zero_crossing_rate'])
+        
+        return stitched
+    
+    def fix_edge_zcr(self, context: SpectralContext, zcr: List[float]):
+        """Recompute ZCR for frames whose window extends past either end of the signal"""
+        
+        n_fft, hop = context.n_fft, self.hop_length
+        pad = n_fft // 2
+        num_frames = len(zcr)
+        edge = -(-pad // hop)
+        
+        # Head: frames 0..edge-1 from a centred slice long enough for them
+        head = context.audio[:edge * hop + n_fft]
+        head_zcr = librosa.feature.zero_crossing_rate(head, frame_length=n_fft, hop_length=hop)[0]
+        for i in range(min(edge, num_frames)):
+            zcr[i] = float(head_zcr[i])
+        
+        # Tail: start the slice on a hop boundary far enough back that the
+        # frames of interest don't see its leading padding
+        first_tail = min(num_frames, max(0, (len(context.audio) + pad - n_fft) // hop + 1))
+        start_frame = max(0, first_tail - edge)
+        tail = context.audio[start_frame * hop:]
+        tail_zcr = librosa.feature.zero_crossing_rate(tail, frame_length=n_fft, hop_length=hop)[0]
+        for i in range(first_tail, num_frames):
+            zcr[i] = float(tail_zcr[i - start_frame])
+    
+    def block_features(self, buffer: np.ndarray, frame_index: int, n_fft: int) -> Dict:
+        """Frame-level features for an already padded block (no centering)"""
+        
+        context = SpectralContext(buffer, self.sample_rate, self.hop_length,
+                                  n_fft=n_fft, center=False, tuning=self._stream_tuning)
+        
+        block = {}
+        for name in FRAME_FEATURES:
+            block.update(FEATURE_REGISTRY[name](self, context))
+        self._stream_tuning = context.tuning
+        
+        num_frames = context.num_frames
+        return {
+            'metadata': {'num_frames': num_frames},
+            'timestamps': [(frame_index + i) * self.hop_length / self.sample_rate for i in range(num_frames)],
+            'features': block
+        }
+    
+    def stream_features(self, blocks: Iterable[np.ndarray], n_fft: int = 2048) -> Iterator[Dict]:
+        """
+        Compute per-frame features block by block
+        
+        Frames line up with the centered frames of extract_features: the
+        stream is zero-padded by n_fft // 2 at both ends, and samples needed
+        by the next frame are carried over between blocks. Chroma tuning is
+        estimated once from the first block. Tempo, beats and onsets need the
+        whole recording and are not produced here.
+        """
+        pad = n_fft // 2
+        buffer = np.zeros(pad, dtype=np.float32)
+        frame_index = 0
+        self._stream_tuning = None
+        
+        def complete_frames(buffer):
+            if len(buffer) < n_fft:
+                return 0
+            return 1 + (len(buffer) - n_fft) // self.hop_length
+        
+        for block in blocks:
+            buffer = np.concatenate((buffer, np.asarray(block, dtype=np.float32)))
+            num_frames = complete_frames(buffer)
+            if num_frames == 0:
+                continue
+            
+            yield self.block_features(buffer[:(num_frames - 1) * self.hop_length + n_fft], frame_index, n_fft)
+            frame_index += num_frames
+            buffer = buffer[num_frames * self.hop_length:]
+        
+        # Trailing centre padding flushes the last frames
+        buffer = np.concatenate((buffer, np.zeros(pad, dtype=np.float32)))
+        num_frames = complete_frames(buffer)
+        if num_frames:
+            yield self.block_features(buffer[:(num_frames - 1) * self.hop_length + n_fft], frame_index, n_fft)
+    
+    def stream_vectors(self, audio_file: str, block_seconds: float = 60.0,
+                       speech_intervals: Optional[List[Dict]] = None) -> Iterator[Dict]:
+        """
+        Yield 28-d dense vectors with memory bounded by the block size
+        
+        Args:
+            audio_file: WAV at the target sample rate, or any file ffmpeg can
+                decode (resampled to the target rate in the same pipe)
+            block_seconds: Audio read per block (peak memory is proportional to this)
+            speech_intervals: Only yield frames inside these intervals (see EnergyZcrVAD)
+        """
+        _, blocks = audio_blocks(audio_file, block_seconds, self.sample_rate)
+        
+        # librosa works on [-1, 1] floats; audio_io returns the 16-bit range
+        blocks = (block / 32768.0 for block in blocks)
+        
+        for block_features in self.stream_features(blocks):
+            yield from self.create_dense_vectors(block_features, speech_intervals)
+    
+    def create_dense_vectors(self, features: Dict,
+                             speech_intervals: Optional[List[Dict]] = None) -> List[Dict]:
         """Create dense vectors combining all features for each time frame"""
         
         vectors = []
         num_frames = features['metadata']['num_frames']
+        frame_indices = range(num_frames)
+        if speech_intervals is not None:
+            frame_indices = np.flatnonzero(speech_mask(features['timestamps'], speech_intervals))
         
-        for i in range(num_frames):
+        for i in frame_indices:
             vector = {
                 'timestamp': features['timestamps'][i],
                 'features': {
@@ -159,13 +457,8 @@ class AudioExtractor:
         return vectors
     
     def save_features(self, features: Dict, output_file: str):
-        """Save features to JSON file"""
-        output_path = Path(output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(output_file, 'w') as f:
-            json.dump(features, f, indent=2)
-            
+        """Save features as a binary feature file (typed arrays + JSON header)"""
+        save_features(features, output_file)
         print(f"Features saved to: {output_file}")
 
 def main():
@@ -176,7 +469,7 @@ def main():
     audio_file = "/home/jonclaude/Agents/Claude on Studio/Woodside-Animation/conversation_audio.wav"
     
     if Path(audio_file).exists():
-        features = extractor.extract_from_file(audio_file)
+        features = extractor.extract_from_file(audio_file, cache=FeatureCache())
         vectors = extractor.create_dense_vectors(features)
         
         print(f"\nExtraction complete:")
@@ -187,7 +480,7 @@ def main():
         print(f"- Last vector timestamp: {vectors[-1]['timestamp']:.1f}s")
         
         # Save to analysis directory
-        output_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/audio_features.json"
+        output_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/audio_features.npz"
         extractor.save_features(features, output_file)
         
     else:
@@ -1,56 +1,557 @@
 #!/usr/bin/env python3
 """
 VectorVault Basic Audio Extractor
-Basic audio feature extraction using built-in Python libraries
+Basic audio feature extraction using NumPy only (no librosa)
 """
 
-import wave
-import math
+import itertools
 import json
-import struct
+from collections import deque
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from audio_io import audio_blocks, read_media, read_wav
+from audio_shards import SharedSamples, plan_shards
+from feature_cache import FeatureCache
+from feature_file import save_features
+
+# Frames processed per vectorized block; bounds temporary memory
+FRAME_BLOCK = 4096
+
+# Bump whenever feature values or layout change (invalidates FeatureCache entries)
+FEATURE_VERSION = 2
+
+
+def frame_matrix(audio_data: np.ndarray, window_samples: int, num_windows: int) -> np.ndarray:
+    """Strided (num_windows, window_samples) view of the signal, no copy"""
+    audio_data = np.asarray(audio_data)
+    if num_windows == 0:
+        return np.zeros((0, window_samples), dtype=audio_data.dtype)
+    return np.lib.stride_tricks.sliding_window_view(
+        audio_data[:num_windows * window_samples], window_samples
+    )[::window_samples]
+
+
+def compute_frame_features(frames: np.ndarray, prev_rms: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    Compute all per-window features for a frame matrix at once
+    
+    Args:
+        frames: (num_frames, window_samples) matrix of samples
+        prev_rms: RMS of the window preceding the first frame, if any
+    """
+    num_frames, window_samples = frames.shape
+    mid_point = window_samples // 2
+    
+    rms = np.empty(num_frames)
+    peak = np.empty(num_frames)
+    zcr = np.empty(num_frames)
+    centroid = np.empty(num_frames)
+    
+    for start in range(0, num_frames, FRAME_BLOCK):
+        block = frames[start:start + FRAME_BLOCK].astype(np.float64)
+        rows = slice(start, start + len(block))
+        magnitude = np.abs(block)
+        
+        # 1. RMS Energy
+        rms[rows] = np.sqrt(np.einsum('ij,ij->i', block, block) / window_samples)
+        
+        # 2. Peak Amplitude
+        peak[rows] = magnitude.max(axis=1)
+        
+        # 3. Zero Crossing Rate (sign flips between consecutive samples)
+        positive = block >= 0
+        zcr[rows] = np.count_nonzero(positive[:, 1:] != positive[:, :-1], axis=1) / window_samples
+        
+        # 4. Simple spectral centroid approximation
+        # High-frequency vs low-frequency energy ratio
+        low_energy = magnitude[:, :mid_point].sum(axis=1)
+        high_energy = magnitude[:, mid_point:].sum(axis=1)
+        centroid[rows] = high_energy / (low_energy + high_energy + 1)
+    
+    # 5. Energy ratio compared to previous window
+    previous = np.concatenate(([prev_rms if prev_rms is not None else 0.0], rms[:-1]))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        energy_ratio = np.where(previous > 0, rms / (previous + 1), 1.0)
+    
+    return {
+        'rms_energy': rms,
+        'peak_amplitude': peak,
+        'zero_crossing_rate': zcr,
+        'spectral_centroid_approx': centroid,
+        'energy_ratio': energy_ratio
+    }
+
+
+# (feature name, low Hz, high Hz); None means up to Nyquist
+SPECTRAL_BANDS = (
+    ('band_energy_low', 0, 300),
+    ('band_energy_low_mid', 300, 1000),
+    ('band_energy_high_mid', 1000, 3000),
+    ('band_energy_high', 3000, None)
+)
+SPECTRAL_FEATURES = ('spectral_centroid', 'spectral_rolloff', 'spectral_flatness') + \
+    tuple(name for name, _, _ in SPECTRAL_BANDS)
+
+
+def compute_spectral_features(frames: np.ndarray, sample_rate: int,
+                              rolloff_percent: float = 0.85) -> Dict[str, np.ndarray]:
+    """
+    True spectral features for every frame from one batched real FFT
+    
+    Args:
+        frames: (num_frames, window_samples) matrix of samples
+        sample_rate: Sample rate in Hz
+        rolloff_percent: Energy fraction below the rolloff frequency
+    """
+    num_frames, window_samples = frames.shape
+    freqs = np.fft.rfftfreq(window_samples, d=1.0 / sample_rate)
+    window = np.hanning(window_samples)
+    
+    centroid = np.empty(num_frames)
+    rolloff = np.empty(num_frames)
+    flatness = np.empty(num_frames)
+    bands = {name: np.empty(num_frames) for name, _, _ in SPECTRAL_BANDS}
+    band_masks = {
+        name: (freqs >= low) & (freqs < (high if high is not None else np.inf))
+        for name, low, high in SPECTRAL_BANDS
+    }
+    
+    for start in range(0, num_frames, FRAME_BLOCK):
+        block = frames[start:start + FRAME_BLOCK].astype(np.float64)
+        rows = slice(start, start + len(block))
+        
+        magnitude = np.abs(np.fft.rfft(block * window, axis=1))
+        power = magnitude ** 2
+        total_magnitude = magnitude.sum(axis=1)
+        total_power = power.sum(axis=1)
+        silent = total_power <= 0
+        
+        # 1. Spectral centroid: magnitude-weighted mean frequency (Hz)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            centroid[rows] = np.where(silent, 0.0, (magnitude @ freqs) / total_magnitude)
+        
+        # 2. Rolloff: frequency below which rolloff_percent of the energy lies
+        cumulative = np.cumsum(power, axis=1)
+        threshold = rolloff_percent * total_power
+        rolloff_bin = (cumulative < threshold[:, None]).sum(axis=1)
+        rolloff[rows] = np.where(silent, 0.0, freqs[np.minimum(rolloff_bin, len(freqs) - 1)])
+        
+        # 3. Flatness: geometric / arithmetic mean of the power spectrum
+        clipped = np.maximum(power, 1e-10)
+        flatness[rows] = np.exp(np.log(clipped).mean(axis=1)) / clipped.mean(axis=1)
+        
+        # 4. Band energies as fractions of total power
+        for name, mask in band_masks.items():
+            with np.errstate(divide='ignore', invalid='ignore'):
+                bands[name][rows] = np.where(silent, 0.0, power[:, mask].sum(axis=1) / total_power)
+    
+    features = {
+        'spectral_centroid': centroid,
+        'spectral_rolloff': rolloff,
+        'spectral_flatness': flatness
+    }
+    features.update(bands)
+    return features
+
+
+def _extract_shard(audio_data: np.ndarray, sample_rate: int, window_samples: int,
+                   spectral: bool, start: int, end: int) -> Dict[str, np.ndarray]:
+    """Features for frames [start, end); reads one extra frame for energy_ratio"""
+    prev_rms = None
+    if start > 0:
+        previous = frame_matrix(audio_data[(start - 1) * window_samples:start * window_samples], window_samples, 1)
+        prev_rms = float(compute_frame_features(previous)['rms_energy'][0])
+    
+    frames = frame_matrix(audio_data[start * window_samples:end * window_samples], window_samples, end - start)
+    frame_features = compute_frame_features(frames, prev_rms)
+    if spectral:
+        frame_features.update(compute_spectral_features(frames, sample_rate))
+    return frame_features
+
+
+class FrameFeatureStream:
+    def __init__(self, sample_rate: int, window_size: float = 0.1, spectral: bool = False):
+        """
+        Incremental version of BasicAudioExtractor.extract_features
+        
+        Args:
+            sample_rate: Sample rate of the pushed audio
+            window_size: Analysis window size in seconds
+            spectral: Also compute FFT spectral features
+        """
+        self.sample_rate = sample_rate
+        self.window_size = window_size
+        self.spectral = spectral
+        self.window_samples = int(sample_rate * window_size)
+        self.carry = np.zeros(0, dtype=np.float32)
+        self.frame_index = 0
+        self.prev_rms = None
+        
+    def push(self, samples: np.ndarray) -> Dict:
+        """Add samples and return features for every window completed by them"""
+        
+        # Samples that did not fill a window are carried into the next block
+        buffer = np.concatenate((self.carry, np.asarray(samples, dtype=np.float32)))
+        num_windows = len(buffer) // self.window_samples
+        
+        frames = frame_matrix(buffer, self.window_samples, num_windows)
+        frame_features = compute_frame_features(frames, self.prev_rms)
+        if self.spectral:
+            frame_features.update(compute_spectral_features(frames, self.sample_rate))
+        timestamps = (self.frame_index + np.arange(num_windows)) * self.window_size
+        
+        self.carry = buffer[num_windows * self.window_samples:].copy()
+        self.frame_index += num_windows
+        if num_windows:
+            self.prev_rms = float(frame_features['rms_energy'][-1])
+        
+        return {
+            'metadata': {'num_frames': num_windows, 'sample_rate': self.sample_rate},
+            'timestamps': timestamps.tolist(),
+            'features': {name: values.tolist() for name, values in frame_features.items()}
+        }
+
+class EnergyZcrVAD:
+    def __init__(self,
+                 window_size: float = 0.03,
+                 energy_margin_db: float = 12.0,
+                 zcr_margin_db: float = 6.0,
+                 zcr_threshold: float = 0.15,
+                 noise_percentile: float = 10.0,
+                 min_speech: float = 0.25,
+                 min_silence: float = 0.3,
+                 padding: float = 0.2):
+        """
+        Initialize voice activity detector
+        
+        A frame is speech when its RMS level is energy_margin_db above the
+        noise floor (the noise_percentile of all frame levels), or when it is
+        zcr_margin_db above the floor with a high zero-crossing rate, which
+        catches quiet unvoiced consonants (s, f, th).
+        
+        Args:
+            window_size: Analysis frame length in seconds
+            energy_margin_db: Level above the noise floor that counts as speech
+            zcr_margin_db: Lower level margin for frames with a high ZCR
+            zcr_threshold: Zero-crossing rate marking unvoiced speech
+            noise_percentile: Percentile of frame levels taken as the noise floor
+            min_speech: Drop speech runs shorter than this (seconds)
+            min_silence: Bridge pauses shorter than this (seconds)
+            padding: Extend every interval by this much on both sides (seconds)
+        """
+        self.window_size = window_size
+        self.energy_margin_db = energy_margin_db
+        self.zcr_margin_db = zcr_margin_db
+        self.zcr_threshold = zcr_threshold
+        self.noise_percentile = noise_percentile
+        self.min_speech = min_speech
+        self.min_silence = min_silence
+        self.padding = padding
+    
+    def frame_decisions(self, rms_energy: np.ndarray, zero_crossing_rate: np.ndarray,
+                        noise_floor: Optional[float] = None) -> np.ndarray:
+        """Per-frame speech / non-speech decision (noise floor from these frames unless given)"""
+        
+        level_db = frame_level_db(rms_energy)
+        zcr = np.asarray(zero_crossing_rate, dtype=np.float64)
+        if len(level_db) == 0:
+            return np.zeros(0, dtype=bool)
+        
+        if noise_floor is None:
+            noise_floor = np.percentile(level_db, self.noise_percentile)
+        voiced = level_db > noise_floor + self.energy_margin_db
+        unvoiced = (level_db > noise_floor + self.zcr_margin_db) & (zcr > self.zcr_threshold)
+        return voiced | unvoiced
+    
+    def decisions_to_intervals(self, speech: np.ndarray, duration: float) -> List[Dict]:
+        """Turn frame decisions into padded, merged speech intervals"""
+        
+        # Run boundaries (frame numbers) from the edges of the 0/1 sequence; gaps and
+        # lengths are compared in whole frames so a shifted copy decides the same
+        edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        
+        intervals = []
+        for start, end in zip(starts, ends):
+            if intervals and (start - intervals[-1][1]) * self.window_size < self.min_silence:
+                intervals[-1][1] = end
+            else:
+                intervals.append([start, end])
+        
+        table = []
+        last_end = None
+        for start, end in intervals:
+            if (end - start) * self.window_size < self.min_speech:
+                continue
+            if last_end is not None and (start - last_end) * self.window_size <= 2 * self.padding:
+                table[-1]['end'] = round(float(min(duration, end * self.window_size + self.padding)), 3)
+            else:
+                table.append({'start': round(float(max(0.0, start * self.window_size - self.padding)), 3),
+                              'end': round(float(min(duration, end * self.window_size + self.padding)), 3)})
+            last_end = end
+        
+        for interval in table:
+            interval['duration'] = round(interval['end'] - interval['start'], 3)
+        return table
+    
+    def detect(self, audio_data: np.ndarray, sample_rate: int) -> List[Dict]:
+        """Speech intervals of an in-memory signal"""
+        
+        window_samples = int(sample_rate * self.window_size)
+        num_windows = len(audio_data) // window_samples
+        frames = compute_frame_features(frame_matrix(audio_data, window_samples, num_windows))
+        
+        speech = self.frame_decisions(frames['rms_energy'], frames['zero_crossing_rate'])
+        return self.decisions_to_intervals(speech, len(audio_data) / sample_rate)
+    
+    def detect_file(self, media_file: str, sample_rate: Optional[int] = None,
+                    block_seconds: float = 60.0) -> List[Dict]:
+        """Speech intervals of a WAV or any ffmpeg-decodable file, read in blocks"""
+        
+        sample_rate, blocks = audio_blocks(media_file, block_seconds, sample_rate)
+        stream = FrameFeatureStream(sample_rate, self.window_size, spectral=False)
+        
+        rms, zcr = [], []
+        for block in blocks:
+            block_features = stream.push(block)
+            rms.extend(block_features['features']['rms_energy'])
+            zcr.extend(block_features['features']['zero_crossing_rate'])
+        
+        speech = self.frame_decisions(np.array(rms), np.array(zcr))
+        return self.decisions_to_intervals(speech, len(rms) * self.window_size)
+
+
+class StreamingVAD:
+    def __init__(self, sample_rate: int, vad: Optional[EnergyZcrVAD] = None, history_seconds: float = 300.0,
+                 warmup_seconds: float = 30.0):
+        """
+        Incremental EnergyZcrVAD for live audio
+        
+        The noise floor is the percentile over the last history_seconds of
+        frame levels instead of the whole file. No frame is decided before
+        warmup_seconds of levels are in, so speech at the very start is
+        judged against a settled floor rather than against itself. An
+        interval is only emitted once no later speech can be bridged or
+        padded onto it, so the emitted table is the one detect() builds from
+        the same decisions; the interval still in progress is available as
+        open_interval.
+        
+        Args:
+            sample_rate: Sample rate of the pushed audio
+            vad: Detector whose thresholds and timing rules to apply
+            history_seconds: Window of frame levels used for the noise floor
+            warmup_seconds: Frame levels collected before the first decision
+        """
+        self.vad = vad or EnergyZcrVAD()
+        self.window_size = self.vad.window_size
+        self.stream = FrameFeatureStream(sample_rate, self.window_size, spectral=False)
+        self.levels = deque(maxlen=max(1, int(history_seconds / self.window_size)))
+        self.warmup_frames = int(warmup_seconds / self.window_size)
+        
+        # Frames seen but not decided yet (warm-up)
+        self.held_rms = []
+        self.held_zcr = []
+        
+        # Decisions from tail_frame on; everything before is already emitted
+        self.decisions = np.zeros(0, dtype=bool)
+        self.tail_frame = 0
+        self.open_interval = None
+        
+        # Speech this close after an interval's last speech frame can still join it
+        # (bridged when under min_silence, merged when the paddings touch)
+        reach = max(self.vad.min_silence, 2 * self.vad.padding)
+        self.reach_frames = int(np.ceil(reach / self.window_size - 1e-9)) + 1
+    
+    @property
+    def duration(self) -> float:
+        """Seconds of audio decided so far (whole frames)"""
+        return (self.tail_frame + len(self.decisions)) * self.window_size
+    
+    def quietest_time(self, start: float, end: float) -> float:
+        """Middle of the lowest-level frame in [start, end), among the frames still in history"""
+        frames_seen = self.tail_frame + len(self.decisions) + len(self.held_rms)
+        first = frames_seen - len(self.levels)
+        lo = max(first, int(np.ceil(start / self.window_size)))
+        hi = min(frames_seen, int(end / self.window_size))
+        if hi <= lo:
+            return end
+        levels = np.fromiter(itertools.islice(self.levels, lo - first, hi - first), dtype=np.float64)
+        return round((lo + int(np.argmin(levels)) + 0.5) * self.window_size, 3)
+    
+    def push(self, samples: np.ndarray) -> List[Dict]:
+        """Add samples; returns the speech intervals that became final"""
+        
+        block = self.stream.push(samples)
+        if block['metadata']['num_frames']:
+            rms = block['features']['rms_energy']
+            self.levels.extend(frame_level_db(rms))
+            self.held_rms.extend(rms)
+            self.held_zcr.extend(block['features']['zero_crossing_rate'])
+            if self.tail_frame or len(self.decisions) or len(self.levels) >= self.warmup_frames:
+                self.decide()
+        
+        return self.collect(final=False)
+    
+    def flush(self) -> List[Dict]:
+        """End of stream: every remaining interval is final"""
+        self.decide()
+        return self.collect(final=True)
+    
+    def decide(self):
+        """Decide held frames against the current rolling noise floor"""
+        if not self.held_rms:
+            return
+        noise_floor = np.percentile(np.fromiter(self.levels, dtype=np.float64), self.vad.noise_percentile)
+        decisions = self.vad.frame_decisions(np.asarray(self.held_rms), self.held_zcr, noise_floor)
+        self.decisions = np.concatenate((self.decisions, decisions))
+        self.held_rms, self.held_zcr = [], []
+    
+    def collect(self, final: bool) -> List[Dict]:
+        tail_start = self.tail_frame * self.window_size
+        tail_duration = len(self.decisions) * self.window_size
+        intervals = self.vad.decisions_to_intervals(self.decisions, tail_duration)
+        
+        ready = []
+        for interval in intervals:
+            if not final:
+                # Final once the frames after its last speech frame are decided and silent
+                # for as far as anything could still join it (short runs count too: they
+                # may yet be bridged into a run long enough to keep)
+                last_speech = int(round((interval['end'] - self.vad.padding) / self.window_size))
+                horizon = last_speech + self.reach_frames
+                if horizon > len(self.decisions) or self.decisions[last_speech:horizon].any():
+                    break
+            ready.append({
+                'start': round(interval['start'] + tail_start, 3),
+                'end': round(interval['end'] + tail_start, 3),
+                'duration': interval['duration']
+            })
+        
+        pending = intervals[len(ready):]
+        self.open_interval = None
+        if pending:
+            self.open_interval = {
+                'start': round(pending[0]['start'] + tail_start, 3),
+                'end': round(pending[-1]['end'] + tail_start, 3)
+            }
+        
+        # Drop decisions nothing can refer back to any more
+        if ready:
+            drop = int(round((ready[-1]['end'] - tail_start) / self.window_size))
+        elif not pending:
+            keep = self.vad.min_speech + self.vad.padding + self.reach_frames * self.window_size
+            drop = max(0, len(self.decisions) - int(keep / self.window_size))
+        else:
+            drop = 0
+        drop = min(drop, len(self.decisions))
+        self.decisions = self.decisions[drop:]
+        self.tail_frame += drop
+        
+        return ready
+
+
+def frame_level_db(rms_energy) -> np.ndarray:
+    """Frame RMS (16-bit scale) in dB, as used for the VAD noise floor"""
+    return 20 * np.log10(np.asarray(rms_energy, dtype=np.float64) + 1e-3)
+
+
+def speech_mask(timestamps, intervals: List[Dict]) -> np.ndarray:
+    """True for each timestamp that falls inside a speech interval"""
+    
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    if not intervals:
+        return np.zeros(len(timestamps), dtype=bool)
+    
+    starts = np.array([interval['start'] for interval in intervals])
+    ends = np.array([interval['end'] for interval in intervals])
+    index = np.searchsorted(starts, timestamps, side='right') - 1
+    return (index >= 0) & (timestamps < ends[np.maximum(index, 0)])
+
+
+def save_intervals(intervals: List[Dict], output_file: str, source_file: str = ""):
+    """Save the speech-interval table to JSON"""
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    speech_time = sum(interval['duration'] for interval in intervals)
+    with open(output_file, 'w') as f:
+        json.dump({
+            'metadata': {
+                'source_file': source_file,
+                'num_intervals': len(intervals),
+                'speech_seconds': round(speech_time, 3)
+            },
+            'intervals': intervals
+        }, f, indent=2)
+    
+    print(f"Speech intervals saved: {output_file}")
+
 
 class BasicAudioExtractor:
-    def __init__(self, window_size: float = 0.1):
+    def __init__(self, window_size: float = 0.1, spectral: bool = False):
         """
         Initialize basic audio extractor
         
         Args:
             window_size: Analysis window size in seconds (default 0.1s = 10Hz)
+            spectral: Add FFT spectral centroid, rolloff, flatness and band energies
+                      (opt-in: dense vectors grow from 5 to 12 dimensions, so they
+                      no longer compare with 'audio' vectors already in the store)
         """
         self.window_size = window_size
+        self.spectral = spectral
+        
+    def cache_params(self) -> Dict:
+        """Everything besides the media that shapes the output"""
+        return {'window_size': self.window_size, 'spectral': self.spectral}
+    
+    def extract_from_wav(self, wav_file: str, workers: int = 1,
+                         cache: Optional[FeatureCache] = None) -> Dict:
+        """Extract basic features from WAV file (served from cache when unchanged)"""
+        if cache is not None:
+            return cache.get_or_compute(wav_file, 'audio_basic', FEATURE_VERSION, self.cache_params(),
+                                        lambda: self.extract_from_wav(wav_file, workers))
         
-    def extract_from_wav(self, wav_file: str) -> Dict:
-        """Extract basic features from WAV file"""
         print(f"Loading WAV file: {wav_file}")
         
-        with wave.open(wav_file, 'rb') as wav:
-            # Get WAV properties
-            sample_rate = wav.getframerate()
-            channels = wav.getnchannels()
-            frames = wav.getnframes()
-            duration = frames / sample_rate
-            
-            # Read audio data
-            raw_audio = wav.readframes(frames)
-            if channels == 2:
-                # Convert stereo to mono by taking every other sample
-                audio_data = []
-                for i in range(0, len(raw_audio), 4):  # 4 bytes = 2 samples of 16-bit
-                    if i + 3 < len(raw_audio):
-                        sample = struct.unpack('<h', raw_audio[i:i+2])[0]  # Left channel
-                        audio_data.append(sample)
-            else:
-                # Mono audio
-                audio_data = list(struct.unpack('<' + 'h' * (len(raw_audio) // 2), raw_audio))
+        # Samples are decoded straight from the mapped data chunk and
+        # downmixed across all channels
+        audio_data, sample_rate, header = read_wav(wav_file)
+        channels = header['channels']
+        duration = len(audio_data) / sample_rate
         
         print(f"Loaded {duration:.1f}s, {sample_rate}Hz, {channels} channels")
         
-        return self.extract_features(audio_data, sample_rate)
+        return self.extract_features(audio_data, sample_rate, workers)
+    
+    def extract_from_media(self, media_file: str, sample_rate: int = 16000, workers: int = 1,
+                           cache: Optional[FeatureCache] = None) -> Dict:
+        """Extract basic features from any container, decoded through an ffmpeg pipe"""
+        if cache is not None:
+            params = dict(self.cache_params(), sample_rate=sample_rate)
+            return cache.get_or_compute(media_file, 'audio_basic', FEATURE_VERSION, params,
+                                        lambda: self.extract_from_media(media_file, sample_rate, workers))
+        
+        print(f"Decoding audio: {media_file}")
+        
+        audio_data = read_media(media_file, sample_rate)
+        print(f"Loaded {len(audio_data) / sample_rate:.1f}s, {sample_rate}Hz, mono")
+        
+        return self.extract_features(audio_data, sample_rate, workers)
     
-    def extract_features(self, audio_data: List[int], sample_rate: int) -> Dict:
-        """Extract basic audio features"""
+    def extract_features(self, audio_data: np.ndarray, sample_rate: int, workers: int = 1) -> Dict:
+        """
+        Extract basic audio features
+        
+        Args:
+            audio_data: Mono samples
+            sample_rate: Sample rate in Hz
+            workers: Processes to split the frames across (output is identical for any value)
+        """
         
         window_samples = int(sample_rate * self.window_size)
         num_windows = len(audio_data) // window_samples
@@ -75,55 +576,61 @@ class BasicAudioExtractor:
         
         print(f"Extracting features from {num_windows} windows...")
         
-        for i in range(num_windows):
-            start_idx = i * window_samples
-            end_idx = min(start_idx + window_samples, len(audio_data))
-            window = audio_data[start_idx:end_idx]
-            timestamp = i * self.window_size
-            
-            features['timestamps'].append(timestamp)
-            
-            # 1. RMS Energy
-            rms = math.sqrt(sum(x*x for x in window) / len(window)) if window else 0
-            features['features']['rms_energy'].append(rms)
-            
-            # 2. Peak Amplitude  
-            peak = max(abs(x) for x in window) if window else 0
-            features['features']['peak_amplitude'].append(peak)
-            
-            # 3. Zero Crossing Rate
-            zero_crossings = 0
-            for j in range(1, len(window)):
-                if (window[j-1] >= 0) != (window[j] >= 0):
-                    zero_crossings += 1
-            zcr = zero_crossings / len(window) if window else 0
-            features['features']['zero_crossing_rate'].append(zcr)
-            
-            # 4. Simple spectral centroid approximation
-            # High-frequency vs low-frequency energy ratio
-            mid_point = len(window) // 2
-            low_energy = sum(abs(x) for x in window[:mid_point])
-            high_energy = sum(abs(x) for x in window[mid_point:])
-            centroid_approx = high_energy / (low_energy + high_energy + 1) if window else 0
-            features['features']['spectral_centroid_approx'].append(centroid_approx)
-            
-            # 5. Energy ratio compared to previous window
-            if i > 0:
-                prev_rms = features['features']['rms_energy'][i-1]
-                energy_ratio = rms / (prev_rms + 1) if prev_rms > 0 else 1
-            else:
-                energy_ratio = 1
-            features['features']['energy_ratio'].append(energy_ratio)
+        shards = plan_shards(num_windows, workers)
+        with SharedSamples(audio_data, workers) as shared:
+            shard_features = shared.map(_extract_shard, [
+                (sample_rate, window_samples, self.spectral, start, end) for start, end in shards
+            ])
+        
+        # Shards come back in frame order, so stitching is a concatenation
+        frame_features = {
+            name: np.concatenate([shard[name] for shard in shard_features])
+            for name in (shard_features[0] if shard_features else {})
+        }
+        
+        features['timestamps'] = (np.arange(num_windows) * self.window_size).tolist()
+        for name, values in frame_features.items():
+            features['features'][name] = values.tolist()
         
         return features
     
-    def create_vectors(self, features: Dict) -> List[Dict]:
-        """Create dense vectors for each time frame"""
+    def stream_features(self, blocks: Iterable[np.ndarray], sample_rate: int) -> Iterator[Dict]:
+        """Compute features block by block; yields one features dict per block"""
+        
+        stream = FrameFeatureStream(sample_rate, self.window_size, self.spectral)
+        for block in blocks:
+            block_features = stream.push(block)
+            if block_features['metadata']['num_frames']:
+                yield block_features
+    
+    def stream_vectors(self, media_file: str, block_seconds: float = 60.0,
+                       sample_rate: Optional[int] = None,
+                       speech_intervals: Optional[List[Dict]] = None) -> Iterator[Dict]:
+        """
+        Yield dense vectors from a WAV file or any container ffmpeg can decode,
+        with memory bounded by the block size
+        
+        Args:
+            media_file: WAV, MP4, MKV, ... (non-WAV input is piped through ffmpeg)
+            block_seconds: Audio read per block (peak memory is proportional to this)
+            sample_rate: Resample to this rate (default: WAV native rate, 16kHz otherwise)
+            speech_intervals: Only yield frames inside these intervals (see EnergyZcrVAD)
+        """
+        sample_rate, blocks = audio_blocks(media_file, block_seconds, sample_rate)
+        
+        for block_features in self.stream_features(blocks, sample_rate):
+            yield from self.create_vectors(block_features, speech_intervals)
+    
+    def create_vectors(self, features: Dict, speech_intervals: Optional[List[Dict]] = None) -> List[Dict]:
+        """Create dense vectors for each time frame (only speech frames when intervals are given)"""
         
         vectors = []
         num_frames = features['metadata']['num_frames']
+        frame_indices = range(num_frames)
+        if speech_intervals is not None:
+            frame_indices = np.flatnonzero(speech_mask(features['timestamps'], speech_intervals))
         
-        for i in range(num_frames):
+        for i in frame_indices:
             vector = {
                 'timestamp': features['timestamps'][i],
                 'features': {
@@ -144,19 +651,25 @@ class BasicAudioExtractor:
                 vector['features']['energy_ratio']
             ]
             
+            # FFT spectral features, normalized to [0, 1] by Nyquist
+            if 'spectral_centroid' in features['features']:
+                for name in SPECTRAL_FEATURES:
+                    vector['features'][name] = features['features'][name][i]
+                nyquist = features['metadata']['sample_rate'] / 2
+                dense_vector.extend([
+                    vector['features']['spectral_centroid'] / nyquist,
+                    vector['features']['spectral_rolloff'] / nyquist,
+                    vector['features']['spectral_flatness']
+                ] + [vector['features'][name] for name, _, _ in SPECTRAL_BANDS])
+            
             vector['dense_vector'] = dense_vector
             vectors.append(vector)
             
         return vectors
     
     def save_to_file(self, features: Dict, output_file: str):
-        """Save features to JSON"""
-        output_path = Path(output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(output_file, 'w') as f:
-            json.dump(features, f, indent=2)
-            
+        """Save features as a binary feature file (typed arrays + JSON header)"""
+        save_features(features, output_file)
         print(f"Features saved: {output_file}")
 
 def main():
@@ -170,23 +683,32 @@ def main():
         print("🎵 Starting VectorVault Audio Extraction...")
         
         # Extract features
-        features = extractor.extract_from_wav(audio_file)
-        vectors = extractor.create_vectors(features)
+        features = extractor.extract_from_wav(audio_file, cache=FeatureCache())
+        
+        # Only keep vectors for speech regions
+        speech_intervals = EnergyZcrVAD().detect_file(audio_file)
+        vectors = extractor.create_vectors(features, speech_intervals)
         
         print(f"\n📊 Extraction Results:")
         print(f"Duration: {features['metadata']['duration']:.1f} seconds")
-        print(f"Feature vectors: {len(vectors)}")
-        print(f"Vector dimensions: {len(vectors[0]['dense_vector'])}")
+        print(f"Speech intervals: {len(speech_intervals)}")
+        print(f"Feature vectors: {len(vectors)} of {features['metadata']['num_frames']} frames")
+        if vectors:
+            print(f"Vector dimensions: {len(vectors[0]['dense_vector'])}")
         print(f"Sampling rate: 10Hz (every 0.1 seconds)")
         
         # Save results
-        output_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/audio_vectors.json"
+        output_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/audio_vectors.npz"
         extractor.save_to_file({'features': features, 'vectors': vectors}, output_file)
+        save_intervals(speech_intervals, str(Path(output_file).parent / "speech_intervals.json"), audio_file)
         
         # Show sample data
-        print(f"\n🔍 Sample vector at {vectors[0]['timestamp']:.1f}s:")
-        for key, value in vectors[0]['features'].items():
-            print(f"  {key}: {value:.4f}")
+        if vectors:
+            print(f"\n🔍 Sample vector at {vectors[0]['timestamp']:.1f}s:")
+            for key, value in vectors[0]['features'].items():
+                print(f"  {key}: {value:.4f}")
+        else:
+            print("\n⚠️ No speech detected, no vectors kept")
             
     else:
         print(f"❌ Audio file not found: {audio_file}")
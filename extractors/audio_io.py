@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+VectorVault Audio I/O
+Vectorized WAV decoding and ffmpeg pipe decoding shared by the audio extractors
+"""
+
+import struct
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Everything is rescaled to the 16-bit range so features stay comparable
+INT16_SCALE = 32768.0
+
+
+def read_wav_header(f) -> Dict:
+    """Parse RIFF chunks up to the start of the data chunk"""
+
+    riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+    if riff not in (b'RIFF', b'RF64') or wave_id != b'WAVE':
+        raise Exception("Not a RIFF/WAVE file")
+
+    header = {}
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            raise Exception("WAV file has no data chunk")
+        chunk_id, chunk_size = struct.unpack('<4sI', chunk)
+
+        if chunk_id == b'fmt ':
+            fmt = f.read(chunk_size)
+            format_tag, channels, sample_rate, _, block_align, bits = struct.unpack('<HHIIHH', fmt[:16])
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+                # The real format is the first two bytes of the SubFormat GUID
+                format_tag = struct.unpack('<H', fmt[24:26])[0]
+            header.update({
+                'format_tag': format_tag,
+                'channels': channels,
+                'sample_rate': sample_rate,
+                'block_align': block_align,
+                'bits_per_sample': bits
+            })
+        elif chunk_id == b'data':
+            if 'format_tag' not in header:
+                raise Exception("WAV data chunk before fmt chunk")
+            header['data_offset'] = f.tell()
+            header['data_size'] = chunk_size
+            return header
+        else:
+            f.seek(chunk_size + (chunk_size & 1), 1)
+
+        if chunk_id == b'fmt ' and chunk_size & 1:
+            f.seek(1, 1)
+
+
+def pcm_dtype(format_tag: int, bits_per_sample: int):
+    """NumPy dtype used to view one sample, or None for packed 24-bit"""
+
+    if format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        if bits_per_sample == 32:
+            return np.dtype('<f4')
+        if bits_per_sample == 64:
+            return np.dtype('<f8')
+    elif format_tag == WAVE_FORMAT_PCM:
+        if bits_per_sample == 8:
+            return np.dtype('u1')
+        if bits_per_sample == 16:
+            return np.dtype('<i2')
+        if bits_per_sample == 24:
+            return None
+        if bits_per_sample == 32:
+            return np.dtype('<i4')
+
+    raise Exception(f"Unsupported WAV encoding: format {format_tag}, {bits_per_sample}-bit")
+
+
+def decode_pcm(raw, format_tag: int, bits_per_sample: int, channels: int) -> np.ndarray:
+    """Decode interleaved sample bytes to mono float32 in the 16-bit range"""
+
+    buffer = np.frombuffer(raw, dtype=np.uint8)
+    dtype = pcm_dtype(format_tag, bits_per_sample)
+
+    if dtype is None:
+        # 24-bit: assemble little-endian triplets and sign-extend
+        triplets = buffer[:len(buffer) - len(buffer) % 3].reshape(-1, 3).astype(np.int32)
+        samples = triplets[:, 0] | (triplets[:, 1] << 8) | (triplets[:, 2] << 16)
+        samples = (samples ^ 0x800000) - 0x800000
+        scale = 1.0 / 256.0
+        offset = 0.0
+    else:
+        samples = buffer[:len(buffer) - len(buffer) % dtype.itemsize].view(dtype)
+        if dtype.kind == 'f':
+            scale, offset = INT16_SCALE, 0.0
+        elif dtype.itemsize == 1:
+            scale, offset = 256.0, -128.0
+        elif dtype.itemsize == 2:
+            scale, offset = 1.0, 0.0
+        else:
+            scale, offset = 1.0 / 65536.0, 0.0
+
+    frames = len(samples) // channels
+    samples = samples[:frames * channels]
+
+    if channels > 1:
+        # True downmix: average all channels of each frame
+        mono = samples.reshape(frames, channels).mean(axis=1, dtype=np.float64).astype(np.float32)
+    else:
+        mono = samples.astype(np.float32)
+
+    if offset:
+        mono += offset
+    if scale != 1.0:
+        mono *= scale
+
+    return mono
+
+
+def read_wav(wav_file: str) -> Tuple[np.ndarray, int, Dict]:
+    """Read a WAV file as mono float32 samples in the 16-bit range"""
+
+    with open(wav_file, 'rb') as f:
+        header = read_wav_header(f)
+
+    # Map the data chunk instead of reading it, so decoding is the only copy
+    data_size = min(header['data_size'], Path(wav_file).stat().st_size - header['data_offset'])
+    raw = np.memmap(wav_file, dtype=np.uint8, mode='r',
+                    offset=header['data_offset'], shape=(data_size,)) if data_size > 0 else b''
+
+    audio = decode_pcm(raw, header['format_tag'], header['bits_per_sample'], header['channels'])
+    return audio, header['sample_rate'], header
+
+
+def iter_wav_blocks(wav_file: str, block_samples: int, start: float = 0.0,
+                    duration: Optional[float] = None) -> Iterator[np.ndarray]:
+    """Yield mono float32 blocks of at most block_samples frames, from start seconds on"""
+
+    with open(wav_file, 'rb') as f:
+        header = read_wav_header(f)
+        block_bytes = block_samples * header['block_align']
+
+        # Seek straight to the first frame instead of decoding everything before it
+        skip = int(start * header['sample_rate']) * header['block_align']
+        remaining = header['data_size'] - skip
+        if duration is not None:
+            remaining = min(remaining, int(duration * header['sample_rate']) * header['block_align'])
+        f.seek(header['data_offset'] + skip)
+
+        while remaining > 0:
+            raw = f.read(min(block_bytes, remaining))
+            if not raw:
+                break
+            remaining -= len(raw)
+            yield decode_pcm(raw, header['format_tag'], header['bits_per_sample'], header['channels'])
+
+
+def wav_info(wav_file: str) -> Dict:
+    """Read only the WAV header"""
+    with open(wav_file, 'rb') as f:
+        return read_wav_header(f)
+
+
+def iter_ffmpeg_blocks(media_file: str, sample_rate: int, block_samples: int, start: float = 0.0,
+                       duration: Optional[float] = None) -> Iterator[np.ndarray]:
+    """
+    Decode any container ffmpeg can read through an s16le stdout pipe
+    
+    ffmpeg downmixes to mono and resamples to sample_rate in the same pass;
+    samples arrive as mono float32 blocks in the 16-bit range, exactly like
+    iter_wav_blocks, and nothing is written to disk. A start time is passed
+    as an input seek (-ss before -i), so ffmpeg seeks in the container
+    rather than decoding everything up to it.
+    """
+    cmd = ['ffmpeg', '-v', 'error', '-nostdin']
+    if start > 0:
+        cmd += ['-ss', f"{start:.6f}"]
+    if duration is not None:
+        cmd += ['-t', f"{duration:.6f}"]
+    cmd += [
+        '-i', media_file,
+        '-vn',  # Skip video decoding entirely
+        '-ac', '1',
+        '-ar', str(sample_rate),
+        '-f', 's16le',
+        '-acodec', 'pcm_s16le',
+        '-'
+    ]
+    
+    try:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        raise Exception("ffmpeg not found. Please install ffmpeg.")
+    
+    block_bytes = block_samples * 2
+    try:
+        while True:
+            raw = process.stdout.read(block_bytes)
+            if not raw:
+                break
+            yield decode_pcm(raw, WAVE_FORMAT_PCM, 16, 1)
+        
+        stderr = process.stderr.read().decode(errors='replace')
+        if process.wait() != 0:
+            raise Exception(f"ffmpeg failed: {stderr}")
+    finally:
+        # Consumer stopped early: don't leave ffmpeg blocked on a full pipe
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def read_media(media_file: str, sample_rate: int) -> np.ndarray:
+    """Decode a whole media file to mono float32 at sample_rate"""
+    blocks = list(iter_ffmpeg_blocks(media_file, sample_rate, 60 * sample_rate))
+    return np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
+
+
+def audio_blocks(media_file: str, block_seconds: float, sample_rate: Optional[int] = None,
+                 start: float = 0.0, duration: Optional[float] = None) -> Tuple[int, Iterator[np.ndarray]]:
+    """
+    Blocks of mono samples from a WAV file or any other container
+    
+    WAV files already at the requested rate (or any rate, when sample_rate
+    is None) are read directly; everything else is piped through ffmpeg.
+    Both seek to start, so a span costs its own length to decode.
+    
+    Returns:
+        (sample_rate, block iterator)
+    """
+    if Path(media_file).suffix.lower() in ('.wav', '.wave'):
+        try:
+            native_rate = wav_info(media_file)['sample_rate']
+        except Exception:
+            native_rate = None
+        if native_rate and sample_rate in (None, native_rate):
+            return native_rate, iter_wav_blocks(media_file, int(block_seconds * native_rate), start, duration)
+    
+    sample_rate = sample_rate or 16000
+    return sample_rate, iter_ffmpeg_blocks(media_file, sample_rate, int(block_seconds * sample_rate),
+                                           start, duration)
+
+
+def follow_wav_blocks(wav_file: str, block_seconds: float, idle_timeout: float = 10.0,
+                      poll_interval: float = 0.1) -> Tuple[int, Iterator[np.ndarray]]:
+    """
+    Blocks from a WAV file that is still being written (like tail -f)
+    
+    The declared data size is ignored, since recorders often patch it only
+    on close; reading stops once the file has not grown for idle_timeout.
+    
+    Returns:
+        (sample_rate, block iterator)
+    """
+    header = wav_info(wav_file)
+    sample_rate = header['sample_rate']
+    block_bytes = int(block_seconds * sample_rate) * header['block_align']
+    
+    def blocks():
+        with open(wav_file, 'rb') as f:
+            f.seek(header['data_offset'])
+            pending = b''
+            idle_since = time.monotonic()
+            while True:
+                raw = f.read(block_bytes - len(pending))
+                if raw:
+                    pending += raw
+                    idle_since = time.monotonic()
+                if len(pending) >= block_bytes:
+                    yield decode_pcm(pending, header['format_tag'], header['bits_per_sample'], header['channels'])
+                    pending = b''
+                    continue
+                if time.monotonic() - idle_since > idle_timeout:
+                    break
+                time.sleep(poll_interval)
+            
+            # Whole frames left over when the writer stopped
+            pending = pending[:len(pending) - len(pending) % header['block_align']]
+            if pending:
+                yield decode_pcm(pending, header['format_tag'], header['bits_per_sample'], header['channels'])
+    
+    return sample_rate, blocks()
+
+
+def pipe_blocks(stream, block_seconds: float, sample_rate: int = 16000) -> Iterator[np.ndarray]:
+    """
+    Blocks from raw mono s16le PCM on a binary stream (e.g. sys.stdin.buffer),
+    as produced by `ffmpeg ... -ac 1 -ar 16000 -f s16le -`
+    """
+    block_bytes = int(block_seconds * sample_rate) * 2
+    pending = b''
+    while True:
+        raw = stream.read(block_bytes - len(pending))
+        if not raw:
+            break
+        pending += raw
+        if len(pending) >= block_bytes:
+            yield decode_pcm(pending, WAVE_FORMAT_PCM, 16, 1)
+            pending = b''
+    pending = pending[:len(pending) - len(pending) % 2]
+    if pending:
+        yield decode_pcm(pending, WAVE_FORMAT_PCM, 16, 1)
+
+
+def replay_blocks(media_file: str, block_seconds: float, speed: float = 1.0,
+                  sample_rate: Optional[int] = None) -> Tuple[int, Iterator[np.ndarray]]:
+    """
+    Blocks of a finished recording released at real-time pace (speed x faster),
+    so the live pipeline can be exercised without a live source
+    
+    Returns:
+        (sample_rate, block iterator)
+    """
+    sample_rate, blocks = audio_blocks(media_file, block_seconds, sample_rate)
+    
+    def paced():
+        started = time.monotonic()
+        released = 0
+        for block in blocks:
+            # A block is only available once all of its audio has "happened"
+            released += len(block)
+            delay = started + released / sample_rate / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            yield block
+    
+    return sample_rate, paced()
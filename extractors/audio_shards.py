@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+VectorVault Audio Shards
+Multi-core feature extraction over time shards of one shared-memory signal
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def default_workers() -> int:
+    """Worker processes to use when none are requested"""
+    return os.cpu_count() or 1
+
+
+def plan_shards(num_frames: int, num_shards: int) -> List[Tuple[int, int]]:
+    """
+    Split frames [0, num_frames) into contiguous, near-equal ranges
+
+    Shards are defined in frames rather than samples so every frame is owned
+    by exactly one shard; the samples a shard reads may overlap its neighbours.
+    """
+    num_shards = max(1, min(num_shards, num_frames))
+    bounds = np.linspace(0, num_frames, num_shards + 1).astype(int)
+    return [(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def _shard_task(func: Callable, shm_name: str, length: int, dtype: str, args: Tuple):
+    """Worker entry point: attach to the shared signal and run one shard"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        samples = np.ndarray((length,), dtype=dtype, buffer=shm.buf)
+        result = func(samples, *args)
+    finally:
+        # Views must be released before the mapping can close
+        samples = None
+        shm.close()
+    return result
+
+
+class SharedSamples:
+    """
+    A 1-D signal placed in shared memory once and read by every worker
+
+    Workers receive only the segment name and their shard arguments; the
+    sample array itself is never pickled. Results come back in shard order,
+    so stitching is deterministic regardless of completion order.
+    """
+
+    def __init__(self, samples: np.ndarray, workers: Optional[int] = None):
+        self.samples = np.ascontiguousarray(samples)
+        self.workers = workers or default_workers()
+        self.shm = None
+        self.executor = None
+
+    def __enter__(self):
+        if self.workers > 1 and len(self.samples):
+            self.shm = shared_memory.SharedMemory(create=True, size=self.samples.nbytes)
+            np.ndarray(self.samples.shape, dtype=self.samples.dtype, buffer=self.shm.buf)[:] = self.samples
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    def map(self, func: Callable, shard_args: Sequence[Tuple]) -> List:
+        """Run func(samples, *args) for every shard, results in shard order"""
+        if self.executor is None:
+            # Single worker: run in-process on the original array
+            return [func(self.samples, *args) for args in shard_args]
+
+        futures = [
+            self.executor.submit(_shard_task, func, self.shm.name, len(self.samples),
+                                 self.samples.dtype.str, args)
+            for args in shard_args
+        ]
+        return [future.result() for future in futures]
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+        return False
@@ -3,96 +3,96 @@
 Create semantic vectors from complete Whisper transcription
 """
 
-import json
+import math
 from pathlib import Path
+from typing import Optional, Sequence
 
-def create_semantic_vectors_from_transcription():
-    """Create semantic vectors from the completed transcription"""
+from feature_file import save_features
+from transcript import load_transcript
+
+def create_semantic_vectors_from_transcription(window_sizes: Sequence[float] = (10.0,),
+                                               hop: Optional[float] = None):
+    """
+    Create semantic vectors from the completed transcription
+
+    Args:
+        window_sizes: Window lengths in seconds, all built in one pass
+        hop: Seconds between window starts (default: the smallest window, no overlap)
+    """
     
-    transcription_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.json"
+    transcription_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.npz"
     
-    with open(transcription_file, 'r') as f:
-        transcription = json.load(f)
+    transcript = load_transcript(transcription_file)
     
-    words = transcription.get("words", [])
-    print(f"📝 Processing {len(words)} words from transcription...")
+    print(f"📝 Processing {len(transcript)} words from transcription...")
     
-    # Create semantic vectors with 10-second windows
+    # Create semantic vectors (10-second windows by default)
     vectors = []
-    window_size = 10.0  # seconds
-    duration = transcription['metadata']['duration']
+    duration = transcript.metadata['duration']
+    windows = transcript.window_features(window_sizes, hop, duration)
     
-    current_time = 0
-    while current_time < duration:
-        window_end = current_time + window_size
+    for i in range(len(windows['lo'])):
+        window_start = float(windows['window_start'][i])
+        window_end = float(windows['window_end'][i])
+        tokens = transcript.tokens(windows['lo'][i], windows['hi'][i])
         
-        # Get words in this time window
-        window_words = [w for w in words 
-                       if w["start"] >= current_time and w["start"] < window_end]
+        # Calculate semantic features (vocabulary diversity over lowercased, stripped words)
+        word_count = int(windows['word_count'][i])
+        avg_confidence = float(windows['avg_confidence'][i])
+        confidence_known = not math.isnan(avg_confidence)
+        avg_word_length = float(windows['avg_word_length'][i])
+        vocab_diversity = float(windows['vocab_diversity'][i])
+        speaking_rate = float(windows['speaking_rate'][i])
         
-        if window_words:
-            # Calculate semantic features
-            word_count = len(window_words)
-            avg_confidence = sum([w["confidence"] for w in window_words]) / word_count
-            avg_word_length = sum([len(w["word"]) for w in window_words]) / word_count
-            
-            # Vocabulary diversity
-            unique_words = len(set([w["word"].lower().strip() for w in window_words]))
-            vocab_diversity = unique_words / word_count if word_count > 0 else 0
-            
-            # Speaking rate (words per second)
-            time_span = window_end - current_time
-            speaking_rate = word_count / time_span if time_span > 0 else 0
-            
-            # Text content
-            text_snippet = " ".join([w["word"] for w in window_words])
-            
-            vector = {
-                "timestamp": current_time,
-                "features": {
-                    "word_count": word_count,
-                    "avg_confidence": avg_confidence,
-                    "avg_word_length": avg_word_length,
-                    "vocab_diversity": vocab_diversity,
-                    "speaking_rate": speaking_rate
-                },
-                "words": [w["word"] for w in window_words],
-                "text_snippet": text_snippet,
-                "metadata": {
-                    "window_start": current_time,
-                    "window_end": window_end,
-                    "actual_words": len(window_words)
-                }
+        # Text content
+        text_snippet = " ".join(tokens)
+        
+        vector = {
+            "timestamp": window_start,
+            "features": {
+                "word_count": word_count,
+                "avg_confidence": avg_confidence if confidence_known else None,
+                "avg_word_length": avg_word_length,
+                "vocab_diversity": vocab_diversity,
+                "speaking_rate": speaking_rate,
+                "window_size": window_end - window_start
+            },
+            "words": tokens,
+            "text_snippet": text_snippet,
+            "metadata": {
+                "window_start": window_start,
+                "window_end": window_end,
+                "actual_words": word_count
             }
-            
-            # Create dense vector (5-dimensional like audio)
-            vector["dense_vector"] = [
-                min(word_count / 50.0, 1.0),     # Normalized word count (cap at 50)
-                avg_confidence,                  # Confidence score
-                min(avg_word_length / 15.0, 1.0), # Normalized word length (cap at 15)
-                vocab_diversity,                 # Vocabulary diversity
-                min(speaking_rate / 5.0, 1.0)   # Normalized speaking rate (cap at 5 wps)
-            ]
-            
-            vectors.append(vector)
+        }
+        
+        # Create dense vector (5-dimensional like audio)
+        vector["dense_vector"] = [
+            min(word_count / 50.0, 1.0),     # Normalized word count (cap at 50)
+            # Confidence score (0.5, neutral, when the engine reported none)
+            avg_confidence if confidence_known else 0.5,
+            min(avg_word_length / 15.0, 1.0), # Normalized word length (cap at 15)
+            vocab_diversity,                 # Vocabulary diversity
+            min(speaking_rate / 5.0, 1.0)   # Normalized speaking rate (cap at 5 wps)
+        ]
         
-        current_time += window_size
+        vectors.append(vector)
     
     # Save semantic vectors
     semantic_data = {
         "metadata": {
             "source": "whisper_transcription",
-            "total_words": len(words),
+            "total_words": len(transcript),
             "duration": duration,
             "vector_count": len(vectors),
-            "window_size": window_size
+            "window_size": window_sizes[0] if len(window_sizes) == 1 else list(window_sizes),
+            "hop": hop or min(window_sizes)
         },
         "vectors": vectors
     }
     
-    output_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/semantic_vectors_complete.json"
-    with open(output_file, 'w') as f:
-        json.dump(semantic_data, f, indent=2)
+    output_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/semantic_vectors_complete.npz"
+    save_features(semantic_data, output_file)
     
     print(f"✅ Created {len(vectors)} semantic vectors")
     print(f"📄 Saved to: {output_file}")
@@ -103,7 +103,8 @@ def create_semantic_vectors_from_transcription():
         print(f"\n🔍 Sample vector at {sample['timestamp']:.1f}s:")
         print(f"  Text: \"{sample['text_snippet'][:60]}...\"")
         print(f"  Word count: {sample['features']['word_count']}")
-        print(f"  Confidence: {sample['features']['avg_confidence']:.3f}")
+        if sample['features']['avg_confidence'] is not None:
+            print(f"  Confidence: {sample['features']['avg_confidence']:.3f}")
         print(f"  Speaking rate: {sample['features']['speaking_rate']:.2f} words/sec")
     
     return semantic_data
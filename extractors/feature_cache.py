@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+VectorVault Feature Cache
+Content-addressed cache of extractor results, stored as binary arrays
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from feature_file import FeatureFile, save_features
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "vectorvault" / "features"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+class FeatureCache:
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize feature cache
+
+        Entries are keyed by media content hash + extractor name + version +
+        parameters, so a hit is only possible when neither the media nor
+        anything that shapes the output has changed. Least recently used
+        entries are evicted once the cache exceeds max_bytes.
+
+        Args:
+            cache_dir: Cache directory (default: $VECTORVAULT_CACHE or ~/.cache/vectorvault/features)
+            max_bytes: Size cap for all cached entries
+        """
+        self.cache_dir = Path(cache_dir or os.environ.get('VECTORVAULT_CACHE') or DEFAULT_CACHE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.conn = sqlite3.connect(str(self.cache_dir / "index.db"), timeout=30)
+        self.create_tables()
+
+    def create_tables(self):
+        """Create the entry and media-hash tables"""
+        cursor = self.conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                cache_key TEXT PRIMARY KEY,
+                extractor TEXT NOT NULL,
+                media_hash TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+
+        # Hashing a multi-GB video is slow; remember it until the file changes
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS media_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL
+            )
+        ''')
+
+        self.conn.commit()
+
+    def media_hash(self, media_file: str) -> str:
+        """SHA-256 of the file contents, memoized by path, size and mtime"""
+        path = str(Path(media_file).resolve())
+        stat = os.stat(path)
+
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT size, mtime_ns, sha256 FROM media_hashes WHERE path = ?', (path,))
+        row = cursor.fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        sha256 = digest.hexdigest()
+
+        cursor.execute('INSERT OR REPLACE INTO media_hashes VALUES (?, ?, ?, ?)',
+                       (path, stat.st_size, stat.st_mtime_ns, sha256))
+        self.conn.commit()
+        return sha256
+
+    def cache_key(self, media_hash: str, extractor: str, version, params: Dict) -> str:
+        """Deterministic key for one extractor run over one piece of media"""
+        payload = json.dumps({
+            'media': media_hash,
+            'extractor': extractor,
+            'version': version,
+            'params': params
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def entry_path(self, cache_key: str) -> Path:
+        return self.cache_dir / cache_key[:2] / f"{cache_key}.npz"
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        """Cached features, or None on a miss"""
+        path = self.entry_path(cache_key)
+        if not path.exists():
+            return None
+
+        features = FeatureFile(str(path)).load()
+
+        self.conn.execute('UPDATE entries SET last_access = ? WHERE cache_key = ?', (time.time(), cache_key))
+        self.conn.commit()
+        return features
+
+    def put(self, cache_key: str, features: Dict, extractor: str = "", media_hash: str = ""):
+        """Store features and evict old entries past the size cap"""
+        path = self.entry_path(cache_key)
+        temp_path = save_features(features, str(path.with_suffix('.tmp')))
+        os.replace(temp_path, path)
+
+        now = time.time()
+        self.conn.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)',
+                          (cache_key, extractor, media_hash, path.stat().st_size, now, now))
+        self.conn.commit()
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT COALESCE(SUM(size_bytes), 0) FROM entries')
+        total = cursor.fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        cursor.execute('SELECT cache_key, size_bytes FROM entries ORDER BY last_access')
+        for cache_key, size_bytes in cursor.fetchall():
+            if total <= self.max_bytes:
+                break
+            self.entry_path(cache_key).unlink(missing_ok=True)
+            self.conn.execute('DELETE FROM entries WHERE cache_key = ?', (cache_key,))
+            total -= size_bytes
+        self.conn.commit()
+
+    def get_or_compute(self, media_file: str, extractor: str, version, params: Dict,
+                       compute: Callable[[], Dict]) -> Dict:
+        """Return cached features for this media and parameters, computing them on a miss"""
+        media_hash = self.media_hash(media_file)
+        cache_key = self.cache_key(media_hash, extractor, version, params)
+
+        features = self.get(cache_key)
+        if features is not None:
+            print(f"Feature cache hit: {extractor} ({cache_key[:12]})")
+            return features
+
+        features = compute()
+        self.put(cache_key, features, extractor, media_hash)
+        return features
+
+    def stats(self) -> Dict:
+        """Entry count and total size per extractor"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT extractor, COUNT(*), SUM(size_bytes) FROM entries GROUP BY extractor')
+        return {
+            extractor: {'entries': count, 'size_bytes': size}
+            for extractor, count, size in cursor.fetchall()
+        }
+
+    def close(self):
+        """Close the index database"""
+        self.conn.close()
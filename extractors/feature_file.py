@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+VectorVault Feature File
+Binary feature container: typed arrays plus a JSON header in one .npz
+"""
+
+import json
+import zipfile
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+HEADER_MEMBER = '__header__'
+
+
+def encode_features(features: Dict) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """
+    Split a features dict into a JSON skeleton and typed arrays
+
+    Numeric lists (and lists of equal-length numeric rows) become arrays;
+    lists of dicts with the same (non-empty) keys become columns,
+    recursively. Everything else (strings, metadata scalars, and lists an
+    array would change, such as ints mixed with floats) stays in the JSON
+    skeleton, so a round trip gives back exactly what was saved.
+    """
+    arrays = {}
+
+    def kind(leaf_type):
+        # bool before int: bool is an int subclass
+        if issubclass(leaf_type, (bool, np.bool_)):
+            return 'b'
+        if issubclass(leaf_type, (int, np.integer)):
+            return 'i'
+        if issubclass(leaf_type, (float, np.floating)):
+            return 'f'
+        return None
+
+    def leaf_kinds(value, depth):
+        if depth > 0:
+            return set().union(*(leaf_kinds(row, depth - 1) for row in value))
+        return {kind(leaf_type) for leaf_type in set(map(type, value))}
+
+    def encode(value):
+        if isinstance(value, dict):
+            return {key: encode(item) for key, item in value.items()}
+
+        if isinstance(value, list) and value:
+            first = value[0]
+            if isinstance(first, dict) and first and \
+                    all(isinstance(row, dict) and row.keys() == first.keys() for row in value):
+                return {'__table__': {key: encode([row[key] for row in value]) for key in first}}
+            try:
+                array = np.asarray(value)
+            except ValueError:
+                # Ragged rows
+                return value
+            # One kind of number throughout, or the array would coerce some values
+            if array.dtype.kind in 'biuf' and len(leaf_kinds(value, array.ndim - 1)) == 1:
+                name = f"a{len(arrays)}"
+                arrays[name] = array
+                return {'__array__': name}
+
+        return value
+
+    return encode(features), arrays
+
+
+def decode_features(skeleton, arrays, as_lists: bool = True):
+    """
+    Rebuild the features dict written by encode_features
+
+    With as_lists=False arrays are returned as-is (memory-mapped when read
+    through FeatureFile) and tables as {column: array} dicts instead of rows.
+    """
+
+    def decode(value):
+        if isinstance(value, dict):
+            if '__array__' in value:
+                array = arrays[value['__array__']]
+                return array.tolist() if as_lists else array
+            if '__table__' in value:
+                columns = {key: decode(column) for key, column in value['__table__'].items()}
+                if not as_lists:
+                    return columns
+                return [dict(zip(columns, row)) for row in zip(*columns.values())]
+            return {key: decode(item) for key, item in value.items()}
+        return value
+
+    return decode(skeleton)
+
+
+def save_features(features: Dict, output_file: str) -> Path:
+    """Write a features dict as an uncompressed .npz container"""
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    skeleton, arrays = encode_features(features)
+    header = json.dumps({'format_version': FORMAT_VERSION, 'data': skeleton}).encode()
+
+    # Uncompressed members keep their bytes contiguous on disk for mmap
+    with open(output_path, 'wb') as f:
+        np.savez(f, **{HEADER_MEMBER: np.frombuffer(header, dtype=np.uint8)}, **arrays)
+
+    return output_path
+
+
+def npz_members(path: str) -> Dict[str, Tuple[int, Tuple, str, np.dtype]]:
+    """
+    Locate every array in an uncompressed .npz without reading the data
+
+    Returns:
+        {member: (byte offset of the data, shape, 'C' or 'F', dtype)}
+    """
+    members = {}
+
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise Exception(f"{path}: member {info.filename} is compressed, cannot memory-map")
+            # Local header: 30 fixed bytes, then file name and extra field
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(f.read(4), dtype='<u2')
+            f.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            members[name] = (f.tell(), shape, 'F' if fortran_order else 'C', dtype)
+
+    return members
+
+
+def map_npz(path: str) -> Dict[str, np.ndarray]:
+    """
+    All arrays of an uncompressed .npz as read-only views of one memory map
+
+    Nothing is read up front; pages are loaded (and dropped again) by the OS
+    as the arrays are touched, and the whole file costs a single mapping.
+    """
+    buffer = np.memmap(path, dtype=np.uint8, mode='r')
+    arrays = {}
+    for name, (offset, shape, order, dtype) in npz_members(path).items():
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        arrays[name] = buffer[offset:offset + nbytes].view(dtype).reshape(shape, order=order)
+    return arrays
+
+
+class FeatureFile:
+    def __init__(self, path: str):
+        """
+        Lazy reader for a feature container
+
+        Only the zip directory and the JSON header are read up front; each
+        array is memory-mapped straight from its member's offset on first use.
+
+        Args:
+            path: .npz written by save_features
+        """
+        self.path = Path(path)
+        self.members = npz_members(str(self.path))
+
+        header = json.loads(bytes(self.array(HEADER_MEMBER)).decode())
+        self.format_version = header['format_version']
+        self.skeleton = header['data']
+        self._arrays = {}
+
+    def array(self, name: str) -> np.ndarray:
+        """Memory-mapped array for one member"""
+        offset, shape, order, dtype = self.members[name]
+        if int(np.prod(shape)) == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode='r', offset=offset, shape=shape, order=order)
+
+    @property
+    def arrays(self) -> Dict[str, np.ndarray]:
+        if not self._arrays:
+            self._arrays = {name: self.array(name) for name in self.members if name != HEADER_MEMBER}
+        return self._arrays
+
+    def get(self, *keys):
+        """
+        Lazy access to one part of the file, e.g. get('vectors', 'dense_vector')
+
+        Arrays come back memory-mapped and tables as {column: array} dicts.
+        """
+        node = self.skeleton
+        for key in keys:
+            if isinstance(node, dict) and '__table__' in node:
+                node = node['__table__']
+            node = node[key]
+        return decode_features(node, self.arrays, as_lists=False)
+
+    def load(self, as_lists: bool = True) -> Dict:
+        """Decode the whole file (plain lists by default, like json.load)"""
+        return decode_features(self.skeleton, self.arrays, as_lists)
+
+
+def load_features(input_file: str, as_lists: bool = True) -> Dict:
+    """
+    Load a feature file written by save_features, or a legacy JSON dump
+
+    If the named file is missing, its .npz / .json sibling is tried, so
+    loaders keep working with outputs from before the binary format.
+    """
+    path = Path(input_file)
+    if not path.exists():
+        for suffix in ('.npz', '.json'):
+            if path.with_suffix(suffix).exists():
+                path = path.with_suffix(suffix)
+                break
+
+    if path.suffix == '.json':
+        with open(path, 'r') as f:
+            return json.load(f)
+    return FeatureFile(str(path)).load(as_lists)
+
+
+def feature_file_exists(input_file: str) -> bool:
+    """True if the file or its .npz / .json sibling exists"""
+    path = Path(input_file)
+    return any(path.with_suffix(suffix).exists() for suffix in (path.suffix, '.npz', '.json'))
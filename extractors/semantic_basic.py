@@ -4,28 +4,38 @@ VectorVault Semantic Extractor
 Extract semantic meaning from conversation audio using basic speech-to-text
 """
 
-import json
+import site
 import subprocess
-import tempfile
-import os
 from pathlib import Path
-from typing import Dict, List, Tuple
-import wave
-import struct
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from asr_backends import available_backends
+from audio_basic import EnergyZcrVAD
+from feature_file import save_features
+from transcript import Transcript
+from whisper_checkpoint import clear_checkpoints, default_checkpoint_dir
+from whisper_parallel import start_pool, transcribe_chunked
 
 class BasicSemanticExtractor:
-    def __init__(self):
-        """Initialize semantic extractor"""
+    def __init__(self, backend: Optional[str] = None):
+        """
+        Initialize semantic extractor
+        
+        Args:
+            backend: ASR backend name (default: asr_backends.default_backend())
+        """
         self.sample_rate = 16000
+        self.model_name = "base"
+        self.backend = backend
+        # Started on first use and kept alive so models load only once
+        self.pool = None
         
     def check_whisper_available(self) -> bool:
-        """Check if Whisper is available for transcription"""
-        try:
-            result = subprocess.run(['python3', '-c', 'import whisper'], 
-                                  capture_output=True, text=True)
-            return result.returncode == 0
-        except:
-            return False
+        """Check if the chosen ASR backend (or any, by default) is installed"""
+        installed = available_backends()
+        return self.backend in installed if self.backend else bool(installed)
     
     def install_whisper(self):
         """Install Whisper if possible"""
@@ -35,6 +45,8 @@ class BasicSemanticExtractor:
                                   capture_output=True, text=True)
             if result.returncode == 0:
                 print("Whisper installed successfully")
+                # A fresh user site dir is only on sys.path from the next start
+                site.addsitedir(site.getusersitepackages())
                 return True
             else:
                 print(f"Whisper installation failed: {result.stderr}")
@@ -43,180 +55,118 @@ class BasicSemanticExtractor:
             print(f"Could not install Whisper: {e}")
             return False
     
-    def transcribe_with_whisper(self, audio_file: str) -> Dict:
-        """Transcribe audio using Whisper with word-level timestamps"""
+    def transcribe_with_whisper(self, audio_file: str,
+                                speech_intervals: Optional[List[Dict]] = None) -> Dict:
+        """
+        Transcribe audio using Whisper with word-level timestamps
         
-        print("Starting Whisper transcription...")
+        Finished clips are checkpointed, so if the run is interrupted the
+        next call resumes where it stopped instead of starting over.
         
-        # Use Whisper API via subprocess to avoid import issues
-        script = f'''
-import whisper
-import json
-
-model = whisper.load_model("base")
-result = model.transcribe("{audio_file}", word_timestamps=True, verbose=False)
-
-# Extract word-level data
-words_data = []
-for segment in result.get("segments", []):
-    for word in segment.get("words", []):
-        words_data.append({{
-            "word": word.get("word", "").strip(),
-            "start": word.get("start", 0),
-            "end": word.get("end", 0),
-            "confidence": word.get("probability", 0.5)
-        }})
-
-output = {{
-    "text": result.get("text", ""),
-    "language": result.get("language", "en"),
-    "words": words_data,
-    "segments": result.get("segments", [])
-}}
-
-print(json.dumps(output))
-'''
+        Args:
+            audio_file: Audio to transcribe
+            speech_intervals: Only decode these regions (detected when not given);
+                word timestamps stay relative to the start of the file
+        """
         
-        try:
-            result = subprocess.run(['python3', '-c', script], 
-                                  capture_output=True, text=True, timeout=7200)  # 2 hour timeout
-            
-            if result.returncode != 0:
-                raise Exception(f"Whisper transcription failed: {result.stderr}")
-            
-            return json.loads(result.stdout)
-            
-        except subprocess.TimeoutExpired:
-            raise Exception("Whisper transcription timed out")
-        except Exception as e:
-            raise Exception(f"Whisper transcription error: {e}")
-    
-    def transcribe_basic_fallback(self, audio_file: str) -> Dict:
-        """Basic fallback transcription using simple text patterns"""
-        
-        print("Using basic fallback transcription (no actual speech-to-text)")
+        print("Starting Whisper transcription...")
         
-        # Get audio duration for timing
-        with wave.open(audio_file, 'rb') as wav:
-            frames = wav.getnframes()
-            sample_rate = wav.getframerate()
-            duration = frames / sample_rate
+        if self.pool is None:
+            self.pool = start_pool(backend=self.backend)
         
-        # Create placeholder semantic data
-        placeholder_words = [
-            "conversation", "discussion", "topic", "point", "question", "answer",
-            "interesting", "exactly", "right", "yeah", "well", "so", "but", "and",
-            "really", "think", "know", "like", "just", "time", "way", "good"
-        ]
+        checkpoint_dir = default_checkpoint_dir(audio_file)
         
-        # Generate fake word timeline (for testing structure)
-        words_data = []
-        current_time = 0
-        word_duration = 0.5  # Average word duration
+        def report(chunk, segments):
+            print(f"  Chunk {chunk['index'] + 1}: {chunk['start']:.0f}-{chunk['end']:.0f}s, {len(segments)} segments")
         
-        while current_time < duration:
-            word = placeholder_words[int(current_time) % len(placeholder_words)]
-            words_data.append({
-                "word": word,
-                "start": current_time,
-                "end": current_time + word_duration,
-                "confidence": 0.1  # Low confidence for fake data
-            })
-            current_time += word_duration + (current_time % 2.0)  # Variable spacing
+        try:
+            transcription = transcribe_chunked(audio_file, speech_intervals, model=self.model_name,
+                                               pool=self.pool, checkpoint_dir=str(checkpoint_dir),
+                                               on_chunk=report)
+        except Exception as e:
+            raise Exception(f"Whisper transcription error (rerun to resume from {checkpoint_dir}): {e}")
         
-        return {
-            "text": " ".join([w["word"] for w in words_data]),
-            "language": "en",
-            "words": words_data,
-            "segments": []
-        }
+        return transcription
     
-    def create_semantic_vectors(self, transcription: Dict, window_size: float = 10.0) -> List[Dict]:
-        """Create semantic vectors from transcription data"""
-        
-        words = transcription.get("words", [])
-        if not words:
+    def close(self):
+        """Shut down the Whisper worker processes"""
+        if self.pool is not None:
+            for worker in self.pool:
+                worker.close()
+            self.pool = None
+    
+    def create_semantic_vectors(self, transcription: Union[Dict, Transcript],
+                                window_size: Union[float, Sequence[float]] = 10.0,
+                                hop: Optional[float] = None) -> List[Dict]:
+        """
+        Create semantic vectors from transcription data
+
+        Args:
+            transcription: Transcription with a "words" list, or a Transcript
+            window_size: Window length in seconds, or several lengths in one pass
+            hop: Seconds between window starts (default: the smallest window, no overlap)
+        """
+        
+        transcript = transcription if isinstance(transcription, Transcript) \
+            else Transcript.from_words(transcription.get("words", []))
+        if not len(transcript):
             return []
         
-        vectors = []
-        duration = max([w["end"] for w in words]) if words else 0
+        # Vocabulary diversity counts case variants as one word (leading space kept)
+        _, folded = np.unique([word.lower() for word in transcript.vocab], return_inverse=True)
+        windows = transcript.window_features(window_size, hop, diversity_ids=folded[transcript.token_ids])
         
-        # Create vectors for time windows
-        current_time = 0
-        while current_time < duration:
-            window_end = current_time + window_size
+        vectors = []
+        for i in range(len(windows['lo'])):
+            tokens = transcript.tokens(windows['lo'][i], windows['hi'][i])
+            word_count = int(windows['word_count'][i])
+            avg_confidence = float(windows['avg_confidence'][i])
+            confidence_known = not np.isnan(avg_confidence)
+            avg_word_length = float(windows['avg_word_length'][i])
+            vocab_diversity = float(windows['vocab_diversity'][i])
+            speaking_rate = float(windows['speaking_rate'][i])
             
-            # Get words in this time window
-            window_words = [w for w in words 
-                           if w["start"] >= current_time and w["start"] < window_end]
+            vector = {
+                "timestamp": float(windows['window_start'][i]),
+                "features": {
+                    "word_count": word_count,
+                    "avg_confidence": avg_confidence if confidence_known else None,
+                    "avg_word_length": avg_word_length,
+                    "vocab_diversity": vocab_diversity,
+                    "speaking_rate": speaking_rate,
+                    "window_size": float(windows['window_end'][i] - windows['window_start'][i])
+                },
+                "words": tokens,
+                "text_snippet": " ".join(tokens)
+            }
             
-            if window_words:
-                # Calculate basic semantic features
-                word_count = len(window_words)
-                avg_confidence = sum([w["confidence"] for w in window_words]) / word_count
-                avg_word_length = sum([len(w["word"]) for w in window_words]) / word_count
-                
-                # Simple vocabulary diversity (unique words / total words)
-                unique_words = len(set([w["word"].lower() for w in window_words]))
-                vocab_diversity = unique_words / word_count if word_count > 0 else 0
-                
-                # Speaking rate (words per second)
-                time_span = window_end - current_time
-                speaking_rate = word_count / time_span if time_span > 0 else 0
-                
-                vector = {
-                    "timestamp": current_time,
-                    "features": {
-                        "word_count": word_count,
-                        "avg_confidence": avg_confidence,
-                        "avg_word_length": avg_word_length,
-                        "vocab_diversity": vocab_diversity,
-                        "speaking_rate": speaking_rate
-                    },
-                    "words": [w["word"] for w in window_words],
-                    "text_snippet": " ".join([w["word"] for w in window_words])
-                }
-                
-                # Create dense vector
-                vector["dense_vector"] = [
-                    word_count / 100.0,         # Normalized word count
-                    avg_confidence,             # Confidence score
-                    avg_word_length / 10.0,     # Normalized word length
-                    vocab_diversity,            # Vocabulary diversity
-                    speaking_rate / 10.0        # Normalized speaking rate
-                ]
-                
-                vectors.append(vector)
+            # Create dense vector
+            vector["dense_vector"] = [
+                word_count / 100.0,         # Normalized word count
+                # Confidence score (0.5, neutral, when the engine reported none)
+                avg_confidence if confidence_known else 0.5,
+                avg_word_length / 10.0,     # Normalized word length
+                vocab_diversity,            # Vocabulary diversity
+                speaking_rate / 10.0        # Normalized speaking rate
+            ]
             
-            current_time += window_size
+            vectors.append(vector)
         
         return vectors
     
-    def extract_semantic_features(self, audio_file: str) -> Dict:
-        """Extract semantic features from audio file"""
+    def extract_semantic_features(self, audio_file: str,
+                                  speech_intervals: Optional[List[Dict]] = None) -> Dict:
+        """Extract semantic features from audio file (speech regions only when intervals are given)"""
         
         print(f"🎤 Starting semantic extraction from: {audio_file}")
         
-        # Try to use Whisper, fall back to basic if not available
-        if self.check_whisper_available():
-            print("Using Whisper for transcription...")
-            try:
-                transcription = self.transcribe_with_whisper(audio_file)
-            except Exception as e:
-                print(f"Whisper failed: {e}")
-                print("Falling back to basic transcription...")
-                transcription = self.transcribe_basic_fallback(audio_file)
-        else:
+        if not self.check_whisper_available():
             print("Whisper not available, attempting installation...")
-            if self.install_whisper() and self.check_whisper_available():
-                try:
-                    transcription = self.transcribe_with_whisper(audio_file)
-                except Exception as e:
-                    print(f"Whisper failed after installation: {e}")
-                    transcription = self.transcribe_basic_fallback(audio_file)
-            else:
-                print("Using basic fallback transcription...")
-                transcription = self.transcribe_basic_fallback(audio_file)
+            if not (self.install_whisper() and self.check_whisper_available()):
+                raise Exception("Whisper is not available; install openai-whisper to transcribe")
+        
+        print("Using Whisper for transcription...")
+        transcription = self.transcribe_with_whisper(audio_file, speech_intervals)
         
         # Create semantic vectors
         vectors = self.create_semantic_vectors(transcription)
@@ -228,18 +178,14 @@ print(json.dumps(output))
                 "audio_file": audio_file,
                 "total_words": len(transcription.get("words", [])),
                 "language": transcription.get("language", "unknown"),
-                "vector_count": len(vectors)
+                "vector_count": len(vectors),
+                "speech_intervals": len(speech_intervals) if speech_intervals is not None else None
             }
         }
     
     def save_to_file(self, features: Dict, output_file: str):
-        """Save semantic features to file"""
-        output_path = Path(output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(output_file, 'w') as f:
-            json.dump(features, f, indent=2)
-            
+        """Save semantic features as a binary feature file (typed arrays + JSON header)"""
+        save_features(features, output_file)
         print(f"Semantic features saved: {output_file}")
 
 def main():
@@ -254,25 +200,34 @@ def main():
         print("🧠 Starting VectorVault Semantic Extraction...")
         
         try:
-            features = extractor.extract_semantic_features(audio_file)
+            # Skip silence: Whisper only decodes the detected speech regions
+            speech_intervals = EnergyZcrVAD().detect_file(audio_file)
+            print(f"Speech intervals: {len(speech_intervals)}")
+            
+            features = extractor.extract_semantic_features(audio_file, speech_intervals)
             
             print(f"\n📊 Semantic Extraction Results:")
             print(f"Total words: {features['metadata']['total_words']}")
             print(f"Language: {features['metadata']['language']}")
             print(f"Semantic vectors: {features['metadata']['vector_count']}")
             
+            # Save results
+            output_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/semantic_vectors.npz"
+            extractor.save_to_file(features, output_file)
+            
+            # Output is safely on disk; the transcription checkpoints can go
+            clear_checkpoints(default_checkpoint_dir(audio_file))
+            
             if features['vectors']:
                 print(f"\n🔍 Sample vector at {features['vectors'][0]['timestamp']:.1f}s:")
                 print(f"  Text: \"{features['vectors'][0]['text_snippet'][:50]}...\"")
                 for key, value in features['vectors'][0]['features'].items():
-                    print(f"  {key}: {value:.4f}")
-            
-            # Save results
-            output_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/semantic_vectors.json"
-            extractor.save_to_file(features, output_file)
+                    print(f"  {key}: {'n/a' if value is None else f'{value:.4f}'}")
             
         except Exception as e:
             print(f"❌ Semantic extraction failed: {e}")
+        finally:
+            extractor.close()
             
     else:
         print(f"❌ Audio file not found: {audio_file}")
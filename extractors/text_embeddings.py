@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+VectorVault Text Embeddings
+CPU meaning vectors for text: hashed TF-IDF + truncated SVD, or a local sentence model
+"""
+
+import hashlib
+import importlib.util
+import os
+import re
+import sqlite3
+import time
+import zlib
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from word_windows import iter_word_windows
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "vectorvault" / "embeddings"
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+EMBEDDERS = {}
+
+
+def register_embedder(name: str):
+    """Register a TextEmbedder subclass under an embedder name"""
+    def decorator(cls):
+        cls.name = name
+        EMBEDDERS[name] = cls
+        return cls
+    return decorator
+
+
+def default_embedder() -> str:
+    """$VECTORVAULT_TEXT_EMBEDDER, else the built-in TF-IDF + SVD model"""
+    return os.environ.get('VECTORVAULT_TEXT_EMBEDDER') or 'tfidf-svd'
+
+
+def load_embedder(name: Optional[str] = None, **kwargs) -> 'TextEmbedder':
+    """Instantiate an embedder by name (default: default_embedder())"""
+    name = name or default_embedder()
+    if name not in EMBEDDERS:
+        raise Exception(f"Unknown text embedder: {name} (choose from {', '.join(EMBEDDERS)})")
+    embedder = EMBEDDERS[name]
+    if not embedder.available():
+        raise Exception(f"Text embedder {name} is not installed ({embedder.package})")
+    return embedder(**kwargs)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def hash_terms(text: str, n_features: int) -> Dict[int, int]:
+    """Term counts of unigrams and bigrams, hashed into n_features buckets"""
+    tokens = tokenize(text)
+    terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    counts = {}
+    for term in terms:
+        # crc32 rather than hash(): Python salts str hashes per process
+        bucket = zlib.crc32(term.encode()) % n_features
+        counts[bucket] = counts.get(bucket, 0) + 1
+    return counts
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows (zero rows stay zero)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class SparseRows:
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, n_cols: int):
+        """
+        Compressed sparse rows with the two products randomized SVD needs
+
+        Args:
+            indptr: Row start offsets into indices/data (length rows + 1)
+            indices: Column of every stored value
+            data: Stored values
+            n_cols: Number of columns
+        """
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = (len(indptr) - 1, n_cols)
+        self.rows = np.repeat(np.arange(self.shape[0]), np.diff(indptr))
+
+        # Column-sorted view for transposed products
+        self.column_order = np.argsort(indices, kind='stable')
+        sorted_columns = indices[self.column_order]
+        self.column_starts = np.flatnonzero(np.r_[True, sorted_columns[1:] != sorted_columns[:-1]]) \
+            if len(sorted_columns) else np.array([], dtype=np.int64)
+        self.unique_columns = sorted_columns[self.column_starts]
+
+    def dot(self, dense: np.ndarray) -> np.ndarray:
+        """self @ dense"""
+        out = np.zeros((self.shape[0], dense.shape[1]), dtype=dense.dtype)
+        if not len(self.data):
+            return out
+        contributions = self.data[:, None] * dense[self.indices]
+        nonempty = np.flatnonzero(np.diff(self.indptr))
+        out[nonempty] = np.add.reduceat(contributions, self.indptr[nonempty], axis=0)
+        return out
+
+    def tdot(self, dense: np.ndarray) -> np.ndarray:
+        """self.T @ dense"""
+        out = np.zeros((self.shape[1], dense.shape[1]), dtype=dense.dtype)
+        if not len(self.data):
+            return out
+        order = self.column_order
+        contributions = self.data[order, None] * dense[self.rows[order]]
+        out[self.unique_columns] = np.add.reduceat(contributions, self.column_starts, axis=0)
+        return out
+
+
+def randomized_svd(matrix: SparseRows, n_components: int, n_oversamples: int = 10,
+                   n_iter: int = 4, random_state: int = 0):
+    """
+    Top singular triplets of a sparse matrix (Halko et al. range finder)
+
+    Returns (singular_values, components) with components shaped
+    (n_components, n_cols). The random test matrix is drawn on the row side,
+    which is the small one for text (documents << hashed terms).
+    """
+    rows, cols = matrix.shape
+    size = min(n_components + n_oversamples, rows, cols)
+    n_components = min(n_components, size)
+    rng = np.random.default_rng(random_state)
+
+    # Start from X.T @ omega: one extra power iteration without a cols x size draw
+    basis, _ = np.linalg.qr(matrix.tdot(rng.standard_normal((rows, size))))
+    for _ in range(n_iter):
+        q, _ = np.linalg.qr(matrix.dot(basis))
+        basis, _ = np.linalg.qr(matrix.tdot(q))
+
+    q, _ = np.linalg.qr(matrix.dot(basis))
+    small = matrix.tdot(q).T
+    _, singular_values, vt = np.linalg.svd(small, full_matrices=False)
+    return singular_values[:n_components], vt[:n_components]
+
+
+class TextEmbedder:
+    """
+    One text embedding model
+
+    embed() takes a list of strings and returns an L2-normalized float32
+    matrix, one row per string. model_id identifies the vector space: cached
+    vectors are only reused when it matches.
+    """
+
+    name = None
+    module = None
+    package = None
+
+    @classmethod
+    def available(cls) -> bool:
+        return cls.module is None or importlib.util.find_spec(cls.module) is not None
+
+    @property
+    def model_id(self) -> str:
+        raise NotImplementedError
+
+    @property
+    def fitted(self) -> bool:
+        return True
+
+    def fit(self, texts: Sequence[str]) -> 'TextEmbedder':
+        return self
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+@register_embedder('tfidf-svd')
+class TfidfSVDEmbedder(TextEmbedder):
+    """Hashed unigram+bigram TF-IDF reduced by randomized truncated SVD (NumPy only)"""
+
+    def __init__(self, n_components: int = 256, n_features: int = 2 ** 20, random_state: int = 0):
+        """
+        Args:
+            n_components: Embedding dimensions
+            n_features: Hash buckets for terms (no vocabulary is kept)
+            random_state: Seed of the SVD range finder
+        """
+        self.n_components = n_components
+        self.n_features = n_features
+        self.random_state = random_state
+
+        # Fitted state; only buckets seen while fitting get a column
+        self.columns = None
+        self.idf = None
+        self.components = None
+        self._model_id = None
+        self._lookup = None
+
+    @property
+    def fitted(self) -> bool:
+        return self.components is not None
+
+    @property
+    def model_id(self) -> str:
+        if not self.fitted:
+            raise Exception("TF-IDF model is not fitted")
+        return self._model_id
+
+    def tfidf(self, texts: Sequence[str], column_lookup: Optional[Dict[int, int]] = None) -> SparseRows:
+        """Sublinear TF-IDF rows (L2-normalized) over the fitted columns"""
+        indptr, indices, data = [0], [], []
+        for text in texts:
+            counts = hash_terms(text, self.n_features)
+            for bucket, count in counts.items():
+                column = column_lookup.get(bucket) if column_lookup is not None else bucket
+                if column is not None:
+                    indices.append(column)
+                    data.append(1.0 + np.log(count))
+            indptr.append(len(indices))
+
+        indptr = np.array(indptr, dtype=np.int64)
+        indices = np.array(indices, dtype=np.int64)
+        data = np.array(data, dtype=np.float32)
+
+        if self.idf is not None and len(data):
+            data *= self.idf[indices]
+            lengths = np.diff(indptr)
+            norms = np.ones(len(lengths), dtype=np.float32)
+            norms[lengths > 0] = np.sqrt(np.add.reduceat(data ** 2, indptr[:-1][lengths > 0]))
+            data /= np.repeat(norms, lengths)
+
+        return SparseRows(indptr, indices, data, len(self.columns) if self.columns is not None else self.n_features)
+
+    def fit(self, texts: Sequence[str]) -> 'TfidfSVDEmbedder':
+        """Learn IDF weights and the SVD projection from a corpus"""
+        if not texts:
+            raise Exception("Cannot fit a TF-IDF model on an empty corpus")
+
+        # Forget any previous fit, so the counting pass sees raw buckets without IDF weights
+        self.columns = self.idf = self.components = self._model_id = self._lookup = None
+
+        # Buckets are unique within a document, so bucket counts are document frequencies
+        raw = self.tfidf(texts)
+        self.columns, compact = np.unique(raw.indices, return_inverse=True)
+        document_frequency = np.bincount(compact, minlength=len(self.columns))
+        self.idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        matrix = self.tfidf(texts, self.column_lookup())
+        _, self.components = randomized_svd(matrix, self.n_components, random_state=self.random_state)
+        self.components = self.components.astype(np.float32)
+        self.update_model_id()
+        return self
+
+    def column_lookup(self) -> Dict[int, int]:
+        return {int(bucket): i for i, bucket in enumerate(self.columns)}
+
+    def update_model_id(self):
+        digest = hashlib.sha256()
+        for array in (self.columns, self.idf, self.components):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        self._model_id = f"tfidf-svd:{digest.hexdigest()[:16]}"
+        self._lookup = self.column_lookup()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Project texts into the fitted space"""
+        matrix = self.tfidf(texts, self._lookup)
+        return normalize_rows(matrix.dot(self.components.T)).astype(np.float32)
+
+    def save(self, path: str):
+        """Save the fitted model as .npz"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, columns=self.columns, idf=self.idf, components=self.components,
+                 n_features=np.array(self.n_features))
+
+    def load(self, path: str) -> 'TfidfSVDEmbedder':
+        """Load a model saved with save()"""
+        with np.load(path) as data:
+            self.columns = data['columns']
+            self.idf = data['idf']
+            self.components = data['components']
+            self.n_features = int(data['n_features'])
+        self.n_components = len(self.components)
+        self.update_model_id()
+        return self
+
+
+@register_embedder('sentence-transformers')
+class SentenceTransformerEmbedder(TextEmbedder):
+    """Local sentence-transformers model on CPU (optional dependency)"""
+
+    module = 'sentence_transformers'
+    package = 'sentence-transformers'
+
+    def __init__(self, model: str = "all-MiniLM-L6-v2", device: str = "cpu", batch_size: int = 64):
+        """
+        Args:
+            model: Model name or local path
+            device: Torch device
+            batch_size: Encoder batch size
+        """
+        from sentence_transformers import SentenceTransformer
+        self.model_name = model
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model, device=device)
+
+    @property
+    def model_id(self) -> str:
+        return f"sentence-transformers:{self.model_name}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(list(texts), batch_size=self.batch_size,
+                                    normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class EmbeddingCache:
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize embedding cache
+
+        Vectors are keyed by the SHA-256 of the text plus the embedder's
+        model_id, so unchanged windows, entries and emails are never embedded
+        twice while a refitted model gets fresh vectors.
+
+        Args:
+            cache_dir: Cache directory (default: $VECTORVAULT_EMBEDDING_CACHE or ~/.cache/vectorvault/embeddings)
+        """
+        self.cache_dir = Path(cache_dir or os.environ.get('VECTORVAULT_EMBEDDING_CACHE') or DEFAULT_CACHE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.cache_dir / "embeddings.db"), timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS embeddings (
+                cache_key TEXT PRIMARY KEY,
+                model_id TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+        ''')
+        self.conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Cached vectors for the keys that hit"""
+        found = {}
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            cursor = self.conn.execute(
+                f"SELECT cache_key, vector FROM embeddings WHERE cache_key IN ({','.join('?' * len(chunk))})",
+                chunk)
+            for key, blob in cursor.fetchall():
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, model_id: str, items: Dict[str, np.ndarray]):
+        """Store vectors in one transaction"""
+        now = time.time()
+        self.conn.executemany('INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)',
+                              [(key, model_id, np.asarray(vector, dtype=np.float32).tobytes(), now)
+                               for key, vector in items.items()])
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def text_key(model_id: str, text: str) -> str:
+    """Cache key of one text embedded by one model"""
+    return hashlib.sha256(f"{model_id}\0{text}".encode()).hexdigest()
+
+
+def embed_texts(embedder: TextEmbedder, texts: Sequence[str], cache: Optional[EmbeddingCache] = None,
+                batch_size: int = 2048) -> np.ndarray:
+    """
+    Embed texts in large batches, reusing cached vectors
+
+    Identical texts are embedded once. Returns one row per input text.
+    """
+    model_id = embedder.model_id
+    keys = [text_key(model_id, text) for text in texts]
+    vectors = cache.get_many(list(set(keys))) if cache else {}
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in vectors:
+            missing.setdefault(key, text)
+
+    missing_keys = list(missing)
+    for i in range(0, len(missing_keys), batch_size):
+        batch_keys = missing_keys[i:i + batch_size]
+        batch = dict(zip(batch_keys, embedder.embed([missing[key] for key in batch_keys])))
+        vectors.update(batch)
+        if cache:
+            cache.put_many(model_id, batch)
+
+    if missing_keys:
+        print(f"🧮 Embedded {len(missing_keys)} texts ({len(texts) - len(missing_keys)} cached or duplicate)")
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.vstack([vectors[key] for key in keys])
+
+
+def transcript_documents(transcription: Dict, source_file: str,
+                         window_size: float = 30.0, hop: float = 15.0) -> List[Dict]:
+    """Overlapping transcript windows as text documents"""
+    documents = []
+    for window_start, window_end, window_words in iter_word_windows(transcription.get("words", []),
+                                                                    window_size, hop):
+        documents.append({
+            'modality': 'transcript',
+            'source_file': source_file,
+            'timestamp': window_start,
+            'text': " ".join(w["word"].strip() for w in window_words),
+            'window_end': window_end
+        })
+    return documents
+
+
+def journal_documents(journal_analysis: Dict, source_file: str) -> List[Dict]:
+    """One document per journal entry (timestamp: entry date)"""
+    documents = []
+    for entry in journal_analysis.get('entries', []):
+        try:
+            timestamp = datetime.strptime(entry['date'], '%Y-%m-%d').timestamp()
+        except ValueError:
+            timestamp = 0.0
+        documents.append({
+            'modality': 'journal',
+            'source_file': source_file,
+            'timestamp': timestamp,
+            'text': f"{entry['title']}. {entry['content']}",
+            'title': entry['title']
+        })
+    return documents
+
+
+def clean_email_body(body: str) -> str:
+    """Drop MIME boundaries, part headers and quoted replies from a body preview"""
+    lines = []
+    for line in body.splitlines():
+        stripped = line.strip()
+        if (stripped.startswith(('--', '>', 'Content-', 'boundary=', 'charset='))
+                or (not lines and re.match(r'^[\w-]+: \S', stripped))):
+            continue
+        lines.append(stripped)
+    return re.sub(r'\s+', ' ', " ".join(lines)).strip()
+
+
+def email_documents(email_analysis: Dict, source_file: str) -> List[Dict]:
+    """Subject + cleaned body of every sampled email (timestamp: sent date)"""
+    documents = []
+    for category, emails in email_analysis.get('samples_by_category', {}).items():
+        for email_data in emails:
+            if 'error' in email_data:
+                continue
+            try:
+                timestamp = parsedate_to_datetime(email_data.get('date', '')).timestamp()
+            except (TypeError, ValueError):
+                timestamp = 0.0
+            subject = email_data.get('subject', '')
+            documents.append({
+                'modality': 'email',
+                'source_file': source_file,
+                'timestamp': timestamp,
+                'text': f"{subject}. {clean_email_body(email_data.get('body_preview', ''))}",
+                'subject': subject,
+                'sender': email_data.get('from', ''),
+                'classification': category
+            })
+    return documents
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+VectorVault Transcript
+Columnar word table: timing arrays plus interned token ids, cached as a memory-mapped file
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from feature_file import FeatureFile, load_features, save_features
+from word_windows import window_bounds
+
+TRANSCRIPT_VERSION = 1
+
+
+def normalize_token(word: str) -> str:
+    """Lowercase, whitespace-stripped form used for lower_ids"""
+    return word.lower().strip()
+
+
+class Transcript:
+    def __init__(self, start: np.ndarray, end: np.ndarray, confidence: np.ndarray,
+                 token_ids: np.ndarray, lower_ids: np.ndarray, vocab: List[str], lower_vocab: List[str],
+                 text: str = "", metadata: Optional[Dict] = None):
+        """
+        Initialize a columnar transcript
+
+        Word i is vocab[token_ids[i]] (exactly as Whisper wrote it, leading
+        space included) spoken from start[i] to end[i]. lower_ids index
+        lower_vocab, the lowercased and stripped forms, so case-insensitive
+        lookups compare integers. Words are in start-time order.
+
+        Args:
+            start: Word start times (seconds)
+            end: Word end times (seconds)
+            confidence: Word probabilities (NaN where the engine reported none)
+            token_ids: Index of each word in vocab
+            lower_ids: Index of each word in lower_vocab
+            vocab: Distinct word strings
+            lower_vocab: Distinct normalized word strings
+            text: Full transcription text
+            metadata: Transcription metadata (duration, language, ...)
+        """
+        self.start = start
+        self.end = end
+        self.confidence = confidence
+        self.token_ids = token_ids
+        self.lower_ids = lower_ids
+        self.vocab = vocab
+        self.lower_vocab = lower_vocab
+        self.text = text
+        self.metadata = metadata or {}
+
+        self._vocab_array = np.array(vocab, dtype=object)
+        self._lower_index = {term: i for i, term in enumerate(lower_vocab)}
+
+    @classmethod
+    def from_words(cls, words: List[Dict], text: str = "", metadata: Optional[Dict] = None) -> 'Transcript':
+        """Build from a list of {word, start, end, confidence} dicts"""
+        if any(words[i]["start"] > words[i + 1]["start"] for i in range(len(words) - 1)):
+            words = sorted(words, key=lambda w: w["start"])
+
+        vocab, token_ids, lower_vocab, lower_of_token = [], [], [], []
+        if words:
+            vocab, token_ids = np.unique([w["word"] for w in words], return_inverse=True)
+            lower_vocab, lower_of_token = np.unique([normalize_token(word) for word in vocab], return_inverse=True)
+            vocab, lower_vocab = vocab.tolist(), lower_vocab.tolist()
+
+        token_ids = np.asarray(token_ids, dtype=np.int32)
+        return cls(
+            start=np.array([w["start"] for w in words], dtype=np.float64),
+            end=np.array([w["end"] for w in words], dtype=np.float64),
+            confidence=np.array([np.nan if w.get("confidence") is None else w["confidence"] for w in words],
+                                dtype=np.float64),
+            token_ids=token_ids,
+            lower_ids=np.asarray(lower_of_token, dtype=np.int32)[token_ids],
+            vocab=vocab,
+            lower_vocab=lower_vocab,
+            text=text,
+            metadata=metadata
+        )
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @property
+    def duration(self) -> float:
+        """Metadata duration, else the last word's end"""
+        return self.metadata.get("duration") or (float(self.end.max()) if len(self) else 0.0)
+
+    def word(self, i: int) -> str:
+        return self.vocab[self.token_ids[i]]
+
+    def tokens(self, lo: int = 0, hi: Optional[int] = None) -> List[str]:
+        """Word strings of words[lo:hi] (bounds are clamped)"""
+        lo, hi = max(0, lo), len(self) if hi is None else min(len(self), hi)
+        return self._vocab_array[self.token_ids[lo:hi]].tolist() if hi > lo else []
+
+    def join(self, lo: int = 0, hi: Optional[int] = None) -> str:
+        """" ".join of words[lo:hi], as the scripts built context strings"""
+        return " ".join(self.tokens(lo, hi))
+
+    def words(self, lo: int = 0, hi: Optional[int] = None) -> List[Dict]:
+        """words[lo:hi] as the original list of dicts"""
+        lo, hi = max(0, lo), len(self) if hi is None else min(len(self), hi)
+        return [{"word": self.vocab[self.token_ids[i]], "start": float(self.start[i]),
+                 "end": float(self.end[i]), "confidence": float(self.confidence[i])}
+                for i in range(lo, hi)]
+
+    def term_id(self, term: str) -> Optional[int]:
+        """lower_vocab index of a term, or None if it is never spoken"""
+        return self._lower_index.get(normalize_token(term))
+
+    def find(self, term: str) -> np.ndarray:
+        """Indices of words equal to term (case-insensitive)"""
+        term_id = self.term_id(term)
+        if term_id is None:
+            return np.array([], dtype=np.int64)
+        return np.flatnonzero(self.lower_ids == term_id)
+
+    def contains(self, substring: str) -> np.ndarray:
+        """Indices of words whose normalized form contains substring"""
+        substring = substring.lower()
+        matching = np.array([substring in term for term in self.lower_vocab], dtype=bool)
+        return np.flatnonzero(matching[self.lower_ids]) if len(matching) else np.array([], dtype=np.int64)
+
+    def first_match(self, substrings: Sequence[str]) -> np.ndarray:
+        """
+        Per word, the index of the first substring it contains (-1: none)
+
+        Each distinct word form is tested once, so the cost is vocabulary
+        size x substrings rather than word count x substrings.
+        """
+        substrings = [s.lower() for s in substrings]
+        per_term = np.array([next((k for k, s in enumerate(substrings) if s in term), -1)
+                             for term in self.lower_vocab], dtype=np.int64)
+        return per_term[self.lower_ids] if len(per_term) else np.array([], dtype=np.int64)
+
+    def index_at(self, time: float) -> int:
+        """Index of the first word starting at or after time"""
+        return int(np.searchsorted(self.start, time, side='left'))
+
+    def time_slice(self, start_time: float, end_time: float) -> slice:
+        """Words starting in [start_time, end_time)"""
+        return slice(self.index_at(start_time), self.index_at(end_time))
+
+    def gaps(self) -> np.ndarray:
+        """Silence before each word after the first: start[i] - end[i - 1]"""
+        return self.start[1:] - self.end[:-1]
+
+    def window_features(self, window_sizes: Union[float, Sequence[float]] = 10.0, hop: Optional[float] = None,
+                        duration: Optional[float] = None,
+                        diversity_ids: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Word statistics of every non-empty time window, as arrays
+
+        Sums come from prefix sums, so every window costs O(1) apart from the
+        distinct-word count. diversity_ids chooses what counts as the same
+        word (default: lower_ids). avg_confidence averages the words whose
+        engine reported a probability (NaN confidence), and is NaN for a
+        window with none.
+
+        Returns window_start, window_end, lo, hi (word index range),
+        word_count, avg_confidence, avg_word_length, vocab_diversity and
+        speaking_rate.
+        """
+        if duration is None:
+            duration = float(self.end.max()) if len(self) else 0.0
+        window_start, window_end, lo, hi = window_bounds(self.start, window_sizes, hop, duration)
+
+        word_lengths = np.array([len(word) for word in self.vocab], dtype=np.float64)[self.token_ids] \
+            if len(self) else np.zeros(0)
+        known = ~np.isnan(self.confidence)
+        confidence_sums = np.r_[0.0, np.cumsum(np.where(known, self.confidence, 0.0))]
+        known_counts = np.r_[0, np.cumsum(known)]
+        length_sums = np.r_[0.0, np.cumsum(word_lengths)]
+
+        ids = self.lower_ids if diversity_ids is None else diversity_ids
+        distinct = np.array([len(np.unique(ids[a:b])) for a, b in zip(lo, hi)], dtype=np.float64)
+
+        word_count = hi - lo
+        confidence_counts = known_counts[hi] - known_counts[lo]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_confidence = np.where(confidence_counts > 0,
+                                      (confidence_sums[hi] - confidence_sums[lo]) / confidence_counts, np.nan)
+        return {
+            'window_start': window_start,
+            'window_end': window_end,
+            'lo': lo,
+            'hi': hi,
+            'word_count': word_count,
+            'avg_confidence': avg_confidence,
+            'avg_word_length': (length_sums[hi] - length_sums[lo]) / word_count,
+            'vocab_diversity': distinct / word_count,
+            'speaking_rate': word_count / (window_end - window_start)
+        }
+
+    def save(self, output_file: str, source: Optional[Dict] = None) -> Path:
+        """Write the columns as a feature file (arrays memory-mapped on load)"""
+        return save_features({
+            'version': TRANSCRIPT_VERSION,
+            'source': source or {},
+            'text': self.text,
+            'metadata': self.metadata,
+            'vocab': self.vocab,
+            'lower_vocab': self.lower_vocab,
+            'columns': {
+                'start': self.start.tolist(),
+                'end': self.end.tolist(),
+                'confidence': self.confidence.tolist(),
+                'token_ids': self.token_ids.tolist(),
+                'lower_ids': self.lower_ids.tolist()
+            }
+        }, output_file)
+
+
+def resolve_transcription(transcription_file: str) -> Path:
+    """The file itself, or its .npz / .json sibling (as feature_file.load_features)"""
+    path = Path(transcription_file)
+    if not path.exists():
+        for suffix in ('.npz', '.json'):
+            if path.with_suffix(suffix).exists():
+                return path.with_suffix(suffix)
+    return path
+
+
+def source_signature(path: Path) -> Dict:
+    """What the column cache must match to be reused"""
+    stat = os.stat(path)
+    return {'version': TRANSCRIPT_VERSION, 'path': str(path.resolve()),
+            'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def load_transcript(transcription_file: str, cache_file: Optional[str] = None) -> Transcript:
+    """
+    Load a Whisper transcription as a Transcript
+
+    The first load converts the word list and writes <stem>.columns.npz next
+    to the transcription; later loads memory-map that file, until the
+    transcription itself changes. A .json or .npz sibling is accepted, as in
+    feature_file.load_features.
+    """
+    path = resolve_transcription(transcription_file)
+    cache_path = Path(cache_file) if cache_file else path.with_name(f"{path.stem}.columns.npz")
+    signature = source_signature(path)
+
+    if cache_path.exists():
+        cached = FeatureFile(str(cache_path))
+        if cached.get('source') == signature:
+            columns = {key: np.asarray(column) for key, column in cached.get('columns').items()}
+            return Transcript(vocab=cached.get('vocab'), lower_vocab=cached.get('lower_vocab'),
+                              text=cached.get('text'), metadata=cached.get('metadata'), **columns)
+
+    transcription = load_features(str(path))
+    transcript = Transcript.from_words(transcription.get("words", []), transcription.get("text", ""),
+                                       transcription.get("metadata", {}))
+
+    temp_path = transcript.save(str(cache_path.with_suffix('.tmp')), signature)
+    os.replace(temp_path, cache_path)
+    return transcript
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+VectorVault Transcript Cache
+ASR results per clip, keyed by clip audio hash + backend + model + options
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+CACHE_VERSION = 2
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "vectorvault" / "asr"
+
+
+def default_cache_dir() -> Path:
+    """$VECTORVAULT_ASR_CACHE or ~/.cache/vectorvault/asr"""
+    return Path(os.environ.get('VECTORVAULT_ASR_CACHE') or DEFAULT_CACHE_DIR)
+
+
+class TranscriptCache:
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize transcript cache
+
+        Entries hold one clip's segments with times relative to the clip
+        start. Because the key is the hash of the clip's decoded samples (not
+        of the whole file), an edited or extended recording only misses on
+        the clips whose audio actually changed, provided the clip boundaries
+        stay put (whisper_worker.group_intervals anchors them to nearby
+        pauses) and clips are decoded without the previous clip's text as
+        prompt (run_job drops it whenever the cache is on).
+
+        Args:
+            cache_dir: Cache directory (default: $VECTORVAULT_ASR_CACHE or ~/.cache/vectorvault/asr)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Several worker processes share the index
+        self.conn = sqlite3.connect(str(self.cache_dir / "transcripts.db"), timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.create_tables()
+
+    def create_tables(self):
+        """Create the clip table"""
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS clips (
+                cache_key TEXT PRIMARY KEY,
+                backend TEXT NOT NULL,
+                model TEXT NOT NULL,
+                duration REAL NOT NULL,
+                language TEXT,
+                segments TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self.conn.commit()
+
+    def cache_key(self, samples: np.ndarray, backend: str, model: str, precision: str,
+                  options: Dict) -> str:
+        """Deterministic key for one clip decoded with one engine configuration"""
+        payload = json.dumps({
+            'version': CACHE_VERSION,
+            'audio': hashlib.sha256(np.ascontiguousarray(samples).tobytes()).hexdigest(),
+            'backend': backend,
+            'model': model,
+            'precision': precision,
+            'options': options
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        """{"language", "segments"} for a cached clip, or None on a miss"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT language, segments FROM clips WHERE cache_key = ?', (cache_key,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+
+        self.conn.execute('UPDATE clips SET last_access = ? WHERE cache_key = ?', (time.time(), cache_key))
+        self.conn.commit()
+        return {'language': row[0], 'segments': json.loads(row[1])}
+
+    def put(self, cache_key: str, result: Dict, backend: str, model: str, duration: float):
+        """Store one clip's result (segment times relative to the clip start)"""
+        now = time.time()
+        self.conn.execute('INSERT OR REPLACE INTO clips VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                          (cache_key, backend, model, duration, result.get('language'),
+                           json.dumps(result['segments']), now, now))
+        self.conn.commit()
+
+    def stats(self) -> Dict:
+        """Clip count and audio seconds per backend/model"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT backend, model, COUNT(*), SUM(duration) FROM clips GROUP BY backend, model')
+        return {
+            f"{backend}:{model}": {'clips': count, 'audio_seconds': seconds}
+            for backend, model, count, seconds in cursor.fetchall()
+        }
+
+    def close(self):
+        """Close the index database"""
+        self.conn.close()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+VectorVault Transcript Index
+Positional inverted index and bigram phrase index over a transcript, with audio times
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from feature_file import FeatureFile, save_features
+from transcript import Transcript, load_transcript, resolve_transcription, source_signature
+
+INDEX_VERSION = 1
+PUNCTUATION = re.compile(r"[^\w']+")
+
+
+def normalize_term(word: str) -> str:
+    """Index form of a word: lowercase, no whitespace or punctuation (apostrophes kept)"""
+    return PUNCTUATION.sub("", word.lower().replace("’", "'"))
+
+
+def query_terms(phrase: str) -> List[str]:
+    """Index terms of a free-text phrase"""
+    return [term for term in (normalize_term(word) for word in phrase.split()) if term]
+
+
+class TranscriptIndex:
+    def __init__(self, transcript: Transcript, terms: List[str], term_ids: np.ndarray,
+                 postings: np.ndarray, offsets: np.ndarray,
+                 bigram_keys: np.ndarray, bigram_positions: np.ndarray):
+        """
+        Initialize transcript index
+
+        Every word maps to a term (normalize_term of its text). postings
+        holds word positions grouped by term, term t owning
+        postings[offsets[t]:offsets[t + 1]], in position order. Adjacent
+        term pairs are keyed as first * len(terms) + second and kept sorted
+        with their positions, so a phrase is a binary search for its first
+        bigram plus a vectorized check of the remaining words. Positions
+        index the transcript's start/end arrays for audio times.
+
+        Args:
+            transcript: Transcript the positions refer to
+            terms: Distinct index terms
+            term_ids: Term of every word
+            postings: Word positions grouped by term
+            offsets: Start of each term's postings (length len(terms) + 1)
+            bigram_keys: Sorted bigram keys
+            bigram_positions: Position of the first word of each bigram key
+        """
+        self.transcript = transcript
+        self.terms = terms
+        self.term_ids = term_ids
+        self.postings = postings
+        self.offsets = offsets
+        self.bigram_keys = bigram_keys
+        self.bigram_positions = bigram_positions
+        self._term_index = {term: i for i, term in enumerate(terms)}
+
+    @classmethod
+    def build(cls, transcript: Transcript) -> 'TranscriptIndex':
+        """Index a transcript (one sort for postings, one for bigrams)"""
+        terms, term_of_lower = np.unique([normalize_term(word) for word in transcript.lower_vocab],
+                                         return_inverse=True) if transcript.lower_vocab else ([], [])
+        term_ids = np.asarray(term_of_lower, dtype=np.int64)[np.asarray(transcript.lower_ids, dtype=np.int64)]
+
+        postings = np.argsort(term_ids, kind='stable')
+        offsets = np.r_[0, np.cumsum(np.bincount(term_ids, minlength=len(terms)))]
+
+        keys = term_ids[:-1] * len(terms) + term_ids[1:]
+        order = np.argsort(keys, kind='stable')
+
+        return cls(transcript, list(terms), term_ids, postings, offsets.astype(np.int64),
+                   keys[order], order.astype(np.int64))
+
+    def term_id(self, term: str) -> Optional[int]:
+        return self._term_index.get(normalize_term(term))
+
+    def positions(self, term: str) -> np.ndarray:
+        """Positions of one exact term"""
+        term_id = self.term_id(term)
+        if term_id is None:
+            return np.array([], dtype=np.int64)
+        return self.postings[self.offsets[term_id]:self.offsets[term_id + 1]]
+
+    def count(self, term: str) -> int:
+        term_id = self.term_id(term)
+        return 0 if term_id is None else int(self.offsets[term_id + 1] - self.offsets[term_id])
+
+    def contains(self, substring: str) -> np.ndarray:
+        """Positions of words whose term contains substring (e.g. "fuck" in "fucking")"""
+        substring = normalize_term(substring)
+        matching = [i for i, term in enumerate(self.terms) if substring in term]
+        if not matching:
+            return np.array([], dtype=np.int64)
+        return np.sort(np.concatenate([self.postings[self.offsets[i]:self.offsets[i + 1]] for i in matching]))
+
+    def first_match(self, substrings: Sequence[str]) -> np.ndarray:
+        """Per word, the index of the first substring its term contains (-1: none)"""
+        assigned = np.full(len(self.term_ids), -1, dtype=np.int64)
+        for k, substring in enumerate(substrings):
+            positions = self.contains(substring)
+            positions = positions[assigned[positions] == -1]
+            assigned[positions] = k
+        return assigned
+
+    def phrase_positions(self, phrase: str) -> np.ndarray:
+        """Positions where the phrase starts (word-exact, case and punctuation ignored)"""
+        ids = [self.term_id(term) for term in query_terms(phrase)]
+        if not ids or any(i is None for i in ids):
+            return np.array([], dtype=np.int64)
+        if len(ids) == 1:
+            return self.postings[self.offsets[ids[0]]:self.offsets[ids[0] + 1]]
+
+        key = ids[0] * len(self.terms) + ids[1]
+        lo, hi = np.searchsorted(self.bigram_keys, [key, key + 1])
+        candidates = np.sort(self.bigram_positions[lo:hi])
+
+        for offset, term_id in enumerate(ids[2:], start=2):
+            candidates = candidates[candidates + offset < len(self.term_ids)]
+            candidates = candidates[self.term_ids[candidates + offset] == term_id]
+        return candidates
+
+    def occurrences(self, phrase: str, context: int = 10, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Every occurrence of a phrase with ±context words and audio times
+
+        Returns dicts with position, start/end (the phrase as spoken),
+        text, context and context_start/context_end.
+        """
+        length = len(query_terms(phrase))
+        positions = self.phrase_positions(phrase)
+        if limit is not None:
+            positions = positions[:limit]
+
+        transcript = self.transcript
+        results = []
+        for position in positions:
+            last = position + length - 1
+            lo, hi = max(0, position - context), min(len(transcript), last + context + 1)
+            results.append({
+                'position': int(position),
+                'start': float(transcript.start[position]),
+                'end': float(transcript.end[last]),
+                'text': transcript.join(position, last + 1),
+                'context': transcript.join(lo, hi),
+                'context_start': float(transcript.start[lo]),
+                'context_end': float(transcript.end[hi - 1])
+            })
+        return results
+
+    def count_in_ranges(self, positions: np.ndarray, range_starts: np.ndarray, range_ends: np.ndarray,
+                        length: int = 1) -> np.ndarray:
+        """How many of the given positions (phrases of length words) lie wholly in each [start, end) word range"""
+        return (np.searchsorted(positions, np.asarray(range_ends) - length + 1, side='left')
+                - np.searchsorted(positions, range_starts, side='left')).clip(min=0)
+
+    def save(self, output_file: str, source: Optional[Dict] = None) -> Path:
+        """Write the index as a feature file next to its transcript"""
+        return save_features({
+            'version': INDEX_VERSION,
+            'source': source or {},
+            'terms': self.terms,
+            'arrays': {
+                'term_ids': self.term_ids.tolist(),
+                'postings': self.postings.tolist(),
+                'offsets': self.offsets.tolist(),
+                'bigram_keys': self.bigram_keys.tolist(),
+                'bigram_positions': self.bigram_positions.tolist()
+            }
+        }, output_file)
+
+
+def load_transcript_index(transcription_file: str, cache_file: Optional[str] = None) -> TranscriptIndex:
+    """
+    Load (or build and store) the index of a Whisper transcription
+
+    The index is written as <stem>.index.npz next to the transcription and
+    its column cache (see transcript.load_transcript), and rebuilt when the
+    transcription changes.
+    """
+    transcript = load_transcript(transcription_file)
+
+    path = resolve_transcription(transcription_file)
+    cache_path = Path(cache_file) if cache_file else path.with_name(f"{path.stem}.index.npz")
+    signature = dict(source_signature(path), index_version=INDEX_VERSION)
+
+    if cache_path.exists():
+        cached = FeatureFile(str(cache_path))
+        if cached.get('source') == signature:
+            arrays = {key: np.asarray(array, dtype=np.int64) for key, array in cached.get('arrays').items()}
+            return TranscriptIndex(transcript, cached.get('terms'), **arrays)
+
+    index = TranscriptIndex.build(transcript)
+    temp_path = index.save(str(cache_path.with_suffix('.tmp')), signature)
+    os.replace(temp_path, cache_path)
+    return index
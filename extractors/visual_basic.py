@@ -8,10 +8,16 @@ import subprocess
 import json
 import math
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import tempfile
 import os
 
+from feature_cache import FeatureCache
+from feature_file import save_features
+
+# Bump whenever feature values or layout change (invalidates FeatureCache entries)
+FEATURE_VERSION = 1
+
 class BasicVisualExtractor:
     def __init__(self, 
                  sample_rate: float = 1.0,  # 1 frame per second
@@ -111,8 +117,23 @@ class BasicVisualExtractor:
             'complexity_estimate': os.path.getsize(frame_file) / 1000.0
         }
     
-    def extract_visual_features(self, mp4_file: str) -> Dict:
-        """Extract visual features from entire video"""
+    def cache_params(self) -> Dict:
+        """Everything besides the media that shapes the output"""
+        return {
+            'sample_rate': self.sample_rate,
+            'frame_width': self.frame_width,
+            'frame_height': self.frame_height
+        }
+    
+    def extract_visual_features(self, mp4_file: str, cache: Optional[FeatureCache] = None) -> Dict:
+        """Extract visual features from entire video (served from cache when unchanged)"""
+        
+        if cache is not None:
+            features = cache.get_or_compute(mp4_file, 'visual_basic', FEATURE_VERSION, self.cache_params(),
+                                            lambda: self.extract_visual_features(mp4_file))
+            # Same content may have been cached under another path
+            features['metadata']['source_file'] = mp4_file
+            return features
         
         # Create temporary directory for frames
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -210,13 +231,8 @@ class BasicVisualExtractor:
         return vectors
     
     def save_to_file(self, features: Dict, output_file: str):
-        """Save visual features to file"""
-        output_path = Path(output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(output_file, 'w') as f:
-            json.dump(features, f, indent=2)
-            
+        """Save visual features as a binary feature file (typed arrays + JSON header)"""
+        save_features(features, output_file)
         print(f"Visual features saved: {output_file}")
 
 def main():
@@ -232,7 +248,7 @@ def main():
         
         try:
             # Extract visual features  
-            features = extractor.extract_visual_features(mp4_file)
+            features = extractor.extract_visual_features(mp4_file, cache=FeatureCache())
             vectors = extractor.create_visual_vectors(features)
             
             print(f"\n📊 Visual Extraction Results:")
@@ -242,7 +258,7 @@ def main():
             print(f"Sample rate: {features['metadata']['sample_rate']} fps")
             
             # Save results
-            output_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/visual_vectors.json"
+            output_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/visual_vectors.npz"
             extractor.save_to_file({'features': features, 'vectors': vectors}, output_file)
             
             # Show sample
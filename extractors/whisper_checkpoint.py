@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+VectorVault Transcription Checkpoints
+Per-chunk segment logs so interrupted transcriptions resume where they stopped
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+CHECKPOINT_VERSION = 1
+DEFAULT_CHECKPOINT_ROOT = Path.home() / ".cache" / "vectorvault" / "transcripts"
+
+
+def default_checkpoint_dir(audio_file: str) -> Path:
+    """Checkpoint directory for one recording ($VECTORVAULT_CHECKPOINTS or ~/.cache/vectorvault/transcripts)"""
+    root = Path(os.environ.get('VECTORVAULT_CHECKPOINTS') or DEFAULT_CHECKPOINT_ROOT)
+    path_key = hashlib.sha1(str(Path(audio_file).resolve()).encode()).hexdigest()[:16]
+    return root / f"{Path(audio_file).stem}-{path_key}"
+
+
+def clear_checkpoints(checkpoint_dir: str):
+    """Remove a recording's checkpoints once its final transcription is saved"""
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+
+class TranscriptionCheckpoint:
+    def __init__(self, checkpoint_dir: str, audio_file: str, model: str,
+                 chunks: List[Dict], options: Optional[Dict] = None, backend: Optional[str] = None):
+        """
+        Initialize checkpoints for one transcription run
+
+        Every chunk gets a JSON-lines log of the worker's segment and progress
+        messages. A manifest records the audio file (size + mtime), backend,
+        model, options and chunk plan; if any of them changed since the last
+        run the old checkpoints are discarded instead of being stitched in.
+
+        Args:
+            checkpoint_dir: Directory holding the manifest and chunk logs
+            audio_file: Recording being transcribed
+            model: Whisper model name
+            chunks: Chunk plan from whisper_parallel.plan_chunks
+            options: Extra transcribe options that shape the output
+            backend: ASR backend name
+        """
+        self.checkpoint_dir = Path(checkpoint_dir)
+        stat = os.stat(audio_file)
+
+        manifest = {
+            'version': CHECKPOINT_VERSION,
+            'audio_file': str(Path(audio_file).resolve()),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'backend': backend,
+            'model': model,
+            'options': options or {},
+            'chunks': [chunk['clips'] for chunk in chunks]
+        }
+
+        manifest_path = self.checkpoint_dir / "manifest.json"
+        previous = None
+        if manifest_path.exists():
+            with open(manifest_path, 'r') as f:
+                previous = json.load(f)
+
+        if previous != manifest:
+            if previous is not None:
+                print("Checkpoints are from a different run, starting over")
+            clear_checkpoints(self.checkpoint_dir)
+            self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+            with open(manifest_path, 'w') as f:
+                json.dump(manifest, f)
+
+    def chunk_path(self, chunk: Dict) -> Path:
+        return self.checkpoint_dir / f"chunk_{chunk['index']:05d}.jsonl"
+
+    def load_chunk(self, chunk: Dict) -> Tuple[List[Dict], int, Optional[str], Optional[Dict]]:
+        """
+        Segments from completed clips, how many clips completed, the
+        language if the whole chunk is done (None otherwise), and the last
+        progress message, whose language and prompt let a resumed run pick
+        up exactly where the interrupted one was
+
+        Messages after the last progress line belong to a clip that was cut
+        off mid-way; they are dropped from the log so the clip reruns cleanly.
+        """
+        path = self.chunk_path(chunk)
+        if not path.exists():
+            return [], 0, None, None
+
+        with open(path, 'r') as f:
+            lines = f.readlines()
+
+        segments, pending = [], []
+        last_progress = None
+        completed_clips = 0
+        kept_lines = 0
+        for i, line in enumerate(lines):
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn write from a crash
+                break
+            if message['type'] == 'segment':
+                pending.append(message['segment'])
+            elif message['type'] == 'progress':
+                segments.extend(pending)
+                pending = []
+                completed_clips += 1
+                kept_lines = i + 1
+                last_progress = message
+            elif message['type'] == 'done':
+                return segments, completed_clips, message['language'], last_progress
+
+        if kept_lines < len(lines):
+            temp_path = path.with_suffix('.tmp')
+            with open(temp_path, 'w') as f:
+                f.writelines(lines[:kept_lines])
+            os.replace(temp_path, path)
+
+        return segments, completed_clips, None, last_progress
+
+    def append(self, chunk: Dict, message: Dict):
+        """Log one worker message; progress and done lines are synced to disk"""
+        with open(self.chunk_path(chunk), 'a') as f:
+            f.write(json.dumps(message) + "\n")
+            if message['type'] in ('progress', 'done'):
+                f.flush()
+                os.fsync(f.fileno())
@@ -1,42 +1,54 @@
 #!/usr/bin/env python3
 """
 VectorVault Direct Whisper Transcription
-Direct Whisper processing without subprocess complexity
+Chunked parallel Whisper transcription of the full conversation
 """
 
-import whisper
-import json
+import os
 from pathlib import Path
 
-def transcribe_conversation():
+from asr_backends import default_backend, default_device
+from audio_basic import EnergyZcrVAD
+from feature_cache import FeatureCache
+from feature_file import save_features
+from whisper_checkpoint import clear_checkpoints
+from whisper_parallel import transcribe_chunked
+
+def transcribe_conversation(workers: int = None, threads_per_worker: int = None, backend: str = None):
     """Transcribe the full conversation using Whisper"""
     
     audio_file = "/home/jonclaude/Agents/Claude on Studio/Woodside-Animation/conversation_audio.wav"
+    output_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.npz"
+    checkpoint_dir = Path(output_file).parent / "whisper_checkpoints"
     
-    print("🎤 Loading Whisper model...")
-    model = whisper.load_model("base")  # Using base model for speed/accuracy balance
+    print("🗣️ Detecting speech regions...")
+    speech_intervals = EnergyZcrVAD().detect_file(audio_file)
+    speech_time = sum(interval['duration'] for interval in speech_intervals)
+    print(f"Speech: {len(speech_intervals)} intervals, {speech_time:.1f}s")
     
     print(f"🎵 Transcribing: {audio_file}")
-    print("⚡ Using RTX 2070 SUPER acceleration...")
+    device = default_device()
+    backend = backend or default_backend()
+    print(f"⚡ Backend: {backend}, device: {device} ({os.cpu_count()} cores)")
+    
+    def report(chunk, segments):
+        print(f"  Chunk {chunk['index'] + 1}: {chunk['start']:.0f}-{chunk['end']:.0f}s, {len(segments)} segments")
     
-    # Transcribe with word-level timestamps
-    result = model.transcribe(
+    # Speech is cut into chunks at pauses and transcribed by a worker pool;
+    # fp16 is only used when the workers run on CUDA. Finished clips are
+    # checkpointed, so rerunning after an interruption picks up where it stopped
+    result = transcribe_chunked(
         audio_file,
-        word_timestamps=True,
-        verbose=True,  # Show progress
-        fp16=True,     # Use half-precision for speed on GPU
+        speech_intervals,
+        model="base",  # Using base model for speed/accuracy balance
+        workers=workers,
+        threads_per_worker=threads_per_worker,
+        device=device,
+        backend=backend,
+        on_chunk=report,
+        checkpoint_dir=str(checkpoint_dir),
     )
-    
-    # Extract word-level data
-    words_data = []
-    for segment in result.get("segments", []):
-        for word in segment.get("words", []):
-            words_data.append({
-                "word": word.get("word", "").strip(),
-                "start": word.get("start", 0),
-                "end": word.get("end", 0),
-                "confidence": word.get("probability", 0.5)
-            })
+    words_data = result["words"]
     
     transcription = {
         "text": result.get("text", ""),
@@ -44,18 +56,21 @@ def transcribe_conversation():
         "words": words_data,
         "segments": result.get("segments", []),
         "metadata": {
+            # What produced this transcription
+            "audio_file": audio_file,
+            "audio_sha256": FeatureCache().media_hash(audio_file),
+            "backend": backend,
             "model": "base",
+            "device": device,
             "total_words": len(words_data),
-            "duration": max([w["end"] for w in words_data]) if words_data else 0
+            "duration": max([w["end"] for w in words_data]) if words_data else 0,
+            "speech_intervals": speech_intervals
         }
     }
     
-    # Save complete transcription
-    output_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.json"
-    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_file, 'w') as f:
-        json.dump(transcription, f, indent=2)
+    # Save complete transcription (assembled from the checkpoints), then drop them
+    save_features(transcription, output_file)
+    clear_checkpoints(checkpoint_dir)
     
     print(f"\n📊 Transcription Complete:")
     print(f"Total words: {len(words_data)}")
@@ -67,7 +82,8 @@ def transcribe_conversation():
     if words_data:
         print(f"\n🔍 First 10 words:")
         for i, word in enumerate(words_data[:10]):
-            print(f"  {word['start']:.1f}s: '{word['word']}' (confidence: {word['confidence']:.2f})")
+            confidence = 'n/a' if word['confidence'] is None else f"{word['confidence']:.2f}"
+            print(f"  {word['start']:.1f}s: '{word['word']}' (confidence: {confidence})")
     
     return transcription
 
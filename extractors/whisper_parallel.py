@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+VectorVault Parallel Whisper
+Chunked multi-process transcription cut at VAD pauses, stitched by word timestamps
+"""
+
+import os
+import queue
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from asr_backends import default_device
+from audio_basic import EnergyZcrVAD
+from whisper_checkpoint import TranscriptionCheckpoint
+from whisper_worker import WhisperWorker, anchored_groups, group_intervals, words_from_segments
+
+DEFAULT_CHUNK_SECONDS = 300.0
+DEFAULT_OVERLAP = 2.0
+DEFAULT_THREADS_PER_WORKER = 2
+
+
+def start_pool(workers: Optional[int] = None, threads_per_worker: Optional[int] = None,
+               device: Optional[str] = None, backend: Optional[str] = None,
+               use_cache: bool = True) -> List[WhisperWorker]:
+    """
+    Persistent Whisper workers sized for this machine
+
+    On CPU the cores are split between workers (threads_per_worker each), so
+    wall-clock time scales with core count; on CUDA one worker owns the GPU.
+    """
+    device = device or default_device()
+    if device == "cuda":
+        workers = workers or 1
+    else:
+        threads_per_worker = threads_per_worker or DEFAULT_THREADS_PER_WORKER
+        workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+    return [WhisperWorker(device=device, threads=threads_per_worker, backend=backend, use_cache=use_cache)
+            for _ in range(workers)]
+
+
+def plan_chunks(speech_intervals: List[Dict], chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+                overlap: float = DEFAULT_OVERLAP) -> List[Dict]:
+    """
+    Cut speech into chunks of at most chunk_seconds at VAD pauses
+
+    Each chunk owns the words whose midpoint falls in [core_start, core_end);
+    core bounds sit in the middle of the pause between chunks. Only speech
+    longer than chunk_seconds is cut mid-stream, and the overlap seconds
+    decoded on either side of every chunk keep words at such a cut intact.
+    """
+    # Speech longer than one chunk has no pause to cut at: split it outright
+    pieces = []
+    for interval in speech_intervals:
+        start = interval['start']
+        while interval['end'] - start > chunk_seconds:
+            pieces.append({'start': start, 'end': start + chunk_seconds})
+            start += chunk_seconds
+        pieces.append({'start': start, 'end': interval['end']})
+
+    # Cut at locally longest pauses, so an edit only moves nearby chunk edges
+    groups = anchored_groups(pieces, chunk_seconds)
+
+    chunks = []
+    for i, group in enumerate(groups):
+        core_start = (groups[i - 1][-1]['end'] + group[0]['start']) / 2 if i > 0 else 0.0
+        core_end = (group[-1]['end'] + groups[i + 1][0]['start']) / 2 if i + 1 < len(groups) else float('inf')
+
+        # ~30 s clips match Whisper's window, so silence between them is skipped
+        clips = group_intervals(group, max_seconds=30.0)
+        clips[0][0] = max(0.0, clips[0][0] - overlap)
+        clips[-1][1] += overlap
+
+        chunks.append({
+            'index': i,
+            'start': clips[0][0],
+            'end': clips[-1][1],
+            'core_start': core_start,
+            'core_end': core_end,
+            'clips': clips
+        })
+
+    return chunks
+
+
+def _normalize(word: str) -> str:
+    return word.strip().lower().strip('.,!?;:"\'')
+
+
+def is_overlap_duplicate(word: Dict, previous: List[Dict], tolerance: float = 0.5) -> bool:
+    """True when the same token starts within tolerance seconds of one of the previous chunk's seam words"""
+    token = _normalize(word['word'])
+    return any(_normalize(seen['word']) == token and abs(seen['start'] - word['start']) < tolerance
+               for seen in previous)
+
+
+def stitch_chunks(chunks: List[Dict], chunk_segments: List[List[Dict]],
+                  overlap: float = DEFAULT_OVERLAP) -> List[Dict]:
+    """
+    Join per-chunk segments into one timeline
+
+    Each chunk keeps the words whose midpoint lies in its core range. The
+    overlap seconds before core_start are kept too, unless the previous
+    chunk already has the word: a word cut mid-speech can be timed on
+    opposite sides of core_start by the two chunks, and would otherwise be
+    dropped by both. Duplicates are only looked for within overlap of the
+    seam and only among the previous chunk's words there, so a genuine
+    repetition ("no, no") elsewhere is left alone.
+    """
+    segments = []
+    seam_words = []
+
+    for i, (chunk, results) in enumerate(zip(chunks, chunk_segments)):
+        core_start, core_end = chunk['core_start'], chunk['core_end']
+        keep_from = core_start - overlap if i > 0 else core_start
+        chunk_words = []
+
+        for segment in results:
+            words = segment.get('words', [])
+            if not words:
+                midpoint = (segment['start'] + segment['end']) / 2
+                if core_start <= midpoint < core_end:
+                    segments.append(dict(segment))
+                continue
+
+            kept = []
+            for word in words:
+                midpoint = (word['start'] + word['end']) / 2
+                if not keep_from <= midpoint < core_end:
+                    continue
+                if midpoint < core_start + overlap and is_overlap_duplicate(word, seam_words):
+                    continue
+                kept.append(word)
+            if not kept:
+                continue
+
+            stitched = dict(segment, words=kept, start=kept[0]['start'], end=kept[-1]['end'])
+            if len(kept) != len(words):
+                stitched['text'] = "".join(w['word'] for w in kept)
+            segments.append(stitched)
+            chunk_words.extend(kept)
+
+        seam_words = [w for w in chunk_words if (w['start'] + w['end']) / 2 >= core_end - overlap]
+
+    for i, segment in enumerate(segments):
+        segment['id'] = i
+    return segments
+
+
+def transcribe_chunked(audio_file: str, speech_intervals: Optional[List[Dict]] = None,
+                       model: str = "base", workers: Optional[int] = None,
+                       threads_per_worker: Optional[int] = None,
+                       chunk_seconds: float = DEFAULT_CHUNK_SECONDS, overlap: float = DEFAULT_OVERLAP,
+                       device: Optional[str] = None, backend: Optional[str] = None,
+                       on_chunk: Optional[Callable[[Dict, List[Dict]], None]] = None,
+                       pool: Optional[List[WhisperWorker]] = None,
+                       checkpoint_dir: Optional[str] = None, use_cache: bool = True,
+                       **options) -> Dict:
+    """
+    Transcribe a long recording with a pool of persistent Whisper workers
+
+    With a checkpoint_dir every finished clip is logged to disk, so a rerun
+    after a crash or interruption skips finished chunks and restarts partial
+    ones at their last completed clip. fp16 is only used on CUDA workers.
+
+    Args:
+        audio_file: Audio or video file (anything ffmpeg reads)
+        speech_intervals: VAD intervals (detected here when not given)
+        model: Whisper model name
+        workers: Worker processes (default: cores / threads_per_worker on CPU, 1 on CUDA)
+        threads_per_worker: Torch threads per worker on CPU
+        chunk_seconds: Longest span of audio one worker transcribes at a time
+        overlap: Seconds decoded past each chunk edge
+        device: 'cpu' or 'cuda' (default: cuda if available)
+        backend: ASR backend name (default: asr_backends.default_backend())
+        on_chunk: Called with (chunk, segments) as each chunk finishes
+        pool: Already-started workers to reuse (left running afterwards)
+        checkpoint_dir: Where to log finished clips for resuming
+        use_cache: Reuse clips already in the transcript cache (only clips whose
+            audio changed are decoded again)
+        **options: Extra model.transcribe options (e.g. language)
+
+    Returns:
+        Transcription dict with text, language, words and segments
+    """
+    if speech_intervals is None:
+        speech_intervals = EnergyZcrVAD().detect_file(audio_file)
+
+    chunks = plan_chunks(speech_intervals, chunk_seconds, overlap)
+
+    owns_pool = pool is None
+    if owns_pool:
+        # Workers only start on first use; drop the ones there is no chunk for
+        pool = start_pool(workers, threads_per_worker, device, backend, use_cache)[:max(1, len(chunks))]
+    backend = pool[0].backend
+    print(f"Transcribing {len(chunks)} chunks with {len(pool)} {backend} worker(s) on {pool[0].device}")
+
+    checkpoint = None
+    if checkpoint_dir:
+        checkpoint = TranscriptionCheckpoint(checkpoint_dir, audio_file, model, chunks, options, backend)
+
+    idle = queue.Queue()
+    for worker in pool:
+        idle.put(worker)
+
+    languages = Counter()
+    clip_counts = Counter()
+
+    def run_chunk(chunk: Dict) -> List[Dict]:
+        segments, completed_clips, language, last_progress = [], 0, None, None
+        if checkpoint:
+            segments, completed_clips, language, last_progress = checkpoint.load_chunk(chunk)
+            if language is None and completed_clips:
+                print(f"  Chunk {chunk['index'] + 1}: resuming after {completed_clips}/{len(chunk['clips'])} clips")
+
+        # Continue with the language and prompt the interrupted run had reached
+        chunk_options, prompt = dict(options), None
+        if last_progress:
+            if last_progress.get('language'):
+                chunk_options.setdefault('language', last_progress['language'])
+            prompt = last_progress.get('prompt')
+
+        remaining = chunk['clips'][completed_clips:]
+        if language is None and remaining:
+            worker = idle.get()
+            try:
+                for message in worker.transcribe_segments(audio_file, model, remaining, prompt, **chunk_options):
+                    if checkpoint:
+                        checkpoint.append(chunk, message)
+                    if message['type'] == 'segment':
+                        segments.append(message['segment'])
+                    elif message['type'] == 'progress':
+                        clip_counts['cached' if message.get('cached') else 'decoded'] += 1
+                    elif message['type'] == 'done':
+                        language = message['language']
+            finally:
+                idle.put(worker)
+        elif language is None:
+            # Every clip finished but the done line never made it to disk
+            language = chunk_options.get('language') or "unknown"
+            if checkpoint:
+                checkpoint.append(chunk, {'type': 'done', 'language': language})
+
+        languages[language] += 1
+        if on_chunk:
+            on_chunk(chunk, segments)
+        return segments
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(pool)) as executor:
+            chunk_segments = list(executor.map(run_chunk, chunks))
+    finally:
+        if owns_pool:
+            for worker in pool:
+                worker.close()
+
+    if clip_counts['cached']:
+        print(f"Transcript cache: {clip_counts['cached']} clips reused, {clip_counts['decoded']} decoded")
+
+    segments = stitch_chunks(chunks, chunk_segments, overlap)
+
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "language": languages.most_common(1)[0][0] if languages else "unknown",
+        "words": words_from_segments(segments),
+        "segments": segments,
+        "backend": backend
+    }
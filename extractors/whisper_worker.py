@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+VectorVault Whisper Worker
+Long-lived transcription process: models load once, jobs arrive as JSON lines
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from asr_backends import default_backend, load_backend
+from audio_io import audio_blocks
+from transcript_cache import TranscriptCache
+
+WHISPER_SAMPLE_RATE = 16000
+
+
+def anchored_groups(intervals: List[Dict], max_seconds: float) -> List[List[Dict]]:
+    """
+    Split consecutive intervals into groups spanning at most max_seconds
+
+    Groups are cut at pauses picked from nearby audio only: a pause is a cut
+    when it is longer than every earlier pause and at least as long as every
+    later pause within max_seconds / 2 of it. Where the cuts fall therefore
+    does not depend on where the recording (or an earlier group) starts, so
+    an edit moves only the cuts near it instead of every boundary after it.
+    A stretch between cuts that is still too long is grouped greedily
+    within itself.
+    """
+    if not intervals:
+        return []
+
+    gaps = np.array([b['start'] - a['end'] for a, b in zip(intervals, intervals[1:])], dtype=np.float64)
+    times = np.array([(a['end'] + b['start']) / 2 for a, b in zip(intervals, intervals[1:])], dtype=np.float64)
+    half = max_seconds / 2
+
+    stretches = [[intervals[0]]]
+    for k, interval in enumerate(intervals[1:]):
+        lo = np.searchsorted(times, times[k] - half, side='left')
+        hi = np.searchsorted(times, times[k] + half, side='right')
+        if np.all(gaps[lo:k] < gaps[k]) and np.all(gaps[k + 1:hi] <= gaps[k]):
+            stretches.append([interval])
+        else:
+            stretches[-1].append(interval)
+
+    groups = []
+    for stretch in stretches:
+        groups.append([stretch[0]])
+        for interval in stretch[1:]:
+            if interval['end'] - groups[-1][0]['start'] <= max_seconds:
+                groups[-1].append(interval)
+            else:
+                groups.append([interval])
+    return groups
+
+
+def group_intervals(intervals: List[Dict], max_seconds: float = 120.0) -> List[List[float]]:
+    """
+    Merge consecutive speech intervals into clips of at most max_seconds
+
+    Each clip runs through Whisper as one call, so its segments can be
+    streamed back as soon as the clip finishes. Clips are cut as in
+    anchored_groups, so unchanged audio keeps its clip boundaries (and its
+    transcript cache entries) when the recording is edited elsewhere.
+    """
+    return [[group[0]['start'], group[-1]['end']] for group in anchored_groups(intervals, max_seconds)]
+
+
+def words_from_segments(segments: List[Dict]) -> List[Dict]:
+    """Flatten Whisper segments into the word table used across VectorVault"""
+    words_data = []
+    for segment in segments:
+        for word in segment.get("words", []):
+            words_data.append({
+                "word": word.get("word", "").strip(),
+                "start": word.get("start", 0),
+                "end": word.get("end", 0),
+                "confidence": word.get("probability")
+            })
+    return words_data
+
+
+def shift_segment(segment: Dict, offset: float) -> Dict:
+    """JSON-safe copy of a Whisper segment with times moved by offset"""
+    shifted = {
+        "id": int(segment.get("id", 0)),
+        "start": float(segment["start"]) + offset,
+        "end": float(segment["end"]) + offset,
+        "text": segment.get("text", ""),
+        "avg_logprob": float(segment.get("avg_logprob", 0.0)),
+        "no_speech_prob": float(segment.get("no_speech_prob", 0.0)),
+        "words": []
+    }
+    for word in segment.get("words", []):
+        shifted["words"].append({
+            "word": word.get("word", ""),
+            "start": float(word.get("start", 0)) + offset,
+            "end": float(word.get("end", 0)) + offset,
+            "probability": None if word.get("probability") is None else float(word["probability"])
+        })
+    return shifted
+
+
+# ---------------------------------------------------------------------------
+# Worker side (runs in the long-lived process)
+# ---------------------------------------------------------------------------
+
+def read_span(audio_file: str, start: float = 0.0, end: Optional[float] = None) -> np.ndarray:
+    """
+    Samples (int16 scale) from start to end seconds at 16 kHz
+
+    The reader seeks to start (WAV offset or ffmpeg input seek) and stops at
+    end, so a job decodes only its own span and never holds the whole
+    recording in memory.
+    """
+    duration = None if end is None else max(0.0, end - start)
+    _, blocks = audio_blocks(audio_file, 60, WHISPER_SAMPLE_RATE, start, duration)
+    pieces = list(blocks)
+    samples = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+    if end is not None:
+        samples = samples[:int(end * WHISPER_SAMPLE_RATE) - int(start * WHISPER_SAMPLE_RATE)]
+    return samples
+
+
+def run_job(job: Dict, models: Dict, threads: Optional[int] = None, caches: Optional[Dict] = None) -> Iterator[Dict]:
+    """Transcribe one file clip by clip, yielding one message per segment"""
+    backend_name = job.get("backend") or default_backend()
+    model_name = job.get("model", "base")
+    key = (backend_name, model_name, job.get("device"))
+    if key not in models:
+        models[key] = load_backend(backend_name, model_name, job.get("device"), threads)
+    backend = models[key]
+
+    cache = None
+    if job.get("use_cache") and caches is not None:
+        cache_dir = job.get("cache_dir")
+        if cache_dir not in caches:
+            caches[cache_dir] = TranscriptCache(cache_dir)
+        cache = caches[cache_dir]
+
+    options = dict(job.get("options", {}))
+
+    # Only the span the clips cover is decoded
+    clips = job.get("clips")
+    span_start = clips[0][0] if clips else 0.0
+    audio = read_span(job["audio_file"], span_start, clips[-1][1] if clips else None)
+    if not clips:
+        clips = [[0.0, len(audio) / WHISPER_SAMPLE_RATE]]
+    span_offset = int(span_start * WHISPER_SAMPLE_RATE)
+
+    segment_id = 0
+    # A resumed chunk continues from the text its last finished clip left behind
+    texts = [job["prompt"]] if job.get("prompt") else []
+    for start, end in clips:
+        clip = audio[int(start * WHISPER_SAMPLE_RATE) - span_offset:int(end * WHISPER_SAMPLE_RATE) - span_offset]
+        cached = False
+        if len(clip):
+            # Carry the last words over so each clip is conditioned on the one before;
+            # not when caching, so a clip's result depends on its own audio alone and an
+            # edit cannot invalidate every later clip through the prompt
+            prompt = None if cache is not None else " ".join(texts)[-200:] or None
+
+            result = None
+            if cache is not None:
+                cache_key = cache.cache_key(clip, backend_name, model_name, backend.precision, options)
+                result = cache.get(cache_key)
+                cached = result is not None
+
+            if result is None:
+                # Engines expect [-1, 1]; audio_io decodes to int16 scale
+                result = backend.transcribe((clip / 32768.0).astype(np.float32), initial_prompt=prompt, **options)
+                result = {
+                    "language": result.get("language"),
+                    "segments": [shift_segment(segment, 0.0) for segment in result.get("segments", [])]
+                }
+                if cache is not None:
+                    cache.put(cache_key, result, backend_name, model_name, len(clip) / WHISPER_SAMPLE_RATE)
+
+            # Detect the language once, then keep it fixed for the remaining clips
+            if result.get("language"):
+                options.setdefault("language", result["language"])
+
+            for segment in result["segments"]:
+                segment = shift_segment(segment, start)
+                segment["id"] = segment_id
+                segment_id += 1
+                texts.append(segment["text"].strip())
+                yield {"type": "segment", "segment": segment}
+
+        # One progress message per clip, so clients can checkpoint clip by clip; it carries
+        # the language and prompt tail a resumed run needs to continue exactly
+        yield {"type": "progress", "clip_end": end, "cached": cached,
+               "language": options.get("language"), "prompt": " ".join(texts)[-200:]}
+
+    yield {"type": "done", "language": options.get("language") or "unknown",
+           "backend": backend_name, "device": backend.device, "precision": backend.precision}
+
+
+def serve(stdin=sys.stdin, stdout=sys.stdout, threads: Optional[int] = None):
+    """Read JSON-line jobs until EOF or a shutdown request"""
+    # Whisper and tqdm print to stdout; keep the protocol stream clean
+    sys.stdout = sys.stderr
+    # Loaded engines by (backend, model, device); the thread budget lets a
+    # pool of workers share the cores
+    models = {}
+    caches = {}
+
+    def send(message):
+        stdout.write(json.dumps(message) + "\n")
+        stdout.flush()
+
+    for line in stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        job_id = job.get("id")
+        op = job.get("op", "transcribe")
+
+        if op == "shutdown":
+            break
+        if op == "ping":
+            send({"id": job_id, "type": "pong", "models": sorted(f"{b}:{m}" for b, m, _ in models)})
+            continue
+
+        try:
+            for message in run_job(job, models, threads, caches):
+                message["id"] = job_id
+                send(message)
+        except Exception as e:
+            send({"id": job_id, "type": "error", "message": str(e)})
+
+
+# ---------------------------------------------------------------------------
+# Client side
+# ---------------------------------------------------------------------------
+
+class WhisperWorker:
+    def __init__(self, python: str = sys.executable, device: Optional[str] = None,
+                 threads: Optional[int] = None, backend: Optional[str] = None,
+                 use_cache: bool = True, cache_dir: Optional[str] = None):
+        """
+        Client for a persistent Whisper worker process
+
+        Args:
+            python: Interpreter that has the ASR engine installed
+            device: 'cpu' or 'cuda' (default: cuda if available)
+            threads: CPU threads the worker may use (default: all cores)
+            backend: ASR backend name (default: asr_backends.default_backend())
+            use_cache: Reuse per-clip results from the transcript cache
+            cache_dir: Transcript cache directory (default: transcript_cache.default_cache_dir())
+        """
+        self.python = python
+        self.device = device
+        self.threads = threads
+        self.backend = backend or default_backend()
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self.process = None
+        self.next_id = 0
+
+    def start(self):
+        """Launch the worker process (models are loaded on first use)"""
+        if self.process is None or self.process.poll() is not None:
+            command = [self.python, str(Path(__file__).resolve()), "--serve"]
+            env = None
+            if self.threads:
+                command += ["--threads", str(self.threads)]
+                env = dict(os.environ, OMP_NUM_THREADS=str(self.threads), MKL_NUM_THREADS=str(self.threads))
+            self.process = subprocess.Popen(
+                command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1, env=env
+            )
+        return self
+
+    def request(self, job: Dict) -> Iterator[Dict]:
+        """Send one job and yield its messages until it completes"""
+        self.start()
+        job = dict(job, id=self.next_id)
+        self.next_id += 1
+
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise Exception(f"Whisper worker exited unexpectedly (code {self.process.wait()})")
+            message = json.loads(line)
+            if message.get("id") != job["id"]:
+                continue
+            if message["type"] == "error":
+                raise Exception(f"Whisper transcription failed: {message['message']}")
+            yield message
+            if message["type"] in ("done", "pong"):
+                return
+
+    def ping(self) -> Dict:
+        """Round trip to the worker; reports which models are loaded"""
+        return next(self.request({"op": "ping"}))
+
+    def transcribe_segments(self, audio_file: str, model: str = "base",
+                            clips: Optional[List[List[float]]] = None, prompt: Optional[str] = None,
+                            **options) -> Iterator[Dict]:
+        """Stream segment, progress and done messages for one recording (prompt: text preceding the first clip)"""
+        job = {"op": "transcribe", "audio_file": audio_file, "model": model,
+               "backend": self.backend, "options": options,
+               "use_cache": self.use_cache, "cache_dir": self.cache_dir}
+        if clips:
+            job["clips"] = clips
+        if prompt:
+            job["prompt"] = prompt
+        if self.device:
+            job["device"] = self.device
+        yield from self.request(job)
+
+    def transcribe(self, audio_file: str, model: str = "base",
+                   clips: Optional[List[List[float]]] = None, **options) -> Dict:
+        """Transcribe one recording into the text / language / words / segments dict"""
+        segments = []
+        language = "en"
+        for message in self.transcribe_segments(audio_file, model, clips, **options):
+            if message["type"] == "segment":
+                segments.append(message["segment"])
+            elif message["type"] == "done":
+                language = message["language"]
+
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "language": language,
+            "words": words_from_segments(segments),
+            "segments": segments
+        }
+
+    def close(self):
+        """Ask the worker to exit and wait for it"""
+        if self.process is not None and self.process.poll() is None:
+            try:
+                self.process.stdin.write(json.dumps({"op": "shutdown"}) + "\n")
+                self.process.stdin.close()
+            except BrokenPipeError:
+                pass
+            self.process.wait()
+        self.process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+if __name__ == "__main__":
+    if "--serve" in sys.argv:
+        threads = int(sys.argv[sys.argv.index("--threads") + 1]) if "--threads" in sys.argv else None
+        serve(threads=threads)
+    else:
+        print("Usage: whisper_worker.py --serve  (JSON-line jobs on stdin, results on stdout)")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+VectorVault Word Windows
+Single-pass time windows over word timestamps (overlapping, several sizes at once)
+"""
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+def window_bounds(starts: np.ndarray, window_sizes: Union[float, Sequence[float]] = 10.0,
+                  hop: Optional[float] = None,
+                  duration: float = 0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (window_start, window_end, lo, hi) arrays of every non-empty window
+
+    starts must be sorted. A word belongs to [window_start, window_end)
+    when its start time does, and words[lo:hi] are the window's words.
+    Windows start every hop seconds (default: the smallest window size, so
+    no overlap) and each start has one window per size, smallest first.
+    Both edges are found by binary search over starts for all windows at
+    once, instead of a scan over every word per window.
+
+    Args:
+        starts: Sorted word start times
+        window_sizes: Window length in seconds, or several lengths
+        hop: Seconds between window starts
+        duration: Last window starts before this
+    """
+    sizes = np.sort(np.atleast_1d(np.asarray(window_sizes, dtype=np.float64)))
+    hop = hop or float(sizes[0])
+    if hop <= 0 or sizes[0] <= 0:
+        raise Exception(f"Window sizes and hop must be positive (got {sizes.tolist()}, hop {hop})")
+
+    empty = np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.float64), \
+        np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    if len(starts) == 0:
+        return empty
+
+    # From the first window that can reach the first word to the last one before duration
+    first = max(0, int((starts[0] - sizes[-1]) // hop) + 1)
+    grid = np.arange(first, max(first, int(np.ceil(duration / hop)) + 1)) * hop
+    grid = grid[grid < duration]
+    if len(grid) == 0:
+        return empty
+
+    window_start = np.repeat(grid, len(sizes))
+    window_end = window_start + np.tile(sizes, len(grid))
+    lo = np.searchsorted(starts, window_start, side='left')
+    hi = np.searchsorted(starts, window_end, side='left')
+
+    keep = hi > lo
+    return window_start[keep], window_end[keep], lo[keep], hi[keep]
+
+
+def iter_word_windows(words: List[Dict], window_sizes: Union[float, Sequence[float]] = 10.0,
+                      hop: Optional[float] = None,
+                      duration: Optional[float] = None) -> Iterator[Tuple[float, float, List[Dict]]]:
+    """
+    Yield (window_start, window_end, window_words) for every non-empty window
+
+    Same windows as window_bounds, over a list of word dicts (unsorted
+    input is sorted by start first).
+
+    Args:
+        words: Word dicts with "start" (and "end" when duration is not given)
+        window_sizes: Window length in seconds, or several lengths
+        hop: Seconds between window starts
+        duration: Last window starts before this (default: latest word end)
+    """
+    if not words:
+        return
+
+    if any(words[i]["start"] > words[i + 1]["start"] for i in range(len(words) - 1)):
+        words = sorted(words, key=lambda w: w["start"])
+    if duration is None:
+        duration = max(w["end"] for w in words)
+
+    starts = np.array([w["start"] for w in words], dtype=np.float64)
+    for window_start, window_end, lo, hi in zip(*window_bounds(starts, window_sizes, hop, duration)):
+        yield float(window_start), float(window_end), words[lo:hi]
@@ -9,10 +9,16 @@ import sqlite3
 from pathlib import Path
 from datetime import datetime
 import math
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "extractors"))
+
+from feature_file import load_features
+from transcript import load_transcript
 
 class NexusCorrelator:
     def __init__(self):
-        self.conversation_data = None
+        self.transcript = None
         self.journal_data = None
         self.correlations = []
         
@@ -20,24 +26,22 @@ class NexusCorrelator:
         """Load conversation and journal analysis data"""
         
         # Load conversation analysis
-        conv_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.json"
-        with open(conv_file, 'r') as f:
-            self.conversation_data = json.load(f)
+        conv_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.npz"
+        self.transcript = load_transcript(conv_file)
         
         # Load journal analysis
         journal_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/journal_analysis.json"
-        with open(journal_file, 'r') as f:
-            self.journal_data = json.load(f)
+        self.journal_data = load_features(journal_file)
         
         print("📊 NEXUS DATA LOADED:")
-        print(f"  Conversation: {len(self.conversation_data.get('words', []))} words")
+        print(f"  Conversation: {len(self.transcript)} words")
         print(f"  Journal: {self.journal_data['metadata']['total_entries']} entries")
     
     def find_theme_correlations(self):
         """Find theme overlaps between conversation and journal"""
         
         # Extract conversation themes from text
-        words_text = " ".join([w["word"] for w in self.conversation_data.get("words", [])])
+        words_text = self.transcript.join()
         conv_themes = self.extract_conversation_themes(words_text)
         
         # Get journal themes
@@ -84,7 +88,7 @@ class NexusCorrelator:
         """Calculate correlation strength between conversation and journal theme"""
         
         # Normalize conversation strength (per 1000 words)
-        total_words = len(self.conversation_data.get("words", []))
+        total_words = len(self.transcript)
         conv_normalized = (conv_strength / total_words) * 1000
         
         # Normalize journal entries (per 10 entries)
@@ -173,7 +177,7 @@ class NexusCorrelator:
         nexus_analysis = {
             "metadata": {
                 "analysis_date": datetime.now().isoformat(),
-                "conversation_words": len(self.conversation_data.get("words", [])),
+                "conversation_words": len(self.transcript),
                 "journal_entries": self.journal_data['metadata']['total_entries'],
                 "date_range": self.journal_data['metadata']['date_range']
             },
@@ -198,8 +202,8 @@ class NexusCorrelator:
         
         print(f"\n📊 DATA SCOPE:")
         print(f"  Journal entries: {self.journal_data['metadata']['total_entries']} ({self.journal_data['metadata']['date_range']})")
-        print(f"  Conversation length: {len(self.conversation_data.get('words', []))} words")
-        print(f"  Total words analyzed: {self.journal_data['metadata']['total_words'] + len(self.conversation_data.get('words', []))}")
+        print(f"  Conversation length: {len(self.transcript)} words")
+        print(f"  Total words analyzed: {self.journal_data['metadata']['total_words'] + len(self.transcript)}")
         
         print(f"\n🎯 DOMINANT LIFE THEMES:")
         for theme in insights["dominant_themes"]:
@@ -9,11 +9,17 @@ import sqlite3
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "extractors"))
+
+from feature_file import load_features
+from transcript import load_transcript
 
 class UnifiedNexusCorrelator:
     def __init__(self):
         self.db_path = "/home/jonclaude/Agents/Claude on Studio/VectorVault/storage/vectors.db"
-        self.conversation_data = None
+        self.transcript = None
         self.journal_data = None
         self.email_vectors = []
         
@@ -25,14 +31,12 @@ class UnifiedNexusCorrelator:
         print("=" * 70)
         
         # Load conversation data
-        conv_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.json"
-        with open(conv_file, 'r') as f:
-            self.conversation_data = json.load(f)
+        conv_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/whisper_transcription.npz"
+        self.transcript = load_transcript(conv_file)
         
         # Load journal data
         journal_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/journal_analysis.json"
-        with open(journal_file, 'r') as f:
-            self.journal_data = json.load(f)
+        self.journal_data = load_features(journal_file)
         
         # Load email vectors from database
         with sqlite3.connect(self.db_path) as conn:
@@ -54,7 +58,7 @@ class UnifiedNexusCorrelator:
                 })
         
         print(f"📊 DATA LOADED:")
-        print(f"  Conversation: {len(self.conversation_data.get('words', []))} words")
+        print(f"  Conversation: {len(self.transcript)} words")
         print(f"  Journal: {self.journal_data['metadata']['total_entries']} entries")
         print(f"  Email: {len(self.email_vectors)} vectors")
         
@@ -64,7 +68,7 @@ class UnifiedNexusCorrelator:
         """Analyze themes across all three data sources"""
         
         # Extract themes from conversation
-        conv_text = " ".join([w["word"] for w in self.conversation_data.get("words", [])])
+        conv_text = self.transcript.join()
         conv_themes = self.extract_themes_from_text(conv_text, "conversation")
         
         # Get journal themes
@@ -185,7 +189,7 @@ class UnifiedNexusCorrelator:
         insights = {
             'analysis_date': datetime.now().isoformat(),
             'data_sources': {
-                'conversation_words': len(self.conversation_data.get('words', [])),
+                'conversation_words': len(self.transcript),
                 'journal_entries': self.journal_data['metadata']['total_entries'],
                 'email_vectors': len(self.email_vectors)
             },
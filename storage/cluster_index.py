@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+VectorVault Cluster Index
+Mini-batch k-means over a vector collection: per-row cluster assignments for
+motif discovery and an IVF-style search that only probes the nearest clusters
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from simple_vector_db import SimpleVectorDB
+from knn_graph import collection_key
+
+
+class MiniBatchKMeans:
+    def __init__(self, n_clusters: int = 64,
+                 batch_size: int = 2048,
+                 max_iter: int = 200,
+                 tol: float = 1e-4,
+                 random_state: int = 0):
+        """
+        Initialize mini-batch k-means (Sculley 2010) with k-means++ seeding
+
+        Args:
+            n_clusters: Number of centroids
+            batch_size: Rows sampled per update step
+            max_iter: Maximum number of mini-batch steps
+            tol: Stop once the mean centroid shift falls below this
+            random_state: Seed for sampling and initialization
+        """
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.max_iter = max_iter
+        self.tol = tol
+        self.rng = np.random.default_rng(random_state)
+        self.centroids = None
+
+    def init_centroids(self, X: np.ndarray) -> np.ndarray:
+        """k-means++ seeding on a random sample"""
+
+        sample_size = min(len(X), max(10 * self.n_clusters, self.batch_size))
+        sample = X[self.rng.choice(len(X), sample_size, replace=False)]
+
+        centroids = [sample[self.rng.integers(len(sample))]]
+        closest = ((sample - centroids[0]) ** 2).sum(axis=1)
+
+        for _ in range(1, self.n_clusters):
+            total = closest.sum()
+            if total <= 0:
+                # Fewer distinct points than clusters
+                idx = self.rng.integers(len(sample))
+            else:
+                idx = self.rng.choice(len(sample), p=closest / total)
+            centroids.append(sample[idx])
+            closest = np.minimum(closest, ((sample - sample[idx]) ** 2).sum(axis=1))
+
+        return np.asarray(centroids, dtype=np.float32)
+
+    def nearest(self, X: np.ndarray, block_size: int = 8192) -> np.ndarray:
+        """Index of the nearest centroid for each row"""
+
+        centroid_sq = (self.centroids ** 2).sum(axis=1)
+        labels = np.empty(len(X), dtype=np.int32)
+
+        for start in range(0, len(X), block_size):
+            block = X[start:start + block_size]
+            # ||x - c||^2 up to the per-row constant ||x||^2
+            distances = centroid_sq[None, :] - 2.0 * (block @ self.centroids.T)
+            labels[start:start + block_size] = distances.argmin(axis=1)
+
+        return labels
+
+    def fit(self, X: np.ndarray) -> 'MiniBatchKMeans':
+        """Fit centroids with per-centroid learning rates"""
+
+        X = np.asarray(X, dtype=np.float32)
+        self.n_clusters = min(self.n_clusters, len(X))
+        self.centroids = self.init_centroids(X)
+        counts = np.zeros(self.n_clusters, dtype=np.float64)
+
+        for _ in range(self.max_iter):
+            batch = X[self.rng.choice(len(X), min(self.batch_size, len(X)), replace=False)]
+            labels = self.nearest(batch)
+            previous = self.centroids.copy()
+
+            for cluster in np.unique(labels):
+                members = batch[labels == cluster]
+                counts[cluster] += len(members)
+                rate = len(members) / counts[cluster]
+                self.centroids[cluster] += rate * (members.mean(axis=0) - self.centroids[cluster])
+
+            if np.abs(self.centroids - previous).sum(axis=1).mean() < self.tol:
+                break
+
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Assign rows to the fitted centroids"""
+        return self.nearest(np.asarray(X, dtype=np.float32))
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so k-means distances agree with cosine similarity"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class ClusterIndex:
+    def __init__(self, db: SimpleVectorDB,
+                 n_clusters: int = 64,
+                 centroid_dir: Optional[str] = None):
+        """
+        Initialize cluster index
+
+        Args:
+            db: Vector database holding the collection
+            n_clusters: Number of clusters to fit
+            centroid_dir: Where centroid files go (default: clusters/ next to the database)
+        """
+        self.db = db
+        self.conn = db.conn
+        self.n_clusters = n_clusters
+        self.centroid_dir = Path(centroid_dir) if centroid_dir else Path(db.db_path).parent / "clusters"
+        self.centroid_dir.mkdir(parents=True, exist_ok=True)
+        self._centroids = {}
+        self.create_tables()
+
+    def create_tables(self):
+        """Create cluster assignment table"""
+
+        cursor = self.conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cluster_assignments (
+                collection TEXT NOT NULL,       -- e.g. 'audio:*'
+                vector_id INTEGER NOT NULL,     -- vectors.id
+                cluster_id INTEGER NOT NULL,
+                PRIMARY KEY (collection, vector_id)
+            ) WITHOUT ROWID
+        ''')
+
+        # Probing a cluster reads all its members
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_cluster_members
+            ON cluster_assignments(collection, cluster_id)
+        ''')
+
+        self.conn.commit()
+
+    def centroid_path(self, collection: str) -> Path:
+        """Centroid file for a collection"""
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', collection)
+        return self.centroid_dir / f"{slug}.npy"
+
+    def load_centroids(self, collection: str) -> Optional[np.ndarray]:
+        """Load (and cache) fitted centroids"""
+        if collection not in self._centroids:
+            path = self.centroid_path(collection)
+            if not path.exists():
+                return None
+            self._centroids[collection] = np.load(path)
+        return self._centroids[collection]
+
+    def load_matrix(self, source_type: str, source_file: Optional[str], min_id: int = 0):
+        """Load ids and normalized vectors of the collection's dominant dimensionality"""
+
+        ids, _, _, vectors = self.db.fetch_collection(source_type, source_file, min_id)
+        if not vectors:
+            return np.array([], dtype=np.int64), np.zeros((0, 0), dtype=np.float32)
+
+        lengths = [len(v) for v in vectors]
+        dims = max(set(lengths), key=lengths.count)
+        keep = [i for i, n in enumerate(lengths) if n == dims]
+
+        matrix = np.asarray([vectors[i] for i in keep], dtype=np.float32)
+        return np.asarray([ids[i] for i in keep], dtype=np.int64), normalize_rows(matrix)
+
+    def write_assignments(self, collection: str, ids: np.ndarray, labels: np.ndarray):
+        """Insert or replace cluster assignments"""
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO cluster_assignments (collection, vector_id, cluster_id)
+            VALUES (?, ?, ?)
+        ''', [(collection, int(i), int(c)) for i, c in zip(ids, labels)])
+        self.conn.commit()
+
+    def fit(self, source_type: str, source_file: Optional[str] = None,
+            random_state: int = 0) -> Dict:
+        """Fit clusters for a collection and store every row's assignment"""
+
+        collection = collection_key(source_type, source_file)
+        ids, matrix = self.load_matrix(source_type, source_file)
+        if len(ids) == 0:
+            return {'collection': collection, 'vectors': 0, 'clusters': 0}
+
+        print(f"Clustering {len(ids)} vectors of {collection} into {self.n_clusters} clusters...")
+
+        kmeans = MiniBatchKMeans(n_clusters=self.n_clusters, random_state=random_state).fit(matrix)
+        labels = kmeans.predict(matrix)
+
+        np.save(self.centroid_path(collection), kmeans.centroids)
+        self._centroids[collection] = kmeans.centroids
+
+        self.conn.execute('DELETE FROM cluster_assignments WHERE collection = ?', (collection,))
+        self.write_assignments(collection, ids, labels)
+
+        return {'collection': collection, 'vectors': len(ids), 'clusters': len(kmeans.centroids)}
+
+    def assign_new(self, source_type: str, source_file: Optional[str] = None) -> int:
+        """Assign rows added since the last fit to their nearest existing centroid"""
+
+        collection = collection_key(source_type, source_file)
+        centroids = self.load_centroids(collection)
+        if centroids is None:
+            raise Exception(f"No clusters fitted for {collection}")
+
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT MAX(vector_id) FROM cluster_assignments WHERE collection = ?', (collection,))
+        max_id = cursor.fetchone()[0] or 0
+
+        ids, matrix = self.load_matrix(source_type, source_file, min_id=max_id)
+        if len(ids) == 0:
+            return 0
+
+        kmeans = MiniBatchKMeans(n_clusters=len(centroids))
+        kmeans.centroids = centroids
+        self.write_assignments(collection, ids, kmeans.predict(matrix))
+        return len(ids)
+
+    def search(self, query_vector: List[float], source_type: str,
+               source_file: Optional[str] = None,
+               n_probe: int = 4,
+               top_k: int = 10,
+               exclude_timestamp: Optional[float] = None,
+               window_size: float = 30.0) -> List[Dict]:
+        """IVF search: rank only the members of the n_probe nearest clusters"""
+
+        collection = collection_key(source_type, source_file)
+        centroids = self.load_centroids(collection)
+        if centroids is None:
+            raise Exception(f"No clusters fitted for {collection}")
+
+        query = normalize_rows(np.asarray([query_vector], dtype=np.float32))[0]
+        # Same squared Euclidean distance fit and assign_new cluster by; centroids
+        # are means of unit rows, so their norms differ and a dot product would not
+        distances = ((centroids - query) ** 2).sum(axis=1)
+        probes = np.argsort(distances)[:n_probe]
+
+        placeholders = ','.join('?' * len(probes))
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT v.id, v.timestamp, v.source_file, v.vector_data, v.metadata, a.cluster_id
+            FROM cluster_assignments a JOIN vectors v ON v.id = a.vector_id
+            WHERE a.collection = ? AND a.cluster_id IN ({placeholders})
+        ''', [collection] + [int(p) for p in probes])
+
+        rows = [row for row in cursor.fetchall()
+                if exclude_timestamp is None or abs(row[1] - exclude_timestamp) >= window_size]
+        rows = [row for row in rows if len(json.loads(row[3])) == len(query)]
+        if not rows:
+            return []
+
+        matrix = normalize_rows(np.asarray([json.loads(row[3]) for row in rows], dtype=np.float32))
+        scores = matrix @ query
+        best = np.argsort(-scores)[:top_k]
+
+        return [{
+            'id': rows[i][0],
+            'timestamp': rows[i][1],
+            'source_file': rows[i][2],
+            'similarity': float(scores[i]),
+            'cluster_id': rows[i][5],
+            'metadata': json.loads(rows[i][4]) if rows[i][4] else {}
+        } for i in best]
+
+    def find_similar_moments(self, target_timestamp: float, source_type: str,
+                             window_size: float = 30.0,
+                             n_probe: int = 4,
+                             top_k: int = 10) -> List[Dict]:
+        """Cluster-pruned version of SimpleVectorDB.find_similar_moments"""
+
+        target_vectors = self.db.query_by_timerange(target_timestamp - 5, target_timestamp + 5, source_type)
+        if not target_vectors:
+            return []
+
+        return self.search(target_vectors[0]['vector'], source_type,
+                           n_probe=n_probe, top_k=top_k,
+                           exclude_timestamp=target_timestamp, window_size=window_size)
+
+    def cluster_summary(self, source_type: str, source_file: Optional[str] = None,
+                        frame_gap: float = 0.15) -> List[Dict]:
+        """Describe each cluster as a recurring state: size, occurrences and run lengths"""
+
+        collection = collection_key(source_type, source_file)
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT a.cluster_id, v.timestamp, v.source_file
+            FROM cluster_assignments a JOIN vectors v ON v.id = a.vector_id
+            WHERE a.collection = ?
+            ORDER BY v.source_file, v.timestamp
+        ''', (collection,))
+
+        clusters = {}
+        previous = None
+        for cluster_id, timestamp, file_name in cursor.fetchall():
+            info = clusters.setdefault(cluster_id, {
+                'cluster_id': cluster_id, 'size': 0, 'occurrences': 0,
+                'first_timestamp': timestamp, 'last_timestamp': timestamp, 'run_seconds': 0.0
+            })
+            info['size'] += 1
+            info['first_timestamp'] = min(info['first_timestamp'], timestamp)
+            info['last_timestamp'] = max(info['last_timestamp'], timestamp)
+
+            # A new occurrence starts whenever the cluster changes or time jumps
+            continues = (previous is not None and previous[0] == cluster_id and
+                         previous[2] == file_name and timestamp - previous[1] <= frame_gap)
+            if continues:
+                info['run_seconds'] += timestamp - previous[1]
+            else:
+                info['occurrences'] += 1
+            previous = (cluster_id, timestamp, file_name)
+
+        summary = []
+        for info in clusters.values():
+            info['mean_run_seconds'] = info['run_seconds'] / info['occurrences']
+            summary.append(info)
+
+        return sorted(summary, key=lambda x: x['occurrences'], reverse=True)
+
+
+def main():
+    """Cluster the conversation audio frames into recurring acoustic states"""
+
+    db_path = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/conversation.db"
+    if not Path(db_path).exists():
+        print(f"❌ Database not found: {db_path}")
+        return
+
+    db = SimpleVectorDB(db_path)
+    index = ClusterIndex(db, n_clusters=64)
+
+    print("🧩 Clustering audio frames...")
+    result = index.fit('audio')
+    print(f"Vectors: {result['vectors']}, clusters: {result['clusters']}")
+
+    print("\n🔁 Most recurring acoustic states:")
+    for info in index.cluster_summary('audio')[:10]:
+        print(f"  Cluster {info['cluster_id']}: {info['occurrences']} occurrences, "
+              f"{info['size']} frames, mean run {info['mean_run_seconds']:.1f}s")
+
+    summary = db.get_conversation_summary()
+    test_time = summary['duration'] / 2
+    print(f"\n🔍 Cluster-pruned search around {test_time:.1f}s:")
+    for i, moment in enumerate(index.find_similar_moments(test_time, 'audio')[:5]):
+        print(f"  {i+1}. {moment['timestamp']:.1f}s (similarity: {moment['similarity']:.3f}, "
+              f"cluster {moment['cluster_id']})")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
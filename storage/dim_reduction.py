@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+VectorVault Dimensionality Reduction
+Fitted PCA or Gaussian random-projection transforms per collection,
+reduced-dimension search with full-dimension re-ranking
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from simple_vector_db import SimpleVectorDB
+from knn_graph import collection_key
+
+
+class PCATransform:
+    kind = 'pca'
+
+    def __init__(self, n_components: Optional[int] = None, target_variance: float = 0.95):
+        """
+        Initialize PCA transform
+
+        Args:
+            n_components: Output dimensions (default: smallest count reaching target_variance)
+            target_variance: Explained variance to keep when n_components is not given
+        """
+        self.n_components = n_components
+        self.target_variance = target_variance
+        self.mean = None
+        self.scale = None
+        self.components = None
+        self.explained_variance_ratio = None
+
+    def fit(self, X: np.ndarray) -> 'PCATransform':
+        """Fit on standardized data via SVD"""
+
+        X = np.asarray(X, dtype=np.float64)
+        self.mean = X.mean(axis=0)
+        self.scale = X.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+
+        Z = (X - self.mean) / self.scale
+        _, singular_values, vt = np.linalg.svd(Z, full_matrices=False)
+        variance = singular_values ** 2
+        ratio = variance / variance.sum() if variance.sum() > 0 else np.zeros_like(variance)
+
+        if self.n_components is None:
+            cumulative = np.cumsum(ratio)
+            self.n_components = int(np.searchsorted(cumulative, self.target_variance) + 1)
+        self.n_components = min(self.n_components, len(ratio))
+
+        self.components = vt[:self.n_components].astype(np.float32)
+        self.explained_variance_ratio = ratio
+        return self
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Project rows into the reduced space"""
+        Z = (np.asarray(X, dtype=np.float32) - self.mean.astype(np.float32)) / self.scale.astype(np.float32)
+        return Z @ self.components.T
+
+
+class RandomProjectionTransform:
+    kind = 'random_projection'
+
+    def __init__(self, n_components: int = 8, random_state: int = 0):
+        """
+        Initialize Gaussian random projection
+
+        Args:
+            n_components: Output dimensions
+            random_state: Seed for the projection matrix
+        """
+        self.n_components = n_components
+        self.random_state = random_state
+        self.mean = None
+        self.scale = None
+        self.components = None
+        self.explained_variance_ratio = None
+
+    def fit(self, X: np.ndarray) -> 'RandomProjectionTransform':
+        """Standardize and draw the projection matrix"""
+
+        X = np.asarray(X, dtype=np.float64)
+        self.mean = X.mean(axis=0)
+        self.scale = X.std(axis=0)
+        self.scale[self.scale == 0] = 1.0
+
+        rng = np.random.default_rng(self.random_state)
+        self.components = (rng.standard_normal((self.n_components, X.shape[1])) /
+                           np.sqrt(self.n_components)).astype(np.float32)
+        return self
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Project rows into the reduced space"""
+        Z = (np.asarray(X, dtype=np.float32) - self.mean.astype(np.float32)) / self.scale.astype(np.float32)
+        return Z @ self.components.T
+
+
+TRANSFORMS = {
+    PCATransform.kind: PCATransform,
+    RandomProjectionTransform.kind: RandomProjectionTransform
+}
+
+
+def save_transform(transform, path: Path):
+    """Save a fitted transform as .npz"""
+    np.savez(
+        path,
+        kind=np.array(transform.kind),
+        mean=transform.mean,
+        scale=transform.scale,
+        components=transform.components,
+        explained_variance_ratio=(transform.explained_variance_ratio
+                                  if transform.explained_variance_ratio is not None else np.array([]))
+    )
+
+
+def load_transform(path: Path):
+    """Load a transform saved with save_transform"""
+    with np.load(path) as data:
+        transform = TRANSFORMS[str(data['kind'])]()
+        transform.mean = data['mean']
+        transform.scale = data['scale']
+        transform.components = data['components']
+        transform.n_components = len(data['components'])
+        if len(data['explained_variance_ratio']):
+            transform.explained_variance_ratio = data['explained_variance_ratio']
+    return transform
+
+
+def explained_variance_report(X: np.ndarray) -> List[Dict]:
+    """Per-component and cumulative explained variance of standardized data"""
+
+    pca = PCATransform(n_components=np.asarray(X).shape[1]).fit(X)
+    cumulative = np.cumsum(pca.explained_variance_ratio)
+
+    return [{
+        'component': i + 1,
+        'explained_variance': float(ratio),
+        'cumulative_variance': float(cumulative[i])
+    } for i, ratio in enumerate(pca.explained_variance_ratio)]
+
+
+class ReducedIndex:
+    def __init__(self, db: SimpleVectorDB, transform_dir: Optional[str] = None):
+        """
+        Initialize reduced-dimension search index
+
+        Args:
+            db: Vector database holding the full-dimension vectors
+            transform_dir: Where fitted transforms go (default: reductions/ next to the database)
+        """
+        self.db = db
+        self.conn = db.conn
+        self.transform_dir = Path(transform_dir) if transform_dir else Path(db.db_path).parent / "reductions"
+        self.transform_dir.mkdir(parents=True, exist_ok=True)
+        self._transforms = {}
+        self._matrices = {}
+        self.create_tables()
+
+    def create_tables(self):
+        """Create reduced vector table"""
+
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS reduced_vectors (
+                collection TEXT NOT NULL,       -- e.g. 'audio:*'
+                vector_id INTEGER NOT NULL,     -- vectors.id
+                vector BLOB NOT NULL,           -- float32 reduced vector
+                PRIMARY KEY (collection, vector_id)
+            ) WITHOUT ROWID
+        ''')
+        self.conn.commit()
+
+    def transform_path(self, collection: str) -> Path:
+        """Transform file for a collection"""
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', collection)
+        return self.transform_dir / f"{slug}.npz"
+
+    def get_transform(self, collection: str):
+        """Load (and cache) the fitted transform of a collection"""
+        if collection not in self._transforms:
+            path = self.transform_path(collection)
+            if not path.exists():
+                raise Exception(f"No reduction fitted for {collection}")
+            self._transforms[collection] = load_transform(path)
+        return self._transforms[collection]
+
+    def load_full(self, source_type: str, source_file: Optional[str], min_id: int = 0):
+        """Load ids and full vectors of the collection's dominant dimensionality"""
+
+        ids, _, _, vectors = self.db.fetch_collection(source_type, source_file, min_id)
+        if not vectors:
+            return np.array([], dtype=np.int64), np.zeros((0, 0), dtype=np.float32)
+
+        lengths = [len(v) for v in vectors]
+        dims = max(set(lengths), key=lengths.count)
+        keep = [i for i, n in enumerate(lengths) if n == dims]
+        return (np.asarray([ids[i] for i in keep], dtype=np.int64),
+                np.asarray([vectors[i] for i in keep], dtype=np.float32))
+
+    def fit(self, source_type: str, source_file: Optional[str] = None,
+            kind: str = 'pca', n_components: Optional[int] = None) -> Dict:
+        """Fit a transform for a collection and reduce all of its rows"""
+
+        collection = collection_key(source_type, source_file)
+        ids, matrix = self.load_full(source_type, source_file)
+        if len(ids) == 0:
+            return {'collection': collection, 'vectors': 0}
+
+        if kind == 'pca':
+            transform = PCATransform(n_components=n_components)
+        else:
+            transform = TRANSFORMS[kind](n_components=n_components or max(2, matrix.shape[1] // 4))
+        transform.fit(matrix)
+
+        save_transform(transform, self.transform_path(collection))
+        self._transforms[collection] = transform
+
+        self.conn.execute('DELETE FROM reduced_vectors WHERE collection = ?', (collection,))
+        self.write_reduced(collection, ids, transform.transform(matrix))
+
+        print(f"Reduced {collection}: {matrix.shape[1]} → {transform.n_components} dims ({kind})")
+        return {
+            'collection': collection,
+            'vectors': len(ids),
+            'full_dims': int(matrix.shape[1]),
+            'reduced_dims': int(transform.n_components)
+        }
+
+    def write_reduced(self, collection: str, ids: np.ndarray, reduced: np.ndarray):
+        """Store reduced vectors"""
+        reduced = np.ascontiguousarray(reduced, dtype=np.float32)
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO reduced_vectors (collection, vector_id, vector) VALUES (?, ?, ?)
+        ''', [(collection, int(i), row.tobytes()) for i, row in zip(ids, reduced)])
+        self.conn.commit()
+        self._matrices.pop(collection, None)
+
+    def sync(self, source_type: str, source_file: Optional[str] = None) -> int:
+        """Reduce rows added since the last fit or sync"""
+
+        collection = collection_key(source_type, source_file)
+        transform = self.get_transform(collection)
+
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT MAX(vector_id) FROM reduced_vectors WHERE collection = ?', (collection,))
+        max_id = cursor.fetchone()[0] or 0
+
+        ids, matrix = self.load_full(source_type, source_file, min_id=max_id)
+        if len(ids) == 0 or matrix.shape[1] != len(transform.mean):
+            return 0
+
+        self.write_reduced(collection, ids, transform.transform(matrix))
+        return len(ids)
+
+    def store_vectors(self, source_type: str, vectors: List[Dict], source_file: str) -> int:
+        """Store full vectors and apply fitted transforms at ingest time"""
+
+        store = {
+            'audio': self.db.store_audio_vectors,
+            'visual': self.db.store_visual_vectors,
+            'semantic': self.db.store_semantic_vectors
+        }[source_type]
+        store(vectors, source_file)
+
+        # Both the whole-type collection and a per-file collection may be fitted
+        reduced = 0
+        for file_filter in (None, source_file):
+            if self.transform_path(collection_key(source_type, file_filter)).exists():
+                reduced += self.sync(source_type, file_filter)
+        return reduced
+
+    def reduced_matrix(self, collection: str):
+        """Load (and cache) ids, timestamps and the normalized reduced matrix"""
+
+        if collection not in self._matrices:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                SELECT r.vector_id, v.timestamp, r.vector
+                FROM reduced_vectors r JOIN vectors v ON v.id = r.vector_id
+                WHERE r.collection = ? ORDER BY r.vector_id
+            ''', (collection,))
+            rows = cursor.fetchall()
+
+            dims = self.get_transform(collection).n_components
+            ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            timestamps = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+            matrix = np.frombuffer(b''.join(row[2] for row in rows), dtype=np.float32).reshape(len(rows), dims)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._matrices[collection] = (ids, timestamps, matrix / norms)
+
+        return self._matrices[collection]
+
+    def search(self, query_vector: List[float], source_type: str,
+               source_file: Optional[str] = None,
+               top_k: int = 10,
+               rerank: int = 100,
+               exclude_timestamp: Optional[float] = None,
+               window_size: float = 30.0) -> List[Dict]:
+        """Scan reduced vectors, then re-rank the best candidates at full dimension"""
+
+        collection = collection_key(source_type, source_file)
+        transform = self.get_transform(collection)
+        ids, timestamps, matrix = self.reduced_matrix(collection)
+
+        query = transform.transform(np.asarray([query_vector], dtype=np.float32))[0]
+        query_norm = np.linalg.norm(query)
+        scores = matrix @ (query / query_norm if query_norm > 0 else query)
+
+        # Drop the exclusion window before picking candidates, so it never eats into them
+        eligible = np.arange(len(ids))
+        if exclude_timestamp is not None:
+            eligible = np.flatnonzero(np.abs(timestamps - exclude_timestamp) >= window_size)
+        if len(eligible) == 0:
+            return []
+
+        n_candidates = min(len(eligible), rerank)
+        candidates = eligible[np.argpartition(-scores[eligible], n_candidates - 1)[:n_candidates]]
+        candidate_ids = [int(ids[i]) for i in candidates]
+
+        placeholders = ','.join('?' * len(candidate_ids))
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT id, timestamp, source_file, vector_data, metadata FROM vectors WHERE id IN ({placeholders})
+        ''', candidate_ids)
+
+        results = []
+        for row_id, timestamp, file_name, vector_data, metadata in cursor.fetchall():
+            results.append({
+                'id': row_id,
+                'timestamp': timestamp,
+                'source_file': file_name,
+                'similarity': self.db.cosine_similarity(query_vector, json.loads(vector_data)),
+                'metadata': json.loads(metadata) if metadata else {}
+            })
+
+        results.sort(key=lambda x: x['similarity'], reverse=True)
+        return results[:top_k]
+
+    def find_similar_moments(self, target_timestamp: float, source_type: str,
+                             window_size: float = 30.0,
+                             top_k: int = 10,
+                             rerank: int = 100) -> List[Dict]:
+        """Reduced-dimension version of SimpleVectorDB.find_similar_moments"""
+
+        target_vectors = self.db.query_by_timerange(target_timestamp - 5, target_timestamp + 5, source_type)
+        if not target_vectors:
+            return []
+
+        return self.search(target_vectors[0]['vector'], source_type, top_k=top_k, rerank=rerank,
+                           exclude_timestamp=target_timestamp, window_size=window_size)
+
+
+def main():
+    """Report explained variance of the audio vectors and fit a PCA reduction"""
+
+    db_path = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/conversation.db"
+    if not Path(db_path).exists():
+        print(f"❌ Database not found: {db_path}")
+        return
+
+    db = SimpleVectorDB(db_path)
+    index = ReducedIndex(db)
+
+    _, matrix = index.load_full('audio', None)
+    if len(matrix) == 0:
+        print("❌ No audio vectors stored")
+        db.close()
+        return
+
+    print(f"📉 Explained variance of {matrix.shape[1]}-d audio vectors:")
+    for row in explained_variance_report(matrix):
+        bar = "█" * int(row['explained_variance'] * 50)
+        print(f"  PC{row['component']:2d}: {row['explained_variance']*100:5.1f}% "
+              f"(cumulative {row['cumulative_variance']*100:5.1f}%) {bar}")
+
+    result = index.fit('audio', kind='pca')
+    print(f"\nStored {result['vectors']} reduced vectors "
+          f"({result['full_dims']} → {result['reduced_dims']} dims)")
+
+    summary = db.get_conversation_summary()
+    test_time = summary['duration'] / 2
+    print(f"\n🔍 Reduced search with full re-rank around {test_time:.1f}s:")
+    for i, moment in enumerate(index.find_similar_moments(test_time, 'audio')[:5]):
+        print(f"  {i+1}. {moment['timestamp']:.1f}s (similarity: {moment['similarity']:.3f})")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+VectorVault k-NN Graph
+Precompute the top-k most similar moments for every vector in a collection
+so "what else sounds like this" becomes a single indexed read
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from simple_vector_db import SimpleVectorDB
+
+
+def collection_key(source_type: str, source_file: Optional[str] = None) -> str:
+    """Name a collection: a source type, optionally limited to one file"""
+    return f"{source_type}:{source_file or '*'}"
+
+
+class KNNGraph:
+    def __init__(self, db: SimpleVectorDB,
+                 k: int = 10,
+                 exclusion_window: float = 30.0,
+                 block_size: int = 512):
+        """
+        Initialize k-NN graph builder
+
+        Args:
+            db: Vector database holding the collection (graph tables live here too)
+            k: Neighbours kept per vector
+            exclusion_window: Ignore neighbours closer than this many seconds in the same file
+            block_size: Query rows per matrix-multiplication block
+        """
+        self.db = db
+        self.conn = db.conn
+        self.k = k
+        self.exclusion_window = exclusion_window
+        self.block_size = block_size
+        self.create_tables()
+
+    def create_tables(self):
+        """Create adjacency and build-state tables"""
+
+        cursor = self.conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS knn_graph (
+                collection TEXT NOT NULL,       -- e.g. 'audio:*'
+                vector_id INTEGER NOT NULL,     -- vectors.id of the query row
+                rank INTEGER NOT NULL,          -- 0 = most similar
+                neighbor_id INTEGER NOT NULL,   -- vectors.id of the neighbour
+                similarity REAL NOT NULL,
+                PRIMARY KEY (collection, vector_id, rank)
+            ) WITHOUT ROWID
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS knn_graph_state (
+                collection TEXT PRIMARY KEY,
+                k INTEGER NOT NULL,
+                exclusion_window REAL NOT NULL,
+                max_vector_id INTEGER NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        self.conn.commit()
+
+    def load_state(self, collection: str) -> Optional[Dict]:
+        """Return build parameters recorded for a collection"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT k, exclusion_window, max_vector_id FROM knn_graph_state WHERE collection = ?
+        ''', (collection,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        return {'k': row[0], 'exclusion_window': row[1], 'max_vector_id': row[2]}
+
+    def load_collection(self, source_type: str, source_file: Optional[str] = None) -> Dict:
+        """Load a collection as normalized arrays"""
+
+        ids, timestamps, files, vectors = self.db.fetch_collection(source_type, source_file)
+
+        # Only the dominant dimensionality is comparable
+        if vectors:
+            dims = max(set(len(v) for v in vectors), key=[len(v) for v in vectors].count)
+            keep = [i for i, v in enumerate(vectors) if len(v) == dims]
+        else:
+            keep = []
+
+        matrix = np.asarray([vectors[i] for i in keep], dtype=np.float32).reshape(len(keep), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+
+        file_names = sorted(set(files))
+        file_codes = {name: code for code, name in enumerate(file_names)}
+
+        return {
+            'ids': np.asarray([ids[i] for i in keep], dtype=np.int64),
+            'timestamps': np.asarray([timestamps[i] for i in keep], dtype=np.float64),
+            'files': np.asarray([file_codes[files[i]] for i in keep], dtype=np.int32),
+            'matrix': matrix / norms
+        }
+
+    def block_scores(self, data: Dict, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Cosine scores for a block of rows against columns, with exclusions applied"""
+
+        scores = data['matrix'][rows] @ data['matrix'][cols].T
+
+        # Same recording and too close in time (including the row itself)
+        same_file = data['files'][rows][:, None] == data['files'][cols][None, :]
+        too_close = np.abs(data['timestamps'][rows][:, None] - data['timestamps'][cols][None, :]) < self.exclusion_window
+        scores[same_file & too_close] = -np.inf
+        scores[data['ids'][rows][:, None] == data['ids'][cols][None, :]] = -np.inf
+
+        return scores
+
+    def top_k(self, scores: np.ndarray, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Select the k best candidates per row, sorted by descending score"""
+
+        k = min(self.k, scores.shape[1])
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind='stable')
+        best = np.take_along_axis(part, order, axis=1)
+
+        return np.take_along_axis(ids, best, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+    def write_neighbors(self, collection: str, vector_ids: np.ndarray,
+                        neighbor_ids: np.ndarray, similarities: np.ndarray):
+        """Replace adjacency rows for the given vectors"""
+
+        cursor = self.conn.cursor()
+        cursor.executemany('DELETE FROM knn_graph WHERE collection = ? AND vector_id = ?',
+                           [(collection, int(v)) for v in vector_ids])
+
+        rows = []
+        for vector_id, neighbors, sims in zip(vector_ids, neighbor_ids, similarities):
+            rank = 0
+            for neighbor_id, sim in zip(neighbors, sims):
+                if not np.isfinite(sim):
+                    break
+                rows.append((collection, int(vector_id), rank, int(neighbor_id), float(sim)))
+                rank += 1
+
+        cursor.executemany('''
+            INSERT INTO knn_graph (collection, vector_id, rank, neighbor_id, similarity)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+
+    def load_neighbors(self, collection: str, vector_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Load stored neighbour lists as padded (ids, similarities) arrays"""
+
+        position = {int(v): i for i, v in enumerate(vector_ids)}
+        neighbor_ids = np.full((len(vector_ids), self.k), -1, dtype=np.int64)
+        similarities = np.full((len(vector_ids), self.k), -np.inf, dtype=np.float32)
+
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT vector_id, rank, neighbor_id, similarity FROM knn_graph WHERE collection = ?
+        ''', (collection,))
+        for vector_id, rank, neighbor_id, similarity in cursor.fetchall():
+            i = position.get(vector_id)
+            if i is not None and rank < self.k:
+                neighbor_ids[i, rank] = neighbor_id
+                similarities[i, rank] = similarity
+
+        return neighbor_ids, similarities
+
+    def build(self, source_type: str, source_file: Optional[str] = None,
+              rebuild: bool = False) -> Dict:
+        """Build or incrementally extend the graph for a collection"""
+
+        collection = collection_key(source_type, source_file)
+        data = self.load_collection(source_type, source_file)
+        n = len(data['ids'])
+        if n == 0:
+            return {'collection': collection, 'vectors': 0, 'updated': 0}
+
+        state = self.load_state(collection)
+        if state and (state['k'] != self.k or state['exclusion_window'] != self.exclusion_window):
+            rebuild = True
+
+        all_rows = np.arange(n)
+        if state and not rebuild:
+            new_rows = np.flatnonzero(data['ids'] > state['max_vector_id'])
+            old_rows = np.flatnonzero(data['ids'] <= state['max_vector_id'])
+        else:
+            self.conn.execute('DELETE FROM knn_graph WHERE collection = ?', (collection,))
+            new_rows, old_rows = all_rows, np.array([], dtype=np.int64)
+
+        print(f"Building k-NN graph for {collection}: {len(new_rows)} new of {n} vectors")
+
+        # 1. New rows search the whole collection
+        for start in range(0, len(new_rows), self.block_size):
+            rows = new_rows[start:start + self.block_size]
+            scores = self.block_scores(data, rows, all_rows)
+            neighbor_ids, sims = self.top_k(scores, np.broadcast_to(data['ids'], scores.shape))
+            self.write_neighbors(collection, data['ids'][rows], neighbor_ids, sims)
+
+        # 2. Existing rows only need to consider the new rows as candidates
+        updated = len(new_rows)
+        if len(old_rows) and len(new_rows):
+            old_neighbors, old_sims = self.load_neighbors(collection, data['ids'][old_rows])
+
+            for start in range(0, len(old_rows), self.block_size):
+                block = slice(start, start + self.block_size)
+                rows = old_rows[block]
+                scores = self.block_scores(data, rows, new_rows)
+
+                merged_scores = np.concatenate([old_sims[block], scores], axis=1)
+                merged_ids = np.concatenate([
+                    old_neighbors[block],
+                    np.broadcast_to(data['ids'][new_rows], scores.shape)
+                ], axis=1)
+
+                best_ids, best_sims = self.top_k(merged_scores, merged_ids)
+                changed = np.any(best_ids != old_neighbors[block], axis=1)
+                if changed.any():
+                    self.write_neighbors(collection, data['ids'][rows][changed],
+                                         best_ids[changed], best_sims[changed])
+                    updated += int(changed.sum())
+
+        self.conn.execute('''
+            INSERT OR REPLACE INTO knn_graph_state (collection, k, exclusion_window, max_vector_id)
+            VALUES (?, ?, ?, ?)
+        ''', (collection, self.k, self.exclusion_window, int(data['ids'].max())))
+        self.conn.commit()
+
+        print(f"k-NN graph updated: {updated} adjacency lists written")
+        return {'collection': collection, 'vectors': n, 'updated': updated}
+
+    def neighbors(self, vector_id: int, source_type: str,
+                  source_file: Optional[str] = None) -> List[Dict]:
+        """Read the precomputed neighbours of one vector"""
+
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT g.rank, g.neighbor_id, g.similarity, v.timestamp, v.source_file, v.metadata
+            FROM knn_graph g JOIN vectors v ON v.id = g.neighbor_id
+            WHERE g.collection = ? AND g.vector_id = ?
+            ORDER BY g.rank
+        ''', (collection_key(source_type, source_file), vector_id))
+
+        return [{
+            'id': row[1],
+            'timestamp': row[3],
+            'source_file': row[4],
+            'similarity': row[2],
+            'metadata': json.loads(row[5]) if row[5] else {}
+        } for row in cursor.fetchall()]
+
+    def neighbors_at(self, timestamp: float, source_type: str,
+                     source_file: Optional[str] = None) -> List[Dict]:
+        """Neighbours of the vector closest to a timestamp"""
+
+        where = 'source_type = ?' + (' AND source_file = ?' if source_file else '')
+        params = [source_type] + ([source_file] if source_file else [])
+
+        # Nearest on either side of the timestamp, each one an index seek
+        cursor = self.conn.cursor()
+        candidates = []
+        for condition, order in (('timestamp >= ?', 'ASC'), ('timestamp < ?', 'DESC')):
+            cursor.execute(f'''
+                SELECT id, timestamp FROM vectors WHERE {where} AND {condition}
+                ORDER BY timestamp {order} LIMIT 1
+            ''', params + [timestamp])
+            candidates.extend(cursor.fetchall())
+
+        if not candidates:
+            return []
+        nearest_id = min(candidates, key=lambda row: abs(row[1] - timestamp))[0]
+        return self.neighbors(nearest_id, source_type, source_file)
+
+
+def main():
+    """Build the audio k-NN graph for the conversation database"""
+
+    db_path = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/conversation.db"
+    if not Path(db_path).exists():
+        print(f"❌ Database not found: {db_path}")
+        return
+
+    db = SimpleVectorDB(db_path)
+    graph = KNNGraph(db, k=10, exclusion_window=30.0)
+
+    print("🕸️ Building VectorVault k-NN graph...")
+    result = graph.build('audio')
+    print(f"Vectors: {result['vectors']}, adjacency lists updated: {result['updated']}")
+
+    summary = db.get_conversation_summary()
+    test_time = summary['duration'] / 2
+    print(f"\n🔍 Precomputed neighbours of {test_time:.1f}s:")
+    for i, moment in enumerate(graph.neighbors_at(test_time, 'audio')[:5]):
+        print(f"  {i+1}. {moment['timestamp']:.1f}s (similarity: {moment['similarity']:.3f})")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+VectorVault Live Ingest
+Stream audio into the vector store while a meeting is still running
+"""
+
+import bisect
+import queue
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "extractors"))
+
+from audio_basic import BasicAudioExtractor, FrameFeatureStream, StreamingVAD
+from audio_io import follow_wav_blocks, pipe_blocks, replay_blocks
+from semantic_basic import BasicSemanticExtractor
+from simple_vector_db import SimpleVectorDB
+from whisper_worker import WhisperWorker, words_from_segments
+
+
+class LiveIngest:
+    def __init__(self, db_path: str, source_file: str, recording_file: str,
+                 sample_rate: int = 16000, asr: bool = True, backend: Optional[str] = None,
+                 model: str = "base", max_clip: float = 10.0, cut_window: float = 2.0,
+                 semantic_window: float = 10.0):
+        """
+        Initialize live ingest
+
+        Every pushed block is appended to recording_file, turned into audio
+        vectors (stored right away) and run through a streaming VAD. Speech is
+        sent to a persistent Whisper worker as soon as a pause ends it, or
+        about every max_clip seconds during long monologues, cut at the
+        quietest frame of the last cut_window seconds so the cut falls
+        between words rather than through one, and semantic vectors
+        are stored once their window is fully transcribed. The store is in
+        WAL mode, so it can be queried throughout.
+
+        Args:
+            db_path: SimpleVectorDB file
+            source_file: Name the vectors are stored under
+            recording_file: WAV written as audio arrives (the ASR worker reads clips from it)
+            sample_rate: Sample rate of the pushed blocks
+            asr: Transcribe speech (audio vectors only when False)
+            backend: ASR backend name (default: asr_backends.default_backend())
+            model: Whisper model name
+            max_clip: Longest speech clip before it is sent to ASR without waiting for a pause
+            cut_window: Seconds before max_clip searched for the quietest cut point
+            semantic_window: Window size of the semantic vectors in seconds
+        """
+        self.db_path = db_path
+        self.source_file = source_file
+        self.recording_file = recording_file
+        self.sample_rate = sample_rate
+        self.max_clip = max_clip
+        self.cut_window = cut_window
+        self.semantic_window = semantic_window
+        self.model = model
+
+        self.db = SimpleVectorDB(db_path)
+        self.audio_extractor = BasicAudioExtractor()
+        self.feature_stream = FrameFeatureStream(sample_rate, self.audio_extractor.window_size,
+                                                 self.audio_extractor.spectral)
+        self.vad = StreamingVAD(sample_rate)
+
+        Path(recording_file).parent.mkdir(parents=True, exist_ok=True)
+        self.recording_fp = open(recording_file, 'wb')
+        self.recording = wave.open(self.recording_fp, 'wb')
+        self.recording.setnchannels(1)
+        self.recording.setsampwidth(2)
+        self.recording.setframerate(sample_rate)
+
+        # Wall-clock arrival of each block end, for latency reporting
+        self.samples_pushed = 0
+        self.arrival_times = []
+        self.arrival_wall = []
+
+        self.speech_intervals = []
+        self.asr_frontier = 0.0
+        self.counts = {'audio': 0, 'semantic': 0, 'words': 0, 'clips': 0}
+        self.latencies = []
+
+        self.asr_queue = None
+        self.asr_thread = None
+        if asr:
+            self.worker = WhisperWorker(backend=backend).start()
+            self.semantic_extractor = BasicSemanticExtractor()
+            self.words = []
+            self.semantic_until = 0.0
+            self.asr_queue = queue.Queue()
+            self.asr_thread = threading.Thread(target=self.asr_loop, daemon=True)
+            self.asr_thread.start()
+
+    @property
+    def now(self) -> float:
+        """Seconds of audio received so far"""
+        return self.samples_pushed / self.sample_rate
+
+    def push(self, block: np.ndarray):
+        """Ingest one block of mono samples (int16 scale)"""
+
+        # Recording first: the ASR worker reads clips back from it
+        pcm = np.clip(np.round(block), -32768, 32767).astype('<i2')
+        # (wave patches the header sizes on every write, so it is always readable)
+        self.recording.writeframes(pcm.tobytes())
+        self.recording_fp.flush()
+
+        self.samples_pushed += len(block)
+        self.arrival_times.append(self.now)
+        self.arrival_wall.append(time.time())
+
+        features = self.feature_stream.push(block)
+        if features['metadata']['num_frames']:
+            vectors = self.audio_extractor.create_vectors(features)
+            self.counts['audio'] += self.db.insert_vectors('audio', vectors, self.source_file)
+
+        for interval in self.vad.push(block):
+            self.speech_intervals.append(interval)
+            self.schedule_clip(interval['end'])
+
+        # Long stretch of speech with no pause yet: transcribe what is there
+        open_interval = self.vad.open_interval
+        if open_interval:
+            start = max(open_interval['start'], self.asr_frontier)
+            if self.vad.duration - start >= self.max_clip:
+                cut = self.vad.quietest_time(max(start + 1.0, self.vad.duration - self.cut_window), self.vad.duration)
+                self.schedule_clip(cut, open_interval['start'])
+
+    def schedule_clip(self, end: float, start: Optional[float] = None):
+        """Queue speech up to end that has not been transcribed yet"""
+        if self.asr_queue is None:
+            return
+        if start is None:
+            start = self.speech_intervals[-1]['start']
+        start = max(start, self.asr_frontier)
+        if end - start >= 0.1:
+            self.asr_queue.put((start, end))
+            self.asr_frontier = end
+
+    def wall_time_at(self, audio_time: float) -> float:
+        """When the block holding audio_time arrived"""
+        i = min(bisect.bisect_left(self.arrival_times, audio_time), len(self.arrival_wall) - 1)
+        return self.arrival_wall[i]
+
+    def asr_loop(self):
+        """Background thread: transcribe queued clips in order, store semantic vectors"""
+        db = SimpleVectorDB(self.db_path)
+        options = {}
+
+        while True:
+            item = self.asr_queue.get()
+            if item is None:
+                break
+            start, end = item
+
+            segments = []
+            for message in self.worker.transcribe_segments(self.recording_file, self.model,
+                                                           [[start, end]], **options):
+                if message['type'] == 'segment':
+                    segments.append(message['segment'])
+                elif message['type'] == 'done':
+                    # Keep the first detected language for the rest of the meeting
+                    options.setdefault('language', message['language'])
+
+            words = words_from_segments(segments)
+            self.words.extend(words)
+            self.counts['words'] += len(words)
+            self.counts['clips'] += 1
+
+            # Clips arrive in time order, so windows ending before this clip's end are complete
+            self.store_semantic(db, (end // self.semantic_window) * self.semantic_window)
+            self.latencies.append(time.time() - self.wall_time_at(end))
+
+        self.store_semantic(db, float('inf'))
+        db.close()
+
+    def store_semantic(self, db: SimpleVectorDB, until: float):
+        """Store semantic vectors for windows in [semantic_until, until)"""
+        if until <= self.semantic_until:
+            return
+        words = [w for w in self.words if self.semantic_until <= w['start'] < until]
+        vectors = self.semantic_extractor.create_semantic_vectors({'words': words}, self.semantic_window)
+        self.counts['semantic'] += db.insert_vectors('semantic', vectors, self.source_file)
+        self.semantic_until = until
+
+    def run(self, blocks: Iterable[np.ndarray], report_every: float = 10.0) -> Dict:
+        """Ingest blocks until the source ends, then flush everything"""
+        next_report = report_every
+        for block in blocks:
+            self.push(block)
+            if self.now >= next_report:
+                self.report()
+                next_report += report_every
+        return self.finish()
+
+    def report(self):
+        latency = f", ASR latency {self.latencies[-1]:.1f}s" if self.latencies else ""
+        print(f"  {self.now:7.1f}s: {self.counts['audio']} audio vectors, {len(self.speech_intervals)} speech intervals, "
+              f"{self.counts['words']} words{latency}")
+
+    def finish(self) -> Dict:
+        """Close the stream: final VAD intervals, pending ASR, recording header"""
+        for interval in self.vad.flush():
+            self.speech_intervals.append(interval)
+            self.schedule_clip(interval['end'])
+
+        if self.asr_thread is not None:
+            self.asr_queue.put(None)
+            self.asr_thread.join()
+            self.worker.close()
+
+        self.recording.close()
+        self.recording_fp.close()
+        self.db.close()
+
+        summary = dict(self.counts, duration=self.now, speech_intervals=len(self.speech_intervals))
+        if self.latencies:
+            summary['median_asr_latency'] = float(np.median(self.latencies))
+            summary['max_asr_latency'] = float(np.max(self.latencies))
+        return summary
+
+
+def main():
+    """
+    live_ingest.py replay <file> [speed]   Replay a recording at real-time pace (testing)
+    live_ingest.py follow <file.wav>       Follow a WAV that is still being written
+    live_ingest.py pipe                    Raw mono s16le 16kHz PCM on stdin
+    """
+    if len(sys.argv) < 2 or sys.argv[1] not in ('replay', 'follow', 'pipe'):
+        print(main.__doc__)
+        return
+
+    mode = sys.argv[1]
+    block_seconds = 0.5
+    output_dir = Path("/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/live")
+    db_path = str(output_dir / "live_vectors.db")
+
+    if mode == 'replay':
+        source = sys.argv[2]
+        speed = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+        sample_rate, blocks = replay_blocks(source, block_seconds, speed, sample_rate=16000)
+    elif mode == 'follow':
+        source = sys.argv[2]
+        sample_rate, blocks = follow_wav_blocks(source, block_seconds)
+    else:
+        source = "stdin"
+        sample_rate, blocks = 16000, pipe_blocks(sys.stdin.buffer, block_seconds)
+
+    recording_file = str(output_dir / f"live_{time.strftime('%Y%m%d_%H%M%S')}.wav")
+    print(f"🎙️ Live ingest from {source} ({mode}) → {db_path}")
+
+    ingest = LiveIngest(db_path, source, recording_file, sample_rate)
+    try:
+        summary = ingest.run(blocks)
+    except KeyboardInterrupt:
+        print("\nStopping...")
+        summary = ingest.finish()
+
+    print(f"\n📊 Live ingest complete:")
+    for key, value in summary.items():
+        print(f"  {key}: {value:.2f}" if isinstance(value, float) else f"  {key}: {value}")
+    print(f"Recording saved: {recording_file}")
+
+
+if __name__ == "__main__":
+    main()
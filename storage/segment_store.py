@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+VectorVault Segment Vector Store
+Append-only segment storage with background compaction (LSM-style)
+
+Every ingest call writes one immutable segment file instead of inserting into
+a growing SQLite table, so write cost depends only on the batch size. A small
+JSON manifest lists the live segments, deletes are recorded as tombstones,
+and a background compactor merges small segments and drops deleted rows.
+"""
+
+import heapq
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "extractors"))
+
+from feature_file import feature_file_exists, load_features, map_npz
+
+MANIFEST_NAME = "manifest.json"
+TOMBSTONES_NAME = "tombstones.txt"
+
+
+class SegmentVectorStore:
+    def __init__(self, root_dir: str,
+                 compact_min_rows: int = 50000,
+                 compact_max_segments: int = 8,
+                 tombstone_ratio: float = 0.2):
+        """
+        Initialize segment-based vector store
+
+        Args:
+            root_dir: Directory holding the manifest and segment files
+            compact_min_rows: Segments smaller than this are merged by the compactor
+            compact_max_segments: Maximum number of segments merged in one pass
+            tombstone_ratio: Rewrite a segment once this fraction of rows is deleted
+        """
+        self.root = Path(root_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compact_min_rows = compact_min_rows
+        self.compact_max_segments = compact_max_segments
+        self.tombstone_ratio = tombstone_ratio
+
+        self._lock = threading.RLock()
+        self._segment_cache = {}
+        self._readers = {}
+        self._retired = set()
+        self._compaction_lock = threading.Lock()
+        self._compactor = None
+        self._stop_event = threading.Event()
+
+        self.manifest = self.load_manifest()
+        self.tombstones = self.load_tombstones()
+
+    # ------------------------------------------------------------------
+    # Manifest and tombstones
+    # ------------------------------------------------------------------
+
+    def load_manifest(self) -> Dict:
+        """Load the manifest or create an empty one"""
+        manifest_path = self.root / MANIFEST_NAME
+        if manifest_path.exists():
+            with open(manifest_path, 'r') as f:
+                return json.load(f)
+
+        return {
+            'version': 1,
+            'next_segment': 1,
+            'next_id': 1,
+            'segments': []
+        }
+
+    def save_manifest(self):
+        """Atomically replace the manifest on disk"""
+        manifest_path = self.root / MANIFEST_NAME
+        tmp_path = manifest_path.with_suffix('.json.tmp')
+
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, manifest_path)
+
+    def load_tombstones(self) -> set:
+        """Load deleted row ids from the append-only tombstone log"""
+        tombstone_path = self.root / TOMBSTONES_NAME
+        if not tombstone_path.exists():
+            return set()
+
+        with open(tombstone_path, 'r') as f:
+            return {int(line) for line in f if line.strip()}
+
+    def delete(self, ids: Iterable[int]):
+        """Mark rows as deleted; space is reclaimed by compaction"""
+        ids = [int(i) for i in ids]
+        if not ids:
+            return
+
+        with self._lock:
+            with open(self.root / TOMBSTONES_NAME, 'a') as f:
+                f.write(''.join(f"{i}\n" for i in ids))
+            self.tombstones.update(ids)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def store_vectors(self, source_type: str, vectors: List[Dict], source_file: str) -> Optional[str]:
+        """Write one batch of vectors as a new immutable segment"""
+
+        if not vectors:
+            return None
+
+        timestamps = np.array([v['timestamp'] for v in vectors], dtype=np.float64)
+        matrix = np.array([v['dense_vector'] for v in vectors], dtype=np.float32)
+        metadata = [v.get('features', {}) for v in vectors]
+
+        # Segments are sorted by time so range queries can binary search
+        order = np.argsort(timestamps, kind='stable')
+        timestamps = timestamps[order]
+        matrix = matrix[order]
+        metadata = [metadata[i] for i in order]
+
+        with self._lock:
+            first_id = self.manifest['next_id']
+            self.manifest['next_id'] += len(vectors)
+            segment_number = self.manifest['next_segment']
+            self.manifest['next_segment'] += 1
+
+        ids = np.arange(first_id, first_id + len(vectors), dtype=np.int64)
+        entry = self.write_segment(
+            segment_number, source_type, [source_file],
+            ids, timestamps, matrix,
+            np.zeros(len(vectors), dtype=np.int32), metadata
+        )
+
+        with self._lock:
+            self.manifest['segments'].append(entry)
+            self.save_manifest()
+
+        print(f"Stored {len(vectors)} {source_type} vectors in {entry['name']}")
+        return entry['name']
+
+    def store_audio_vectors(self, vectors: List[Dict], source_file: str):
+        """Store audio feature vectors"""
+        return self.store_vectors('audio', vectors, source_file)
+
+    def store_visual_vectors(self, vectors: List[Dict], source_file: str):
+        """Store visual feature vectors"""
+        return self.store_vectors('visual', vectors, source_file)
+
+    def store_semantic_vectors(self, vectors: List[Dict], source_file: str):
+        """Store semantic/text vectors"""
+        return self.store_vectors('semantic', vectors, source_file)
+
+    def write_segment(self, segment_number: int, source_type: str, source_files: List[str],
+                      ids: np.ndarray, timestamps: np.ndarray, matrix: np.ndarray,
+                      source_index: np.ndarray, metadata: List[Dict]) -> Dict:
+        """Write segment arrays plus metadata index and return its manifest entry"""
+
+        name = f"seg_{segment_number:06d}"
+        meta_path = self.root / f"{name}.meta.jsonl"
+
+        # Row metadata lives in a side file; offsets let us read single rows
+        offsets = np.zeros(len(metadata) + 1, dtype=np.int64)
+        with open(meta_path, 'wb') as f:
+            for i, meta in enumerate(metadata):
+                line = (json.dumps(meta) + '\n').encode('utf-8')
+                f.write(line)
+                offsets[i + 1] = offsets[i] + len(line)
+
+        tmp_path = self.root / f"{name}.tmp.npz"
+        np.savez(
+            tmp_path,
+            ids=ids,
+            timestamps=timestamps,
+            vectors=matrix,
+            source_index=source_index,
+            meta_offsets=offsets
+        )
+        os.replace(tmp_path, self.root / f"{name}.npz")
+
+        return {
+            'name': name,
+            'source_type': source_type,
+            'source_files': source_files,
+            'rows': int(len(ids)),
+            'dims': int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+            'min_timestamp': float(timestamps[0]) if len(timestamps) else 0.0,
+            'max_timestamp': float(timestamps[-1]) if len(timestamps) else 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def load_segment(self, name: str) -> Dict:
+        """
+        Memory-map segment arrays (segments are immutable, so caching is safe)
+
+        The cache only holds mappings; the page cache decides how much of the
+        archive is actually resident, so memory no longer grows with it.
+        """
+        cached = self._segment_cache.get(name)
+        if cached is not None:
+            return cached
+
+        segment = map_npz(str(self.root / f"{name}.npz"))
+
+        self._segment_cache[name] = segment
+        return segment
+
+    def read_metadata(self, name: str, rows: Iterable[int]) -> List[Dict]:
+        """Read metadata for selected rows of a segment"""
+        offsets = self.load_segment(name)['meta_offsets']
+        results = []
+
+        with open(self.root / f"{name}.meta.jsonl", 'rb') as f:
+            for row in rows:
+                f.seek(int(offsets[row]))
+                results.append(json.loads(f.read(int(offsets[row + 1] - offsets[row]))))
+
+        return results
+
+    def live_segments(self, source_type: Optional[str] = None) -> List[Dict]:
+        """Snapshot of manifest entries, optionally filtered by source type"""
+        with self._lock:
+            segments = list(self.manifest['segments'])
+
+        if source_type:
+            segments = [s for s in segments if s['source_type'] == source_type]
+        return segments
+
+    @contextmanager
+    def pinned_segments(self, source_type: Optional[str] = None):
+        """
+        Manifest snapshot whose files stay on disk until the block exits
+
+        Compaction retires merged segments instead of deleting them while a
+        reader still holds them; the last reader out removes the files.
+        """
+        with self._lock:
+            pinned = [entry['name'] for entry in self.manifest['segments']]
+            segments = list(self.manifest['segments'])
+            for name in pinned:
+                self._readers[name] = self._readers.get(name, 0) + 1
+
+        if source_type:
+            segments = [s for s in segments if s['source_type'] == source_type]
+
+        try:
+            yield segments
+        finally:
+            with self._lock:
+                for name in pinned:
+                    self._readers[name] -= 1
+                    if not self._readers[name]:
+                        del self._readers[name]
+                        if name in self._retired:
+                            self.remove_segment_files(name)
+
+    def remove_segment_files(self, name: str):
+        """Delete a replaced segment's files (call with the lock held)"""
+        self._retired.discard(name)
+        self._segment_cache.pop(name, None)
+        for suffix in ('.npz', '.meta.jsonl'):
+            (self.root / f"{name}{suffix}").unlink(missing_ok=True)
+
+    def live_mask(self, segment: Dict) -> np.ndarray:
+        """Boolean mask of rows that have not been deleted"""
+        if not self.tombstones:
+            return np.ones(len(segment['ids']), dtype=bool)
+        return ~np.isin(segment['ids'], np.fromiter(self.tombstones, dtype=np.int64))
+
+    def query_by_timerange(self, start_time: float, end_time: float,
+                           source_type: Optional[str] = None) -> List[Dict]:
+        """Query vectors within a time range across all segments"""
+
+        results = []
+
+        with self.pinned_segments(source_type) as segments:
+            for entry in segments:
+                if entry['max_timestamp'] < start_time or entry['min_timestamp'] > end_time:
+                    continue
+
+                segment = self.load_segment(entry['name'])
+                lo = np.searchsorted(segment['timestamps'], start_time, side='left')
+                hi = np.searchsorted(segment['timestamps'], end_time, side='right')
+                rows = [r for r in range(lo, hi) if int(segment['ids'][r]) not in self.tombstones]
+
+                for row, meta in zip(rows, self.read_metadata(entry['name'], rows)):
+                    results.append({
+                        'id': int(segment['ids'][row]),
+                        'source_type': entry['source_type'],
+                        'source_file': entry['source_files'][segment['source_index'][row]],
+                        'timestamp': float(segment['timestamps'][row]),
+                        'vector': segment['vectors'][row].tolist(),
+                        'metadata': meta
+                    })
+
+        results.sort(key=lambda x: x['timestamp'])
+        return results
+
+    def find_similar_moments(self, target_timestamp: float,
+                             window_size: float = 30.0,
+                             source_type: Optional[str] = None,
+                             top_k: int = 10) -> List[Dict]:
+        """Find moments similar to a target timestamp, fanning out across segments"""
+
+        with self.pinned_segments(source_type) as segments:
+            target_vectors = self.query_by_timerange(
+                target_timestamp - 5,
+                target_timestamp + 5,
+                source_type
+            )
+
+            if not target_vectors:
+                return []
+
+            target = np.asarray(target_vectors[0]['vector'], dtype=np.float32)
+            target_norm = np.linalg.norm(target)
+            if target_norm == 0:
+                return []
+
+            candidates = []
+
+            for entry in segments:
+                if entry['dims'] != len(target):
+                    continue
+
+                segment = self.load_segment(entry['name'])
+                matrix = segment['vectors']
+                norms = np.linalg.norm(matrix, axis=1)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    scores = (matrix @ target) / (norms * target_norm)
+                scores[norms == 0] = 0.0
+
+                # Skip vectors too close to target and deleted rows
+                valid = (np.abs(segment['timestamps'] - target_timestamp) >= window_size) & self.live_mask(segment)
+                rows = np.flatnonzero(valid)
+                if len(rows) > top_k:
+                    rows = rows[np.argpartition(-scores[rows], top_k)[:top_k]]
+
+                for row in rows:
+                    candidates.append((float(scores[row]), entry['name'], int(row)))
+
+            best = heapq.nlargest(top_k, candidates)
+
+            similarities = []
+            for score, name, row in best:
+                segment = self.load_segment(name)
+                similarities.append({
+                    'timestamp': float(segment['timestamps'][row]),
+                    'similarity': score,
+                    'metadata': self.read_metadata(name, [row])[0]
+                })
+
+        return similarities
+
+    def get_conversation_summary(self) -> Dict:
+        """Get summary statistics of stored vectors"""
+
+        summary = {
+            'total_vectors': 0,
+            'duration': 0,
+            'sources': {},
+            'segments': 0
+        }
+
+        with self.pinned_segments() as segments:
+            for entry in segments:
+                segment = self.load_segment(entry['name'])
+                count = int(self.live_mask(segment).sum())
+                info = summary['sources'].setdefault(entry['source_type'], {
+                    'count': 0,
+                    'min_timestamp': entry['min_timestamp'],
+                    'max_timestamp': entry['max_timestamp']
+                })
+                info['count'] += count
+                info['min_timestamp'] = min(info['min_timestamp'], entry['min_timestamp'])
+                info['max_timestamp'] = max(info['max_timestamp'], entry['max_timestamp'])
+                info['duration'] = info['max_timestamp'] - info['min_timestamp']
+                summary['total_vectors'] += count
+                summary['duration'] = max(summary['duration'], info['max_timestamp'])
+                summary['segments'] += 1
+
+        return summary
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def plan_compaction(self, segments: Optional[List[Dict]] = None) -> List[List[Dict]]:
+        """Group segments (default: all live ones) that should be merged or rewritten"""
+
+        groups = {}
+        plans = []
+
+        for entry in segments if segments is not None else self.live_segments():
+            segment = self.load_segment(entry['name'])
+            deleted = entry['rows'] - int(self.live_mask(segment).sum())
+
+            if entry['rows'] and deleted / entry['rows'] >= self.tombstone_ratio:
+                # Heavily deleted segments are rewritten on their own
+                plans.append([entry])
+            elif entry['rows'] < self.compact_min_rows:
+                key = (entry['source_type'], entry['dims'])
+                groups.setdefault(key, []).append(entry)
+
+        for entries in groups.values():
+            for i in range(0, len(entries), self.compact_max_segments):
+                batch = entries[i:i + self.compact_max_segments]
+                if len(batch) > 1:
+                    plans.append(batch)
+
+        return plans
+
+    def merge_segments(self, entries: List[Dict]) -> Optional[Dict]:
+        """Merge segments into one new segment, dropping deleted rows"""
+
+        source_files = []
+        parts = {'ids': [], 'timestamps': [], 'vectors': [], 'source_index': []}
+        metadata = []
+
+        for entry in entries:
+            segment = self.load_segment(entry['name'])
+            rows = np.flatnonzero(self.live_mask(segment))
+
+            # Re-map per-segment source indexes into the merged file list
+            remap = []
+            for source_file in entry['source_files']:
+                if source_file not in source_files:
+                    source_files.append(source_file)
+                remap.append(source_files.index(source_file))
+
+            parts['ids'].append(segment['ids'][rows])
+            parts['timestamps'].append(segment['timestamps'][rows])
+            parts['vectors'].append(segment['vectors'][rows])
+            parts['source_index'].append(np.asarray(remap, dtype=np.int32)[segment['source_index'][rows]])
+            metadata.extend(self.read_metadata(entry['name'], rows))
+
+        timestamps = np.concatenate(parts['timestamps'])
+        if len(timestamps) == 0:
+            return None
+
+        order = np.argsort(timestamps, kind='stable')
+
+        with self._lock:
+            segment_number = self.manifest['next_segment']
+            self.manifest['next_segment'] += 1
+
+        return self.write_segment(
+            segment_number, entries[0]['source_type'], source_files,
+            np.concatenate(parts['ids'])[order],
+            timestamps[order],
+            np.concatenate(parts['vectors'])[order],
+            np.concatenate(parts['source_index'])[order],
+            [metadata[i] for i in order]
+        )
+
+    def compact(self) -> int:
+        """Run one compaction pass; returns the number of segments replaced"""
+
+        replaced = 0
+
+        # Pinned like any reader, so the merge inputs outlive their own replacement
+        with self._compaction_lock, self.pinned_segments() as pinned:
+            for entries in self.plan_compaction(pinned):
+                new_entry = self.merge_segments(entries)
+                old_names = {e['name'] for e in entries}
+
+                with self._lock:
+                    segments = [s for s in self.manifest['segments'] if s['name'] not in old_names]
+                    if new_entry:
+                        segments.append(new_entry)
+                    self.manifest['segments'] = segments
+                    self.save_manifest()
+
+                    # Old files go once the new manifest is durable and their last reader is done
+                    self._retired.update(old_names)
+
+                replaced += len(entries)
+
+        if replaced:
+            self.prune_tombstones()
+            print(f"Compacted {replaced} segments")
+
+        return replaced
+
+    def prune_tombstones(self):
+        """Forget tombstones for rows that no longer exist in any segment"""
+
+        with self._lock:
+            if not self.tombstones:
+                return
+
+            live_ids = [self.load_segment(e['name'])['ids'] for e in self.manifest['segments']]
+            all_ids = np.concatenate(live_ids) if live_ids else np.array([], dtype=np.int64)
+            tombstones = np.fromiter(self.tombstones, dtype=np.int64)
+            remaining = tombstones[np.isin(tombstones, all_ids)]
+
+            tombstone_path = self.root / TOMBSTONES_NAME
+            tmp_path = tombstone_path.with_suffix('.txt.tmp')
+            with open(tmp_path, 'w') as f:
+                f.write(''.join(f"{i}\n" for i in remaining.tolist()))
+            os.replace(tmp_path, tombstone_path)
+
+            self.tombstones = set(remaining.tolist())
+
+    def start_background_compaction(self, interval: float = 30.0):
+        """Run compaction periodically in a daemon thread"""
+
+        if self._compactor and self._compactor.is_alive():
+            return
+
+        self._stop_event.clear()
+
+        def run():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.compact()
+                except Exception as e:
+                    print(f"Compaction failed: {e}")
+
+        self._compactor = threading.Thread(target=run, name="segment-compactor", daemon=True)
+        self._compactor.start()
+
+    def stop_background_compaction(self):
+        """Stop the background compactor and wait for it to finish"""
+        if self._compactor:
+            self._stop_event.set()
+            self._compactor.join()
+            self._compactor = None
+
+    def close(self):
+        """Stop background work"""
+        self.stop_background_compaction()
+
+
+def main():
+    """Load extracted vectors into a segment store and run a compaction pass"""
+
+    store_dir = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/segments"
+    store = SegmentVectorStore(store_dir)
+
+    print("🗄️ VectorVault Segment Store Initialized")
+
+    audio_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/audio_vectors.npz"
+    if feature_file_exists(audio_file):
+        audio_data = load_features(audio_file)
+
+        store.store_audio_vectors(audio_data['vectors'], 'conversation_audio.wav')
+
+    visual_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/visual_vectors.npz"
+    if feature_file_exists(visual_file):
+        visual_data = load_features(visual_file)
+
+        store.store_visual_vectors(visual_data['vectors'], 'google_meet.mp4')
+
+    store.compact()
+
+    summary = store.get_conversation_summary()
+    print(f"\n📊 Segment Store Summary:")
+    print(f"Total vectors: {summary['total_vectors']}")
+    print(f"Segments: {summary['segments']}")
+
+    for source_type, info in summary['sources'].items():
+        print(f"  {source_type}: {info['count']} vectors")
+
+    if summary['total_vectors'] > 0:
+        test_time = summary['duration'] / 2
+        similar = store.find_similar_moments(test_time, source_type='audio')
+        if similar:
+            print(f"\n🔍 Moments similar to {test_time:.1f}s:")
+            for i, moment in enumerate(similar[:5]):
+                print(f"  {i+1}. {moment['timestamp']:.1f}s (similarity: {moment['similarity']:.3f})")
+
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
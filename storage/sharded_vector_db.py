@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+VectorVault Sharded Vector Database
+One SQLite shard per recording or mailbox, a catalog database, and
+similarity queries fanned out across shards on a process pool
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from simple_vector_db import SimpleVectorDB
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "extractors"))
+
+from feature_file import feature_file_exists, load_features
+
+
+def _search_shard(shard_path: str, source_file: str, target: List[float],
+                  source_type: Optional[str], exclude_center: Optional[float],
+                  exclude_window: float, top_k: int) -> List[Dict]:
+    """Score every vector in one shard against the target (runs in a worker process)"""
+
+    conn = sqlite3.connect(f"file:{shard_path}?mode=ro", uri=True)
+    try:
+        cursor = conn.cursor()
+        if source_type:
+            cursor.execute('''
+                SELECT id, timestamp, vector_data FROM vectors WHERE source_type = ?
+            ''', (source_type,))
+        else:
+            cursor.execute('SELECT id, timestamp, vector_data FROM vectors')
+        rows = cursor.fetchall()
+
+        target_vec = np.asarray(target, dtype=np.float64)
+        keep_ids, keep_times, keep_vectors = [], [], []
+        for row_id, timestamp, vector_data in rows:
+            vector = json.loads(vector_data)
+            if len(vector) != len(target_vec):
+                continue
+            keep_ids.append(row_id)
+            keep_times.append(timestamp)
+            keep_vectors.append(vector)
+
+        if not keep_vectors:
+            return []
+
+        matrix = np.asarray(keep_vectors, dtype=np.float64)
+        times = np.asarray(keep_times, dtype=np.float64)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(target_vec)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.where(norms > 0, matrix @ target_vec / norms, 0.0)
+
+        # The exclusion window only applies on the target's own timeline
+        if exclude_center is not None:
+            scores[np.abs(times - exclude_center) < exclude_window] = -np.inf
+
+        candidates = np.flatnonzero(np.isfinite(scores))
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k)[:top_k]]
+
+        ids = [keep_ids[i] for i in candidates]
+        metadata = {}
+        if ids:
+            placeholders = ','.join('?' * len(ids))
+            cursor.execute(f'SELECT id, metadata FROM vectors WHERE id IN ({placeholders})', ids)
+            metadata = {row_id: json.loads(meta) if meta else {} for row_id, meta in cursor.fetchall()}
+
+        return [{
+            'source_file': source_file,
+            'timestamp': float(times[i]),
+            'similarity': float(scores[i]),
+            'metadata': metadata.get(keep_ids[i], {})
+        } for i in candidates]
+    finally:
+        conn.close()
+
+
+class ShardedVectorDB:
+    def __init__(self, root_dir: str, max_workers: Optional[int] = None):
+        """
+        Initialize sharded vector database
+
+        Args:
+            root_dir: Directory holding catalog.db and the shards/ folder
+            max_workers: Query worker processes (default: CPU count)
+        """
+        self.root = Path(root_dir)
+        self.shard_dir = self.root / "shards"
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool = None
+
+        self.conn = sqlite3.connect(str(self.root / "catalog.db"))
+        self.create_tables()
+
+    def create_tables(self):
+        """Create catalog tables"""
+
+        cursor = self.conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS shards (
+                source_file TEXT PRIMARY KEY,   -- Recording or mailbox
+                shard_path TEXT NOT NULL,       -- SQLite shard file
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS shard_stats (
+                source_file TEXT NOT NULL,
+                source_type TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                min_timestamp REAL,
+                max_timestamp REAL,
+                PRIMARY KEY (source_file, source_type)
+            )
+        ''')
+
+        self.conn.commit()
+
+    def find_shard(self, source_file: str) -> Optional[str]:
+        """Shard file for a source, or None if nothing was stored for it (never creates one)"""
+
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT shard_path FROM shards WHERE source_file = ?', (source_file,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def shard_path(self, source_file: str) -> str:
+        """Return (creating if needed) the shard file for a source; only the store path calls this"""
+
+        path = self.find_shard(source_file)
+        if path:
+            return path
+
+        # Readable prefix plus a hash so different paths never collide
+        stem = re.sub(r'[^A-Za-z0-9_.-]+', '_', Path(source_file).stem)[:40]
+        digest = hashlib.sha1(source_file.encode('utf-8')).hexdigest()[:10]
+        path = str(self.shard_dir / f"{stem}_{digest}.db")
+
+        cursor = self.conn.cursor()
+        cursor.execute('INSERT INTO shards (source_file, shard_path) VALUES (?, ?)', (source_file, path))
+        self.conn.commit()
+        return path
+
+    def list_shards(self, source_type: Optional[str] = None) -> List[Dict]:
+        """List shards, optionally only those holding a source type"""
+
+        cursor = self.conn.cursor()
+        if source_type:
+            cursor.execute('''
+                SELECT s.source_file, s.shard_path FROM shards s
+                JOIN shard_stats t ON t.source_file = s.source_file
+                WHERE t.source_type = ? AND t.count > 0
+            ''', (source_type,))
+        else:
+            cursor.execute('SELECT source_file, shard_path FROM shards')
+
+        return [{'source_file': row[0], 'shard_path': row[1]} for row in cursor.fetchall()]
+
+    def refresh_stats(self, source_file: str):
+        """Recompute catalog statistics for one shard"""
+
+        shard = sqlite3.connect(self.shard_path(source_file))
+        try:
+            stats = shard.execute('''
+                SELECT source_type, COUNT(*), MIN(timestamp), MAX(timestamp)
+                FROM vectors GROUP BY source_type
+            ''').fetchall()
+        finally:
+            shard.close()
+
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM shard_stats WHERE source_file = ?', (source_file,))
+        cursor.executemany('''
+            INSERT INTO shard_stats (source_file, source_type, count, min_timestamp, max_timestamp)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(source_file,) + tuple(row) for row in stats])
+        self.conn.commit()
+
+    def store_vectors(self, source_type: str, vectors: List[Dict], source_file: str):
+        """Store vectors in the shard belonging to source_file"""
+
+        db = SimpleVectorDB(self.shard_path(source_file))
+        try:
+            store = {
+                'audio': db.store_audio_vectors,
+                'visual': db.store_visual_vectors,
+                'semantic': db.store_semantic_vectors
+            }[source_type]
+            store(vectors, source_file)
+        finally:
+            db.close()
+
+        self.refresh_stats(source_file)
+
+    def store_audio_vectors(self, vectors: List[Dict], source_file: str):
+        """Store audio feature vectors"""
+        self.store_vectors('audio', vectors, source_file)
+
+    def store_visual_vectors(self, vectors: List[Dict], source_file: str):
+        """Store visual feature vectors"""
+        self.store_vectors('visual', vectors, source_file)
+
+    def store_semantic_vectors(self, vectors: List[Dict], source_file: str):
+        """Store semantic/text vectors"""
+        self.store_vectors('semantic', vectors, source_file)
+
+    def query_by_timerange(self, source_file: str, start_time: float, end_time: float,
+                           source_type: Optional[str] = None) -> List[Dict]:
+        """Query vectors within a time range of one recording"""
+
+        path = self.find_shard(source_file)
+        if path is None:
+            return []
+
+        db = SimpleVectorDB(path)
+        try:
+            return db.query_by_timerange(start_time, end_time, source_type)
+        finally:
+            db.close()
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        """Lazily start the query worker pool"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def find_similar_to_vector(self, target: List[float],
+                               source_type: Optional[str] = None,
+                               top_k: int = 10,
+                               exclude_source: Optional[str] = None,
+                               exclude_timestamp: Optional[float] = None,
+                               window_size: float = 30.0) -> List[Dict]:
+        """Search every shard in parallel and merge the per-shard top-k"""
+
+        shards = self.list_shards(source_type)
+        if not shards:
+            return []
+
+        pool = self.get_pool()
+        futures = [
+            pool.submit(
+                _search_shard,
+                shard['shard_path'],
+                shard['source_file'],
+                list(target),
+                source_type,
+                exclude_timestamp if shard['source_file'] == exclude_source else None,
+                window_size,
+                top_k
+            )
+            for shard in shards
+        ]
+
+        results = []
+        for future in futures:
+            results.extend(future.result())
+
+        return heapq.nlargest(top_k, results, key=lambda x: x['similarity'])
+
+    def find_similar_moments(self, source_file: str, target_timestamp: float,
+                             window_size: float = 30.0,
+                             source_type: Optional[str] = None,
+                             top_k: int = 10) -> List[Dict]:
+        """Find moments across all recordings similar to a moment in one recording"""
+
+        target_vectors = self.query_by_timerange(
+            source_file,
+            target_timestamp - 5,
+            target_timestamp + 5,
+            source_type
+        )
+
+        if not target_vectors:
+            return []
+
+        return self.find_similar_to_vector(
+            target_vectors[0]['vector'],
+            source_type=source_type,
+            top_k=top_k,
+            exclude_source=source_file,
+            exclude_timestamp=target_timestamp,
+            window_size=window_size
+        )
+
+    def get_catalog_summary(self) -> Dict:
+        """Get summary statistics from the catalog"""
+
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT source_type, COUNT(DISTINCT source_file), SUM(count)
+            FROM shard_stats GROUP BY source_type
+        ''')
+
+        summary = {'shards': len(self.list_shards()), 'total_vectors': 0, 'sources': {}}
+        for source_type, shard_count, count in cursor.fetchall():
+            summary['sources'][source_type] = {'shards': shard_count, 'count': count}
+            summary['total_vectors'] += count
+
+        return summary
+
+    def close(self):
+        """Shut down workers and close the catalog"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self.conn.close()
+
+
+def main():
+    """Shard the extracted conversation vectors and run a cross-shard query"""
+
+    root_dir = "/home/jonclaude/Agents/Claude on Studio/VectorVault/storage/sharded"
+    db = ShardedVectorDB(root_dir)
+
+    print("🗄️ VectorVault Sharded Database Initialized")
+
+    audio_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/audio_vectors.npz"
+    if feature_file_exists(audio_file) and not db.list_shards('audio'):
+        audio_data = load_features(audio_file)
+
+        db.store_audio_vectors(audio_data['vectors'], 'conversation_audio.wav')
+
+    summary = db.get_catalog_summary()
+    print(f"\n📊 Catalog: {summary['shards']} shards, {summary['total_vectors']} vectors")
+    for source_type, info in summary['sources'].items():
+        print(f"  {source_type}: {info['count']} vectors in {info['shards']} shards")
+
+    shards = db.list_shards('audio')
+    if shards:
+        similar = db.find_similar_moments(shards[0]['source_file'], 600.0, source_type='audio')
+        print(f"\n🔍 Moments similar to {shards[0]['source_file']} @ 600.0s:")
+        for i, moment in enumerate(similar[:5]):
+            print(f"  {i+1}. {moment['source_file']} {moment['timestamp']:.1f}s "
+                  f"(similarity: {moment['similarity']:.3f})")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,14 @@ import json
 import math
 import sqlite3
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
 import tempfile
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "extractors"))
+
+from audio_basic import speech_mask
+from feature_file import feature_file_exists, load_features
 
 class SimpleVectorDB:
     def __init__(self, db_path: str):
@@ -22,8 +28,9 @@ class SimpleVectorDB:
         self.db_path = db_path
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
-        # Initialize database
-        self.conn = sqlite3.connect(db_path)
+        # Initialize database; WAL lets readers query while a live ingest writes
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
         self.create_tables()
     
     def create_tables(self):
@@ -58,45 +65,19 @@ class SimpleVectorDB:
         
         self.conn.commit()
         
-    def store_audio_vectors(self, vectors: List[Dict], source_file: str):
+    def store_audio_vectors(self, vectors: List[Dict], source_file: str,
+                            speech_intervals: Optional[List[Dict]] = None):
         """Store audio feature vectors"""
         
-        cursor = self.conn.cursor()
-        
-        for vector in vectors:
-            cursor.execute('''
-                INSERT INTO vectors (source_type, source_file, timestamp, vector_data, metadata)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                'audio',
-                source_file,
-                vector['timestamp'],
-                json.dumps(vector['dense_vector']),
-                json.dumps(vector['features'])
-            ))
-        
-        self.conn.commit()
-        print(f"Stored {len(vectors)} audio vectors")
+        count = self.insert_vectors('audio', vectors, source_file, speech_intervals)
+        print(f"Stored {count} audio vectors")
     
-    def store_visual_vectors(self, vectors: List[Dict], source_file: str):
+    def store_visual_vectors(self, vectors: List[Dict], source_file: str,
+                             speech_intervals: Optional[List[Dict]] = None):
         """Store visual feature vectors"""
         
-        cursor = self.conn.cursor()
-        
-        for vector in vectors:
-            cursor.execute('''
-                INSERT INTO vectors (source_type, source_file, timestamp, vector_data, metadata)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                'visual', 
-                source_file,
-                vector['timestamp'],
-                json.dumps(vector['dense_vector']),
-                json.dumps(vector['features'])
-            ))
-        
-        self.conn.commit()
-        print(f"Stored {len(vectors)} visual vectors")
+        count = self.insert_vectors('visual', vectors, source_file, speech_intervals)
+        print(f"Stored {count} visual vectors")
     
     def store_semantic_vectors(self, vectors: List[Dict], source_file: str):
         """Store semantic/text vectors"""
@@ -117,7 +98,56 @@ class SimpleVectorDB:
         
         self.conn.commit()
         print(f"Stored {len(vectors)} semantic vectors")
-    
+
+    def insert_vectors(self, source_type: str, vectors: Iterable[Dict], source_file: str,
+                       speech_intervals: Optional[List[Dict]] = None) -> int:
+        """
+        Insert one batch of vectors in a single transaction; returns the count
+
+        With speech_intervals, vectors outside every interval are dropped
+        (same membership rule as the extractors, via audio_basic.speech_mask).
+        """
+
+        vectors = list(vectors)
+        if speech_intervals is not None:
+            keep = speech_mask([vector['timestamp'] for vector in vectors], speech_intervals)
+            vectors = [vector for vector, speech in zip(vectors, keep) if speech]
+
+        rows = [(
+            source_type,
+            source_file,
+            vector['timestamp'],
+            json.dumps(vector['dense_vector']),
+            json.dumps(vector['features'])
+        ) for vector in vectors]
+
+        if rows:
+            self.conn.executemany('''
+                INSERT INTO vectors (source_type, source_file, timestamp, vector_data, metadata)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+            self.conn.commit()
+        return len(rows)
+
+    def store_vector_stream(self, source_type: str, vectors: Iterable[Dict], source_file: str,
+                            batch_size: int = 5000,
+                            speech_intervals: Optional[List[Dict]] = None) -> int:
+        """Store vectors from a generator in fixed-size batches (bounded memory)"""
+
+        total = 0
+        batch = []
+
+        for vector in vectors:
+            batch.append(vector)
+            if len(batch) >= batch_size:
+                total += self.insert_vectors(source_type, batch, source_file, speech_intervals)
+                batch = []
+
+        total += self.insert_vectors(source_type, batch, source_file, speech_intervals)
+
+        print(f"Stored {total} {source_type} vectors (streamed)")
+        return total
+
     def query_by_timerange(self, start_time: float, end_time: float, 
                           source_type: Optional[str] = None) -> List[Dict]:
         """Query vectors within a time range"""
@@ -151,7 +181,37 @@ class SimpleVectorDB:
             })
         
         return results
-    
+
+    def fetch_collection(self, source_type: str, source_file: Optional[str] = None,
+                         min_id: int = 0) -> Tuple[List[int], List[float], List[str], List[List[float]]]:
+        """Fetch ids, timestamps, source files and vectors of a collection, ordered by id"""
+
+        cursor = self.conn.cursor()
+
+        if source_file:
+            cursor.execute('''
+                SELECT id, timestamp, source_file, vector_data
+                FROM vectors
+                WHERE source_type = ? AND source_file = ? AND id > ?
+                ORDER BY id
+            ''', (source_type, source_file, min_id))
+        else:
+            cursor.execute('''
+                SELECT id, timestamp, source_file, vector_data
+                FROM vectors
+                WHERE source_type = ? AND id > ?
+                ORDER BY id
+            ''', (source_type, min_id))
+
+        ids, timestamps, files, vectors = [], [], [], []
+        for row in cursor.fetchall():
+            ids.append(row[0])
+            timestamps.append(row[1])
+            files.append(row[2])
+            vectors.append(json.loads(row[3]))
+
+        return ids, timestamps, files, vectors
+
     def get_conversation_summary(self) -> Dict:
         """Get summary statistics of stored vectors"""
         
@@ -257,19 +317,24 @@ def main():
     
     print("🗄️ VectorVault Database Initialized")
     
-    # Load and store audio vectors
-    audio_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/audio_vectors.json"
-    if Path(audio_file).exists():
-        with open(audio_file, 'r') as f:
-            audio_data = json.load(f)
+    # Speech-interval table from the VAD stage, if it has been run
+    speech_intervals = None
+    intervals_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/speech_intervals.json"
+    if Path(intervals_file).exists():
+        with open(intervals_file, 'r') as f:
+            speech_intervals = json.load(f)['intervals']
+    
+    # Load and store audio vectors (speech regions only, when intervals exist)
+    audio_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/audio_vectors.npz"
+    if feature_file_exists(audio_file):
+        audio_data = load_features(audio_file)
             
-        db.store_audio_vectors(audio_data['vectors'], 'conversation_audio.wav')
+        db.store_audio_vectors(audio_data['vectors'], 'conversation_audio.wav', speech_intervals)
     
     # Load and store visual vectors (if available)
-    visual_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/visual_vectors.json"
-    if Path(visual_file).exists():
-        with open(visual_file, 'r') as f:
-            visual_data = json.load(f)
+    visual_file = "/home/jonclaude/Agents/Claude on Studio/VectorVault/projects/google_meet_analysis/visual_vectors.npz"
+    if feature_file_exists(visual_file):
+        visual_data = load_features(visual_file)
             
         db.store_visual_vectors(visual_data['vectors'], 'google_meet.mp4')
     
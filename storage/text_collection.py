@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+VectorVault Text Collection
+Meaning vectors for transcript windows, journal entries and emails in one searchable collection
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "extractors"))
+
+from feature_file import feature_file_exists, load_features
+from simple_vector_db import SimpleVectorDB
+from text_embeddings import (EmbeddingCache, TfidfSVDEmbedder, email_documents, embed_texts,
+                             journal_documents, load_embedder, transcript_documents)
+
+SOURCE_TYPE = 'text_embedding'
+
+
+class TextCollection:
+    def __init__(self, db: SimpleVectorDB, embedder: Optional[str] = None,
+                 model_dir: Optional[str] = None, cache_dir: Optional[str] = None):
+        """
+        Initialize text embedding collection
+
+        Vectors are stored in the database under their own source type, one
+        row per document, with the modality, a text preview and the model id
+        in the metadata. Every document lives in the same space, so one query
+        searches transcripts, journal and email together.
+
+        Args:
+            db: Vector database the collection is written to
+            embedder: Embedder name (default: text_embeddings.default_embedder())
+            model_dir: Where a fitted TF-IDF model is saved (default: text_models/ next to the database)
+            cache_dir: Embedding cache directory (default: $VECTORVAULT_EMBEDDING_CACHE)
+        """
+        self.db = db
+        self.conn = db.conn
+        self.embedder = load_embedder(embedder)
+        self.model_dir = Path(model_dir) if model_dir else Path(db.db_path).parent / "text_models"
+        self.cache = EmbeddingCache(cache_dir)
+        self._matrix = None
+
+        if isinstance(self.embedder, TfidfSVDEmbedder) and self.model_path.exists():
+            self.embedder.load(str(self.model_path))
+
+    @property
+    def model_path(self) -> Path:
+        return self.model_dir / f"{self.embedder.name}.npz"
+
+    def build(self, documents: List[Dict], refit: bool = True) -> int:
+        """
+        Replace the collection with the given documents
+
+        A TF-IDF model is (re)fitted on these documents first when refit is
+        set or no model exists yet; the old rows are dropped either way,
+        since vectors from another fit live in a different space.
+        """
+        if isinstance(self.embedder, TfidfSVDEmbedder) and (refit or not self.embedder.fitted):
+            print(f"📐 Fitting TF-IDF + SVD on {len(documents)} documents...")
+            self.embedder.fit([document['text'] for document in documents])
+            self.embedder.save(str(self.model_path))
+
+        self.conn.execute('DELETE FROM vectors WHERE source_type = ?', (SOURCE_TYPE,))
+        self.conn.commit()
+        return self.add(documents)
+
+    def add(self, documents: List[Dict]) -> int:
+        """Embed documents with the current model and append them to the collection"""
+        if not self.embedder.fitted:
+            raise Exception("Text model is not fitted; call build() with a corpus first")
+
+        documents = [document for document in documents if document['text'].strip()]
+        if not documents:
+            return 0
+
+        embeddings = embed_texts(self.embedder, [document['text'] for document in documents], self.cache)
+
+        by_file = {}
+        for document, embedding in zip(documents, embeddings):
+            metadata = {key: value for key, value in document.items()
+                        if key not in ('text', 'source_file', 'timestamp')}
+            metadata['text'] = document['text'][:300]
+            metadata['model_id'] = self.embedder.model_id
+            by_file.setdefault(document['source_file'], []).append({
+                'timestamp': document['timestamp'],
+                'dense_vector': [round(float(x), 6) for x in embedding],
+                'features': metadata
+            })
+
+        stored = sum(self.db.insert_vectors(SOURCE_TYPE, vectors, source_file)
+                     for source_file, vectors in by_file.items())
+        self._matrix = None
+        return stored
+
+    def load_matrix(self) -> Dict:
+        """Ids, normalized vectors and metadata of the collection (cached until it changes)"""
+        if self._matrix is None:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                SELECT id, source_file, timestamp, vector_data, metadata
+                FROM vectors WHERE source_type = ? ORDER BY id
+            ''', (SOURCE_TYPE,))
+            rows = cursor.fetchall()
+            self._matrix = {
+                'ids': [row[0] for row in rows],
+                'source_files': [row[1] for row in rows],
+                'timestamps': [row[2] for row in rows],
+                'vectors': np.asarray([json.loads(row[3]) for row in rows], dtype=np.float32),
+                'metadata': [json.loads(row[4]) for row in rows]
+            }
+        return self._matrix
+
+    def search(self, query: str, k: int = 10, modality: Optional[str] = None) -> List[Dict]:
+        """Documents closest in meaning to a free-text query"""
+        data = self.load_matrix()
+        if not data['ids']:
+            return []
+
+        query_vector = self.embedder.embed([query])[0]
+        scores = data['vectors'] @ query_vector
+        if modality:
+            mask = np.array([m.get('modality') == modality for m in data['metadata']])
+            scores = np.where(mask, scores, -np.inf)
+
+        top = np.argsort(-scores)[:k]
+        return [{
+            'id': data['ids'][i],
+            'source_file': data['source_files'][i],
+            'timestamp': data['timestamps'][i],
+            'similarity': float(scores[i]),
+            'metadata': data['metadata'][i]
+        } for i in top if np.isfinite(scores[i])]
+
+    def close(self):
+        self.cache.close()
+
+
+def main():
+    """Build the text collection from the project's transcript, journal and email analyses"""
+
+    project_dir = Path("/home/jonclaude/Agents/Claude on Studio/VectorVault/projects")
+    db_path = str(project_dir / "google_meet_analysis" / "conversation.db")
+
+    transcription_file = project_dir / "google_meet_analysis" / "whisper_transcription.npz"
+    journal_file = project_dir / "google_meet_analysis" / "journal_analysis.json"
+    email_file = project_dir / "email_analysis" / "liberal_email_analysis.json"
+
+    documents = []
+    if feature_file_exists(str(transcription_file)):
+        documents += transcript_documents(load_features(str(transcription_file)), 'conversation_audio.wav')
+    if journal_file.exists():
+        with open(journal_file, 'r') as f:
+            documents += journal_documents(json.load(f), journal_file.name)
+    if email_file.exists():
+        with open(email_file, 'r') as f:
+            documents += email_documents(json.load(f), email_file.name)
+
+    if not documents:
+        print("❌ No transcript, journal or email analyses found")
+        return
+
+    db = SimpleVectorDB(db_path)
+    collection = TextCollection(db)
+
+    counts = {}
+    for document in documents:
+        counts[document['modality']] = counts.get(document['modality'], 0) + 1
+    print(f"📚 Documents: " + ", ".join(f"{count} {modality}" for modality, count in counts.items()))
+
+    stored = collection.build(documents)
+    print(f"✅ Stored {stored} text embeddings ({collection.embedder.model_id})")
+
+    query = " ".join(sys.argv[1:]) or "virtual reality museum"
+    print(f"\n🔍 Closest in meaning to \"{query}\":")
+    for i, hit in enumerate(collection.search(query, k=8)):
+        print(f"  {i+1}. [{hit['metadata']['modality']}] {hit['similarity']:.3f} "
+              f"{hit['metadata']['text'][:80]}")
+
+    collection.close()
+    db.close()
+
+
+if __name__ == "__main__":
+    main()